@@ -36,6 +36,43 @@ class LancamentoForm(forms.ModelForm):
             self.fields["conta"].queryset = Conta.objects.filter(usuario=user)
 
 
+class ImportacaoForm(forms.Form):
+    arquivo = forms.FileField(
+        label="Extrato (CSV ou OFX)",
+        widget=forms.ClearableFileInput(
+            attrs={"class": "form-control", "accept": ".csv,.ofx"}
+        ),
+    )
+    conta = forms.ModelChoiceField(
+        queryset=Conta.objects.none(),
+        required=False,
+        label="Conta padrão",
+        help_text="Usada nas linhas sem conta (e em todo extrato OFX).",
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+    categoria = forms.ModelChoiceField(
+        queryset=Categoria.objects.none(),
+        required=False,
+        label="Categoria padrão",
+        help_text="Usada nas linhas sem categoria que o histórico não identifica.",
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+    sugerir = forms.BooleanField(
+        required=False,
+        initial=True,
+        label="Sugerir categorias pelo histórico de descrições",
+        widget=forms.CheckboxInput(attrs={"class": "form-check-input"}),
+    )
+
+    def __init__(self, *args, **kwargs):
+        user = kwargs.pop("user", None)
+        super().__init__(*args, **kwargs)
+
+        if user:
+            self.fields["categoria"].queryset = Categoria.objects.filter(usuario=user)
+            self.fields["conta"].queryset = Conta.objects.filter(usuario=user)
+
+
 class CategoriaForm(forms.ModelForm):
     class Meta:
         model = Categoria
@@ -0,0 +1,275 @@
+"""
+Instrumentação das requisições: tempo total, tempo e número de consultas
+ao banco e tempo de renderização de templates, por rota.
+
+O middleware acumula as medidas em janelas por processo (cada worker do
+gunicorn tem as suas), expostas em formato Prometheus pela view
+``metricas``, e, com INSTRUMENTACAO["SERVER_TIMING"] (desenvolvimento),
+também as devolve no cabeçalho Server-Timing.
+"""
+
+import contextlib
+import contextvars
+import functools
+import random
+import threading
+import time
+from collections import defaultdict, deque
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+
+_medicao_atual = contextvars.ContextVar("medicao_atual", default=None)
+
+
+class Medicao:
+    """Acumula o que uma requisição gastou."""
+
+    __slots__ = ("inicio", "banco", "consultas", "template")
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.banco = 0.0
+        self.consultas = 0
+        self.template = 0.0
+
+
+@contextlib.contextmanager
+def _medindo(medicao):
+    token = _medicao_atual.set(medicao)
+    try:
+        yield
+    finally:
+        _medicao_atual.reset(token)
+
+
+def medir_consulta(execute, sql, params, many, context):
+    """
+    execute_wrapper instalado em cada conexão ao ser aberta (ver
+    core.signals). As conexões são locais à thread, e no ASGI as consultas
+    rodam em threads do sync_to_async; a medição chega até elas pelo
+    contexto, que o sync_to_async copia.
+    """
+    medicao = _medicao_atual.get()
+    if medicao is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicao.banco += time.perf_counter() - inicio
+        medicao.consultas += 1
+
+
+# -------------------- TEMPLATES --------------------
+
+
+class TemplateMedido(Template):
+    def render(self, context=None, request=None):
+        medicao = _medicao_atual.get()
+        if medicao is None:
+            return super().render(context, request)
+
+        # Só o tempo do template: consultas disparadas durante a renderização
+        # (querysets preguiçosos) já entram no tempo de banco.
+        inicio, banco = time.perf_counter(), medicao.banco
+        try:
+            return super().render(context, request)
+        finally:
+            medicao.template += time.perf_counter() - inicio - (medicao.banco - banco)
+
+
+class DjangoTemplatesMedido(DjangoTemplates):
+    """Backend de templates do Django que mede o tempo de render()."""
+
+    def from_string(self, template_code):
+        return TemplateMedido(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TemplateMedido(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+# -------------------- HISTOGRAMAS --------------------
+
+
+class Histogramas:
+    """
+    Últimas ``janela`` amostras de cada métrica por rota, para os quantis,
+    mais soma e contagem acumuladas desde o início do processo.
+    """
+
+    METRICAS = {
+        "requisicao_segundos": "Tempo total da requisição.",
+        "banco_segundos": "Tempo gasto em consultas ao banco.",
+        "template_segundos": "Tempo de renderização de templates.",
+        "consultas": "Consultas ao banco por requisição.",
+    }
+    QUANTIS = (0.5, 0.95, 0.99)
+
+    def __init__(self, janela):
+        self.janela = janela
+        self.trava = threading.Lock()
+        self.amostras = defaultdict(lambda: deque(maxlen=self.janela))
+        self.somas = defaultdict(float)
+        self.contagens = defaultdict(int)
+
+    def registrar(self, rota, total, medicao):
+        valores = {
+            "requisicao_segundos": total,
+            "banco_segundos": medicao.banco,
+            "template_segundos": medicao.template,
+            "consultas": medicao.consultas,
+        }
+        with self.trava:
+            for metrica, valor in valores.items():
+                chave = (metrica, rota)
+                self.amostras[chave].append(valor)
+                self.somas[chave] += valor
+                self.contagens[chave] += 1
+
+    def prometheus(self):
+        with self.trava:
+            copia = {chave: sorted(valores) for chave, valores in self.amostras.items()}
+            somas, contagens = dict(self.somas), dict(self.contagens)
+
+        linhas = []
+        for metrica, descricao in self.METRICAS.items():
+            nome = f"fintrack_{metrica}"
+            linhas.append(f"# HELP {nome} {descricao}")
+            linhas.append(f"# TYPE {nome} summary")
+            for (m, rota), valores in sorted(copia.items()):
+                if m != metrica:
+                    continue
+                rotulo = rota.replace("\\", "\\\\").replace('"', '\\"')
+                for quantil in self.QUANTIS:
+                    indice = min(int(quantil * len(valores)), len(valores) - 1)
+                    linhas.append(
+                        f'{nome}{{rota="{rotulo}",quantile="{quantil}"}} {valores[indice]:.6g}'
+                    )
+                linhas.append(f'{nome}_sum{{rota="{rotulo}"}} {somas[(m, rota)]:.6g}')
+                linhas.append(f'{nome}_count{{rota="{rotulo}"}} {contagens[(m, rota)]}')
+        return "\n".join(linhas) + "\n"
+
+
+@functools.cache
+def histogramas():
+    return Histogramas(settings.INSTRUMENTACAO["JANELA"])
+
+
+# -------------------- MIDDLEWARE --------------------
+
+
+class InstrumentacaoMiddleware:
+    """
+    Mede uma fração ``AMOSTRAGEM`` das requisições. Com amostragem zero o
+    middleware se retira da pilha na inicialização e não custa nada.
+
+    Funciona nas duas pilhas: no ASGI não força a troca para uma thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        config = settings.INSTRUMENTACAO
+        self.amostragem = config["AMOSTRAGEM"]
+        if self.amostragem <= 0:
+            raise MiddlewareNotUsed
+        self.server_timing = config["SERVER_TIMING"]
+        self.get_response = get_response
+        self.assincrono = iscoroutinefunction(get_response)
+        if self.assincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.assincrono:
+            return self.__acall__(request)
+        if self.amostragem < 1 and random.random() >= self.amostragem:
+            return self.get_response(request)
+
+        medicao = Medicao()
+        with _medindo(medicao):
+            response = self.get_response(request)
+        return self.finalizar(request, response, medicao)
+
+    async def __acall__(self, request):
+        if self.amostragem < 1 and random.random() >= self.amostragem:
+            return await self.get_response(request)
+
+        medicao = Medicao()
+        with _medindo(medicao):
+            response = await self.get_response(request)
+        return self.finalizar(request, response, medicao)
+
+    def finalizar(self, request, response, medicao):
+        rota = request.resolver_match.view_name if request.resolver_match else "-"
+
+        if self.server_timing:
+            response["Server-Timing"] = self.cabecalho(medicao)
+
+        # Em respostas em fluxo (CSV, JSONL) o grosso do trabalho acontece
+        # enquanto o corpo é enviado; a medição só termina no fim dele. Num
+        # FileResponse trocar o streaming_content apagaria o file_to_stream e
+        # com ele o sendfile do wsgi.file_wrapper: a medição termina quando o
+        # servidor fecha a resposta.
+        if getattr(response, "file_to_stream", None) is not None:
+            response._resource_closers.append(
+                functools.partial(self.registrar, rota, medicao)
+            )
+        elif response.streaming:
+            medir = self.medir_fluxo_async if response.is_async else self.medir_fluxo
+            response.streaming_content = medir(response.streaming_content, rota, medicao)
+        else:
+            self.registrar(rota, medicao)
+        return response
+
+    @staticmethod
+    def registrar(rota, medicao):
+        histogramas().registrar(rota, time.perf_counter() - medicao.inicio, medicao)
+
+    # A medição só fica ativa enquanto cada parte é produzida, para não
+    # vazar para o contexto de quem consome o fluxo.
+    @staticmethod
+    def medir_fluxo(conteudo, rota, medicao):
+        partes = iter(conteudo)
+        try:
+            while True:
+                with _medindo(medicao):
+                    parte = next(partes, None)
+                if parte is None:
+                    break
+                yield parte
+        finally:
+            histogramas().registrar(rota, time.perf_counter() - medicao.inicio, medicao)
+
+    @staticmethod
+    async def medir_fluxo_async(conteudo, rota, medicao):
+        partes = aiter(conteudo)
+        try:
+            while True:
+                with _medindo(medicao):
+                    parte = await anext(partes, None)
+                if parte is None:
+                    break
+                yield parte
+        finally:
+            histogramas().registrar(rota, time.perf_counter() - medicao.inicio, medicao)
+
+    @staticmethod
+    def cabecalho(medicao):
+        total = (time.perf_counter() - medicao.inicio) * 1000
+        banco = medicao.banco * 1000
+        template = medicao.template * 1000
+        return (
+            f'db;dur={banco:.1f};desc="{medicao.consultas} consultas", '
+            f"tpl;dur={template:.1f}, "
+            f"app;dur={max(total - banco - template, 0):.1f}, "
+            f"total;dur={total:.1f}"
+        )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Categoria
+from core.utils.icones import atribuir_icones
+
+
+class Command(BaseCommand):
+    help = "Define o ícone das categorias pelo nome, em lote, sem chamar save()."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--todas",
+            action="store_true",
+            help="Recalcula também as categorias que já têm ícone.",
+        )
+        parser.add_argument("--lote", type=int, default=1000, help="Linhas por UPDATE.")
+
+    def handle(self, *args, **options):
+        categorias = Categoria.objects.only("pk", "nome", "icone")
+        if not options["todas"]:
+            categorias = categorias.filter(icone="")
+
+        alteradas = atribuir_icones(
+            categorias.iterator(chunk_size=options["lote"]),
+            sobrescrever=options["todas"],
+        )
+        Categoria.objects.bulk_update(alteradas, ["icone"], batch_size=options["lote"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{len(alteradas)} categoria(s) atualizada(s).")
+        )
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import Comprovante, Lancamento, registrar_comprovantes
+from core.utils.comprovantes import digest_do_nome
+
+
+class Command(BaseCommand):
+    help = (
+        "Move os comprovantes enviados antes do armazenamento por conteúdo para "
+        "nomes pelo hash, juntando arquivos repetidos."
+    )
+
+    def handle(self, *args, **options):
+        armazenamento = Lancamento._meta.get_field("comprovante").storage
+        antigos = [
+            comprovante
+            for comprovante in Comprovante.objects.filter(referencias__gt=0)
+            if digest_do_nome(comprovante.arquivo) is None
+        ]
+
+        movidos = 0
+        for comprovante in antigos:
+            if not armazenamento.exists(comprovante.arquivo):
+                self.stderr.write(f"Arquivo ausente: {comprovante.arquivo}")
+                continue
+
+            # O storage calcula o nome pelo conteúdo e reaproveita o arquivo
+            # se o mesmo recibo já estiver guardado
+            with armazenamento.open(comprovante.arquivo) as arquivo:
+                novo = armazenamento.save(comprovante.arquivo, arquivo)
+
+            with transaction.atomic():
+                quantidade = Lancamento.objects.filter(
+                    comprovante=comprovante.arquivo
+                ).update(comprovante=novo)
+                registrar_comprovantes([novo] * quantidade)
+                Comprovante.objects.filter(pk=comprovante.pk).delete()
+
+            armazenamento.delete(comprovante.arquivo)
+            for reducao in (comprovante.previa, comprovante.miniatura):
+                if reducao:
+                    reducao.delete(save=False)
+            movidos += 1
+
+        total = Comprovante.objects.filter(referencias__gt=0).count()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{movidos} arquivo(s) antigo(s) migrado(s); {total} arquivo(s) "
+                f"distinto(s) em uso."
+            )
+        )
@@ -0,0 +1,66 @@
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.dados_sinteticos import CATEGORIAS, CONTAS, gerar_usuario
+
+
+class Command(BaseCommand):
+    help = "Gera usuários com contas, categorias e lançamentos sintéticos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--usuarios", type=int, default=1)
+        parser.add_argument(
+            "--contas", type=int, default=4, help=f"Por usuário (até {len(CONTAS)})."
+        )
+        parser.add_argument(
+            "--categorias",
+            type=int,
+            default=len(CATEGORIAS),
+            help=f"Por usuário (até {len(CATEGORIAS)}).",
+        )
+        parser.add_argument(
+            "--lancamentos", type=int, default=10_000, help="Por usuário."
+        )
+        parser.add_argument(
+            "--anos", type=int, default=3, help="Período coberto, até hoje."
+        )
+        parser.add_argument(
+            "--prefixo", default="sintetico", help="Prefixo dos nomes de usuário."
+        )
+        parser.add_argument("--senha", help="Senha dos usuários (padrão: sem login).")
+        parser.add_argument(
+            "--semente", type=int, default=42, help="Mesma semente, mesmos dados."
+        )
+
+    def handle(self, *args, **options):
+        nomes = [f"{options['prefixo']}{i}" for i in range(1, options["usuarios"] + 1)]
+        existentes = User.objects.filter(username__in=nomes).values_list(
+            "username", flat=True
+        )
+        if existentes:
+            raise CommandError(
+                f"Usuário(s) já existente(s): {', '.join(existentes)}. "
+                "Use outro --prefixo."
+            )
+
+        rng = random.Random(options["semente"])
+        for nome in nomes:
+            inicio = time.perf_counter()
+            gerar_usuario(
+                nome,
+                rng,
+                contas=options["contas"],
+                categorias=options["categorias"],
+                lancamentos=options["lancamentos"],
+                anos=options["anos"],
+                senha=options["senha"],
+            )
+            self.stdout.write(
+                f"{nome}: {options['lancamentos']} lançamento(s) em "
+                f"{time.perf_counter() - inicio:.2f}s"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"{len(nomes)} usuário(s) gerado(s)."))
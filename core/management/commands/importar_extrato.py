@@ -0,0 +1,68 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Categoria, Conta
+from core.utils.importacao import LEITORES, ImportadorLancamentos, detectar_formato
+
+
+class Command(BaseCommand):
+    help = "Importa lançamentos de um extrato CSV ou OFX para um usuário."
+
+    def add_arguments(self, parser):
+        parser.add_argument("usuario", help="Nome de usuário dono dos lançamentos.")
+        parser.add_argument("arquivo", help="Caminho do extrato.")
+        parser.add_argument(
+            "--formato",
+            choices=sorted(LEITORES),
+            help="Formato do arquivo (padrão: pela extensão).",
+        )
+        parser.add_argument("--conta", help="Nome da conta usada nas linhas sem conta.")
+        parser.add_argument(
+            "--categoria", help="Nome da categoria usada nas linhas sem categoria."
+        )
+        parser.add_argument("--lote", type=int, default=1000, help="Linhas por INSERT.")
+        parser.add_argument(
+            "--sem-sugestao",
+            action="store_true",
+            help="Não sugere categorias pelo histórico de descrições.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            usuario = User.objects.get(username=options["usuario"])
+        except User.DoesNotExist:
+            raise CommandError(f"Usuário '{options['usuario']}' não encontrado.")
+
+        conta = categoria = None
+        if options["conta"]:
+            conta = Conta.objects.filter(usuario=usuario, nome=options["conta"]).first()
+            if conta is None:
+                raise CommandError(f"Conta '{options['conta']}' não encontrada.")
+        if options["categoria"]:
+            categoria = Categoria.objects.filter(
+                usuario=usuario, nome=options["categoria"]
+            ).first()
+            if categoria is None:
+                raise CommandError(f"Categoria '{options['categoria']}' não encontrada.")
+
+        leitor = LEITORES[options["formato"] or detectar_formato(options["arquivo"])]
+        importador = ImportadorLancamentos(
+            usuario,
+            conta=conta,
+            categoria=categoria,
+            tamanho_lote=options["lote"],
+            sugerir=not options["sem_sugestao"],
+        )
+        with open(options["arquivo"], "rb") as arquivo:
+            resultado = importador.importar(leitor(arquivo))
+
+        for numero, mensagem in resultado["erros"]:
+            self.stderr.write(f"Linha {numero}: {mensagem}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{resultado['importados']} lançamento(s) importado(s) em "
+                f"{resultado['segundos']:.2f}s ({resultado['por_segundo']:.0f}/s), "
+                f"{len(resultado['erros'])} erro(s)."
+            )
+        )
@@ -0,0 +1,207 @@
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.cookiejar import CookieJar
+from urllib.error import URLError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, build_opener
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.management.commands.medir_concorrencia import preparar_banco
+
+
+PAGINAS = ["/dashboard/", "/lancamentos/", "/bancos/", "/categorias/"]
+SENHA = "carga-senha"
+
+SERVIDORES = {
+    "wsgi": ["fintrack_dj.wsgi"],
+    "asgi": ["fintrack_dj.asgi:application", "-k", "uvicorn_worker.UvicornWorker"],
+}
+
+
+def _porta_livre():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def entrar(porta, username):
+    """Faz login pelo formulário e devolve o cookie de sessão."""
+    cookies = CookieJar()
+    navegador = build_opener(HTTPCookieProcessor(cookies))
+    url = f"http://127.0.0.1:{porta}/login/"
+    navegador.open(url, timeout=30).read()
+    csrf = next(c.value for c in cookies if c.name == "csrftoken")
+    dados = {"username": username, "password": SENHA, "csrfmiddlewaretoken": csrf}
+    navegador.open(url, urlencode(dados).encode(), timeout=30).read()
+    sessao = next((c.value for c in cookies if c.name == "sessionid"), None)
+    if sessao is None:
+        raise CommandError(f"Login de {username} falhou.")
+    return f"sessionid={sessao}"
+
+
+def cliente(porta, cookie, fim, tempos, erros):
+    """Percorre as páginas em sequência até ``fim``, como um usuário apressado."""
+    conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=30)
+    indice = 0
+    while time.perf_counter() < fim:
+        pagina = PAGINAS[indice % len(PAGINAS)]
+        indice += 1
+        inicio = time.perf_counter()
+        try:
+            conexao.request("GET", pagina, headers={"Cookie": cookie})
+            resposta = conexao.getresponse()
+            resposta.read()
+        except (OSError, http.client.HTTPException):
+            conexao.close()
+            erros.append(pagina)
+            continue
+        if resposta.status != 200:
+            erros.append(pagina)
+            continue
+        tempos.append(time.perf_counter() - inicio)
+    conexao.close()
+
+
+def _percentil(tempos, n):
+    if len(tempos) < 2:
+        return round(tempos[0] * 1000, 2) if tempos else None
+    return round(statistics.quantiles(tempos, n=100)[n - 1] * 1000, 2)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara a vazão das páginas de leitura servidas pelo gunicorn síncrono "
+        "(WSGI) e pelo gunicorn com workers uvicorn (ASGI)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument(
+            "--clientes", type=int, default=16, help="Clientes HTTP simultâneos."
+        )
+        parser.add_argument("--segundos", type=float, default=10.0)
+        parser.add_argument(
+            "--usuarios",
+            type=int,
+            default=4,
+            help="Usuários distintos entre os clientes.",
+        )
+        parser.add_argument(
+            "--lancamentos",
+            type=int,
+            default=20_000,
+            help="Lançamentos por usuário no banco de carga.",
+        )
+        parser.add_argument("--saida", help="Arquivo JSON de saída (padrão: stdout).")
+
+    def handle(self, *args, **options):
+        if settings.DATABASES["default"]["ENGINE"] != "django.db.backends.sqlite3":
+            raise CommandError("Esta medição só se aplica ao SQLite.")
+
+        with tempfile.TemporaryDirectory() as diretorio:
+            banco = os.path.join(diretorio, "carga.sqlite3")
+            self.stderr.write(
+                f"Preparando banco de carga com {options['usuarios']} usuário(s)..."
+            )
+            preparar_banco(banco, options["usuarios"], options["lancamentos"], SENHA)
+
+            # WAL e busy_timeout nos dois modos, para que a diferença medida
+            # seja do servidor e não das travas do SQLite
+            ambiente = {
+                **os.environ,
+                "SQLITE_ARQUIVO": banco,
+                "SQLITE_OTIMIZADO": "1",
+                "INSTRUMENTACAO_SERVER_TIMING": "0",
+            }
+            resultados = [
+                self.medir(modo, argumentos, ambiente, options)
+                for modo, argumentos in SERVIDORES.items()
+            ]
+
+        relatorio = {
+            "workers": options["workers"],
+            "clientes": options["clientes"],
+            "segundos": options["segundos"],
+            "paginas": PAGINAS,
+            "resultados": resultados,
+        }
+        texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+        if options["saida"]:
+            with open(options["saida"], "w", encoding="utf-8") as arquivo:
+                arquivo.write(texto)
+        else:
+            self.stdout.write(texto)
+
+    def medir(self, modo, argumentos, ambiente, options):
+        porta = _porta_livre()
+        servidor = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "gunicorn",
+                *argumentos,
+                "--workers",
+                str(options["workers"]),
+                "--bind",
+                f"127.0.0.1:{porta}",
+                "--log-level",
+                "warning",
+            ],
+            cwd=settings.BASE_DIR,
+            env=ambiente,
+        )
+        try:
+            self.aguardar(servidor, porta)
+            cookies = [
+                entrar(porta, f"carga{i % options['usuarios'] + 1}")
+                for i in range(options["clientes"])
+            ]
+
+            tempos, erros = [], []
+            fim = time.perf_counter() + options["segundos"]
+            threads = [
+                threading.Thread(target=cliente, args=(porta, cookie, fim, tempos, erros))
+                for cookie in cookies
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            servidor.terminate()
+            servidor.wait(timeout=30)
+
+        resultado = {
+            "modo": modo,
+            "requisicoes_por_segundo": round(len(tempos) / options["segundos"], 1),
+            "p50_ms": _percentil(tempos, 50),
+            "p95_ms": _percentil(tempos, 95),
+            "erros": len(erros),
+        }
+        self.stderr.write(
+            f"{modo}: {resultado['requisicoes_por_segundo']} req/s, "
+            f"p95 {resultado['p95_ms']} ms, {resultado['erros']} erro(s)"
+        )
+        return resultado
+
+    def aguardar(self, servidor, porta, limite=30):
+        prazo = time.monotonic() + limite
+        while time.monotonic() < prazo:
+            if servidor.poll() is not None:
+                raise CommandError("O servidor terminou antes de aceitar conexões.")
+            try:
+                build_opener().open(f"http://127.0.0.1:{porta}/login/", timeout=5)
+                return
+            except (URLError, OSError):
+                time.sleep(0.2)
+        raise CommandError(f"O servidor não respondeu em {limite} segundos.")
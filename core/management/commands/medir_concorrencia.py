@@ -0,0 +1,189 @@
+import json
+import multiprocessing
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Como em processar_relatorios, os processos são criados com "spawn" e
+# configuram o Django do zero; o modo do SQLite e o arquivo do banco vêm do
+# ambiente, lido pelo settings na inicialização de cada processo.
+def iniciar_processo(ambiente):
+    os.environ.update(ambiente)
+    django.setup()
+
+
+def executar_carga(username, segundos, fracao_escrita, semente):
+    """Mistura leituras do dashboard/lista com novos lançamentos por ``segundos``."""
+    import datetime
+    import random
+    from decimal import Decimal
+
+    from django.contrib.auth.models import User
+    from django.db import OperationalError
+
+    from core.models import Categoria, Conta, Lancamento
+    from core.utils.agregacoes import resumo_financeiro
+    from core.utils.paginacao import paginar_por_cursor
+
+    usuario = User.objects.get(username=username)
+    contas = list(Conta.objects.filter(usuario=usuario))
+    categorias = list(Categoria.objects.filter(usuario=usuario))
+    rng = random.Random(semente)
+
+    resultado = {"leituras": [], "escritas": [], "erros": 0}
+    fim = time.perf_counter() + segundos
+    while time.perf_counter() < fim:
+        escrita = rng.random() < fracao_escrita
+        inicio = time.perf_counter()
+        try:
+            if escrita:
+                categoria = rng.choice(categorias)
+                Lancamento(
+                    usuario=usuario,
+                    conta=rng.choice(contas),
+                    categoria=categoria,
+                    tipo=categoria.tipo,
+                    descricao="Carga concorrente",
+                    valor=Decimal(rng.randrange(100, 100_000)) / 100,
+                    data=datetime.date.today(),
+                ).save()
+            else:
+                resumo_financeiro(Conta.objects.filter(usuario=usuario))
+                paginar_por_cursor(
+                    Lancamento.objects.filter(usuario=usuario).select_related(
+                        "categoria", "conta"
+                    )
+                )
+        except OperationalError:
+            resultado["erros"] += 1
+            continue
+        resultado["escritas" if escrita else "leituras"].append(
+            time.perf_counter() - inicio
+        )
+    return resultado
+
+
+def preparar_banco(caminho, usuarios, lancamentos, senha=None):
+    """Banco SQLite novo em ``caminho`` com os usuários carga1..cargaN."""
+    ambiente = {**os.environ, "SQLITE_ARQUIVO": caminho, "SQLITE_OTIMIZADO": "0"}
+    manage = [sys.executable, str(settings.BASE_DIR / "manage.py")]
+    subprocess.run([*manage, "migrate", "-v", "0"], env=ambiente, check=True)
+    opcoes = ["--prefixo", "carga", "--usuarios", str(usuarios)]
+    opcoes += ["--lancamentos", str(lancamentos)]
+    if senha:
+        opcoes += ["--senha", senha]
+    subprocess.run(
+        [*manage, "gerar_dados_sinteticos", *opcoes],
+        env=ambiente,
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+def _p95(tempos):
+    if len(tempos) < 2:
+        return round(tempos[0] * 1000, 2) if tempos else None
+    return round(statistics.quantiles(tempos, n=20)[-1] * 1000, 2)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara a vazão de leituras e escritas concorrentes no SQLite padrão e "
+        "no modo ajustado (SQLITE_OTIMIZADO), com vários processos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processos", type=int, default=4)
+        parser.add_argument("--segundos", type=float, default=10.0)
+        parser.add_argument(
+            "--escrita",
+            type=float,
+            default=0.2,
+            help="Fração das operações que são escritas (padrão: 0.2).",
+        )
+        parser.add_argument(
+            "--lancamentos",
+            type=int,
+            default=20_000,
+            help="Lançamentos por usuário no banco de carga.",
+        )
+        parser.add_argument("--saida", help="Arquivo JSON de saída (padrão: stdout).")
+
+    def handle(self, *args, **options):
+        if settings.DATABASES["default"]["ENGINE"] != "django.db.backends.sqlite3":
+            raise CommandError("Esta medição só se aplica ao SQLite.")
+
+        processos = options["processos"]
+        with tempfile.TemporaryDirectory() as diretorio:
+            base = os.path.join(diretorio, "base.sqlite3")
+            self.stderr.write(f"Preparando banco de carga com {processos} usuário(s)...")
+            preparar_banco(base, processos, options["lancamentos"])
+
+            resultados = []
+            for modo, otimizado in (("padrao", "0"), ("otimizado", "1")):
+                # Cada modo parte de uma cópia do mesmo banco (o WAL é
+                # persistente no arquivo, então não dá para reaproveitar)
+                arquivo = os.path.join(diretorio, f"{modo}.sqlite3")
+                shutil.copyfile(base, arquivo)
+                ambiente = {"SQLITE_ARQUIVO": arquivo, "SQLITE_OTIMIZADO": otimizado}
+                resultados.append(self.medir(modo, ambiente, options))
+
+        relatorio = {
+            "processos": processos,
+            "segundos": options["segundos"],
+            "fracao_escrita": options["escrita"],
+            "resultados": resultados,
+        }
+        texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+        if options["saida"]:
+            with open(options["saida"], "w", encoding="utf-8") as arquivo:
+                arquivo.write(texto)
+        else:
+            self.stdout.write(texto)
+
+    def medir(self, modo, ambiente, options):
+        processos = options["processos"]
+        with ProcessPoolExecutor(
+            max_workers=processos,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=iniciar_processo,
+            initargs=(ambiente,),
+        ) as pool:
+            futuros = [
+                pool.submit(
+                    executar_carga,
+                    f"carga{i}",
+                    options["segundos"],
+                    options["escrita"],
+                    i,
+                )
+                for i in range(1, processos + 1)
+            ]
+            parciais = [futuro.result() for futuro in futuros]
+
+        leituras = [t for p in parciais for t in p["leituras"]]
+        escritas = [t for p in parciais for t in p["escritas"]]
+        resultado = {
+            "modo": modo,
+            "leituras_por_segundo": round(len(leituras) / options["segundos"], 1),
+            "escritas_por_segundo": round(len(escritas) / options["segundos"], 1),
+            "leitura_p95_ms": _p95(leituras),
+            "escrita_p95_ms": _p95(escritas),
+            "erros_banco_ocupado": sum(p["erros"] for p in parciais),
+        }
+        self.stderr.write(
+            f"{modo}: {resultado['leituras_por_segundo']} leituras/s, "
+            f"{resultado['escritas_por_segundo']} escritas/s, "
+            f"{resultado['erros_banco_ocupado']} erro(s)"
+        )
+        return resultado
@@ -0,0 +1,244 @@
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from core.models import Conta
+from core.utils.cache_relatorios import cache_relatorios
+from core.utils.dados_sinteticos import gerar_usuario
+
+
+def _consumir(resposta):
+    """Lê o corpo inteiro, inclusive de respostas em fluxo, e devolve o tamanho."""
+    if resposta.streaming:
+        tamanho = sum(len(parte) for parte in resposta.streaming_content)
+    else:
+        tamanho = len(resposta.content)
+    resposta.close()
+    if resposta.status_code != 200:
+        raise CommandError(f"Resposta {resposta.status_code} durante a medição.")
+    return tamanho
+
+
+def cenarios(usuario, anos):
+    """Nome → função sem argumentos que executa o cenário uma vez."""
+    cliente = Client()
+    cliente.force_login(usuario)
+
+    hoje = datetime.date.today()
+    periodo = {
+        "data_inicio": f"{hoje - datetime.timedelta(days=anos * 365):%Y-%m-%d}",
+        "data_fim": f"{hoje:%Y-%m-%d}",
+    }
+
+    def relatorio(formato):
+        return lambda: _consumir(
+            cliente.get("/relatorio/", {**periodo, "formato": formato})
+        )
+
+    return {
+        "dashboard": lambda: _consumir(cliente.get("/dashboard/")),
+        "listar_lancamentos": lambda: _consumir(cliente.get("/lancamentos/")),
+        "relatorio_csv": relatorio("csv"),
+        "relatorio_jsonl": relatorio("jsonl"),
+        "relatorio_pdf": relatorio("pdf"),
+        "relatorio_excel": relatorio("excel"),
+        "saldos_contas": lambda: [
+            conta.saldo_total for conta in Conta.objects.filter(usuario=usuario)
+        ],
+    }
+
+
+def medir(funcao, repeticoes):
+    funcao()  # aquecimento: imports, templates, cache de consultas do SQLite
+
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+
+    # Consultas e memória numa execução à parte, para não distorcer o tempo
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as consultas:
+            funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "tempo_mediana_ms": round(statistics.median(tempos) * 1000, 2),
+        "tempo_min_ms": round(min(tempos) * 1000, 2),
+        "tempo_max_ms": round(max(tempos) * 1000, 2),
+        "consultas": len(consultas),
+        "memoria_pico_kb": round(pico / 1024, 1),
+    }
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede tempo, número de consultas e pico de memória das principais views "
+        "em um banco de teste com dados sintéticos; gera JSON para comparar execuções."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tamanhos",
+            default="1000,10000",
+            help="Quantidades de lançamentos, separadas por vírgula.",
+        )
+        parser.add_argument("--repeticoes", type=int, default=5)
+        parser.add_argument("--anos", type=int, default=3)
+        parser.add_argument(
+            "--cenarios", help="Cenários a medir, separados por vírgula (padrão: todos)."
+        )
+        parser.add_argument("--semente", type=int, default=42)
+        parser.add_argument("--saida", help="Arquivo JSON de saída (padrão: stdout).")
+        parser.add_argument(
+            "--comparar", help="JSON de uma execução anterior para comparar tempos."
+        )
+        parser.add_argument(
+            "--tolerancia",
+            type=float,
+            default=20.0,
+            help="Piora percentual da mediana considerada regressão (padrão: 20).",
+        )
+
+    def handle(self, *args, **options):
+        tamanhos = [int(t) for t in options["tamanhos"].split(",")]
+        escolhidos = options["cenarios"].split(",") if options["cenarios"] else None
+
+        resultados = self.executar(tamanhos, escolhidos, options)
+        relatorio = {
+            "ambiente": {
+                "data": datetime.datetime.now().isoformat(timespec="seconds"),
+                "commit": _commit_atual(),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "banco": connection.vendor,
+                "repeticoes": options["repeticoes"],
+            },
+            "resultados": resultados,
+        }
+
+        texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+        if options["saida"]:
+            with open(options["saida"], "w", encoding="utf-8") as arquivo:
+                arquivo.write(texto)
+        else:
+            self.stdout.write(texto)
+
+        if options["comparar"]:
+            self.comparar(resultados, options["comparar"], options["tolerancia"])
+
+    def executar(self, tamanhos, escolhidos, options):
+        # Sempre num banco de teste; no SQLite, em arquivo (e não em memória)
+        # para que os tempos se pareçam com os de produção.
+        if connection.vendor == "sqlite":
+            connection.settings_dict["TEST"]["NAME"] = os.path.join(
+                tempfile.gettempdir(), "fintrack_desempenho.sqlite3"
+            )
+        nome_original = connection.settings_dict["NAME"]
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+        # Páginas e relatórios sempre gerados na hora: sem cache e sem fila.
+        # Sem o DummyCache nos fragmentos, o aquecimento do medir() deixaria o
+        # dashboard em cache e só os acertos seriam medidos.
+        sem_cache = override_settings(
+            CACHES={
+                **settings.CACHES,
+                "template_fragments": {
+                    "BACKEND": "django.core.cache.backends.dummy.DummyCache"
+                },
+                "desempenho": {
+                    "BACKEND": "django.core.cache.backends.dummy.DummyCache"
+                },
+            },
+            RELATORIO_CACHE={"BACKEND": "django", "ALIAS": "desempenho"},
+            RELATORIO_LIMITE_SINCRONO=float("inf"),
+        )
+        sem_cache.enable()
+        cache_relatorios.cache_clear()
+
+        resultados = []
+        try:
+            rng = random.Random(options["semente"])
+            for tamanho in tamanhos:
+                usuario = gerar_usuario(
+                    f"desempenho{tamanho}", rng, lancamentos=tamanho, anos=options["anos"]
+                )
+                for nome, funcao in cenarios(usuario, options["anos"]).items():
+                    if escolhidos and nome not in escolhidos:
+                        continue
+                    medida = medir(funcao, options["repeticoes"])
+                    resultados.append({"cenario": nome, "lancamentos": tamanho, **medida})
+                    self.stderr.write(
+                        f"{nome} ({tamanho}): {medida['tempo_mediana_ms']} ms, "
+                        f"{medida['consultas']} consulta(s)"
+                    )
+        finally:
+            sem_cache.disable()
+            cache_relatorios.cache_clear()
+            connection.creation.destroy_test_db(nome_original, verbosity=0)
+            teardown_test_environment()
+
+        return resultados
+
+    def comparar(self, resultados, caminho, tolerancia):
+        with open(caminho, encoding="utf-8") as arquivo:
+            anteriores = {
+                (r["cenario"], r["lancamentos"]): r
+                for r in json.load(arquivo)["resultados"]
+            }
+
+        regressoes = 0
+        for atual in resultados:
+            anterior = anteriores.get((atual["cenario"], atual["lancamentos"]))
+            if not anterior or not anterior["tempo_mediana_ms"]:
+                continue
+            variacao = (
+                atual["tempo_mediana_ms"] / anterior["tempo_mediana_ms"] - 1
+            ) * 100
+            regressao = variacao > tolerancia
+            regressoes += regressao
+            self.stderr.write(
+                f"{atual['cenario']} ({atual['lancamentos']}): "
+                f"{anterior['tempo_mediana_ms']} → {atual['tempo_mediana_ms']} ms "
+                f"({variacao:+.1f}%), consultas {anterior['consultas']} → "
+                f"{atual['consultas']}" + ("  REGRESSÃO" if regressao else "")
+            )
+
+        if regressoes:
+            raise CommandError(f"{regressoes} cenário(s) acima da tolerância.")
@@ -0,0 +1,179 @@
+import datetime
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+
+from core.management.commands.processar_relatorios import iniciar_processo
+
+
+def reduzir_comprovante(comprovante_id):
+    """Gera a prévia e a miniatura de um comprovante já reservado."""
+    from django.conf import settings
+    from PIL import UnidentifiedImageError
+
+    from core.models import Comprovante, Lancamento
+    from core.utils.comprovantes import digest_do_nome, gerar_reducoes, hash_arquivo
+
+    comprovante = Comprovante.objects.get(pk=comprovante_id)
+    armazenamento = Lancamento._meta.get_field("comprovante").storage
+    config = settings.COMPROVANTES
+
+    try:
+        with armazenamento.open(comprovante.arquivo) as arquivo:
+            digest = digest_do_nome(comprovante.arquivo) or hash_arquivo(arquivo)
+            previa, miniatura = gerar_reducoes(
+                arquivo,
+                config["PREVIA_PX"],
+                config["MINIATURA_PX"],
+                config["QUALIDADE_JPEG"],
+            )
+        comprovante.previa.save(f"{digest}.jpg", previa, save=False)
+        comprovante.miniatura.save(f"{digest}.jpg", miniatura, save=False)
+        status = Comprovante.CONCLUIDO
+    except UnidentifiedImageError:
+        # PDF e afins: sem prévia, as páginas mostram o original
+        status = Comprovante.CONCLUIDO
+    except Exception:
+        status = Comprovante.ERRO
+
+    # update, e não save(), para não sobrescrever a contagem de referências
+    Comprovante.objects.filter(pk=comprovante_id).update(
+        status=status,
+        previa=comprovante.previa.name or "",
+        miniatura=comprovante.miniatura.name or "",
+    )
+    return status
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera em segundo plano as prévias e miniaturas dos comprovantes e apaga "
+        "os arquivos que nenhum lançamento usa mais."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processos",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Quantidade de processos (padrão: número de CPUs).",
+        )
+        parser.add_argument(
+            "--intervalo",
+            type=float,
+            default=2.0,
+            help="Segundos entre consultas à fila quando não há trabalho.",
+        )
+        parser.add_argument(
+            "--uma-vez",
+            action="store_true",
+            help="Processa os comprovantes pendentes, apaga os órfãos e termina.",
+        )
+        parser.add_argument(
+            "--reiniciar-travados",
+            action="store_true",
+            help="Devolve à fila os comprovantes marcados como 'processando' "
+            "(use apenas se nenhum outro worker estiver rodando).",
+        )
+
+    def handle(self, *args, **options):
+        from core.models import Comprovante
+
+        if options["reiniciar_travados"]:
+            devolvidos = Comprovante.objects.filter(
+                status=Comprovante.PROCESSANDO
+            ).update(status=Comprovante.PENDENTE)
+            self.stdout.write(f"{devolvidos} comprovante(s) devolvido(s) à fila.")
+
+        processos = options["processos"]
+        em_andamento = {}
+
+        with ProcessPoolExecutor(
+            max_workers=processos,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=iniciar_processo,
+        ) as pool:
+            while True:
+                for comprovante_id in self.reservar(processos - len(em_andamento)):
+                    futuro = pool.submit(reduzir_comprovante, comprovante_id)
+                    em_andamento[futuro] = comprovante_id
+
+                if not em_andamento:
+                    self.coletar()
+                    if options["uma_vez"]:
+                        break
+                    time.sleep(options["intervalo"])
+                    continue
+
+                concluidos, _ = wait(
+                    em_andamento, timeout=options["intervalo"], return_when=FIRST_COMPLETED
+                )
+                for futuro in concluidos:
+                    comprovante_id = em_andamento.pop(futuro)
+                    try:
+                        status = futuro.result()
+                    except Exception:
+                        Comprovante.objects.filter(pk=comprovante_id).update(
+                            status=Comprovante.ERRO
+                        )
+                        status = Comprovante.ERRO
+                    self.stdout.write(f"Comprovante {comprovante_id}: {status}")
+
+    def reservar(self, quantidade):
+        """Marca até ``quantidade`` comprovantes pendentes como em processamento."""
+        from core.models import Comprovante
+
+        if quantidade <= 0:
+            return []
+
+        pendentes = (
+            Comprovante.objects.filter(status=Comprovante.PENDENTE, referencias__gt=0)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:quantidade]
+        )
+
+        # O update condicional garante que dois workers não peguem o mesmo
+        return [
+            comprovante_id
+            for comprovante_id in pendentes
+            if Comprovante.objects.filter(
+                pk=comprovante_id, status=Comprovante.PENDENTE
+            ).update(status=Comprovante.PROCESSANDO)
+        ]
+
+    def coletar(self):
+        """Apaga arquivos e reduções sem referências há mais que a carência."""
+        from django.conf import settings
+        from django.db import transaction
+        from django.utils import timezone
+
+        from core.models import Comprovante, Lancamento
+
+        armazenamento = Lancamento._meta.get_field("comprovante").storage
+        limite = timezone.now() - datetime.timedelta(
+            seconds=settings.COMPROVANTES["CARENCIA_REMOCAO"]
+        )
+        orfaos = Comprovante.objects.filter(referencias__lte=0, atualizado_em__lt=limite)
+
+        removidos = 0
+        for comprovante in orfaos.iterator():
+            # Condicional: um lançamento pode ter voltado a usar o arquivo. O
+            # arquivo sai na mesma transação, e um envio do mesmo conteúdo
+            # (que renova o registro ao reaproveitá-lo) espera por ela.
+            with transaction.atomic():
+                apagados, _ = Comprovante.objects.filter(
+                    pk=comprovante.pk, referencias__lte=0, atualizado_em__lt=limite
+                ).delete()
+                if not apagados:
+                    continue
+                armazenamento.delete(comprovante.arquivo)
+            for reducao in (comprovante.previa, comprovante.miniatura):
+                if reducao:
+                    reducao.delete(save=False)
+            removidos += 1
+
+        if removidos:
+            self.stdout.write(f"{removidos} comprovante(s) sem uso apagado(s).")
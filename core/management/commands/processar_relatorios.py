@@ -0,0 +1,163 @@
+import datetime
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import django
+from django.core.management.base import BaseCommand
+
+
+# Os processos do pool são criados com "spawn" e configuram o Django do zero,
+# então este módulo não pode importar modelos no topo.
+def iniciar_processo():
+    django.setup()
+
+
+def renderizar_tarefa(tarefa_id):
+    """Gera o arquivo de uma tarefa já reservada e registra o resultado."""
+    from django.core.files import File
+    from django.utils import timezone
+
+    from core.models import TarefaRelatorio
+    from core.utils.cache_relatorios import cache_relatorios, chave_relatorio
+    from core.utils.relatorio_generator import (
+        FORMATOS_ARQUIVO,
+        montar_contexto_relatorio,
+    )
+
+    tarefa = TarefaRelatorio.objects.select_related("usuario").get(pk=tarefa_id)
+    gerador, _, nome_arquivo = FORMATOS_ARQUIVO[tarefa.formato]
+
+    try:
+        chave = chave_relatorio(
+            tarefa.usuario_id, tarefa.data_inicio, tarefa.data_fim, tarefa.formato
+        )
+        context = montar_contexto_relatorio(
+            tarefa.usuario, tarefa.data_inicio, tarefa.data_fim
+        )
+        with gerador(context) as arquivo:
+            cache_relatorios().guardar(chave, arquivo)
+            tarefa.arquivo.save(
+                f"{tarefa.pk}_{nome_arquivo}", File(arquivo), save=False
+            )
+        tarefa.status = TarefaRelatorio.CONCLUIDO
+    except Exception as erro:
+        tarefa.status = TarefaRelatorio.ERRO
+        tarefa.erro = str(erro)
+
+    tarefa.concluido_em = timezone.now()
+    tarefa.save()
+    return tarefa.status
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera em segundo plano os relatórios PDF/Excel enfileirados pelas views "
+        "e apaga os que passaram da validade."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processos",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Quantidade de processos geradores (padrão: número de CPUs).",
+        )
+        parser.add_argument(
+            "--intervalo",
+            type=float,
+            default=2.0,
+            help="Segundos entre consultas à fila quando não há trabalho.",
+        )
+        parser.add_argument(
+            "--uma-vez",
+            action="store_true",
+            help="Processa as tarefas pendentes, apaga as expiradas e termina.",
+        )
+        parser.add_argument(
+            "--reiniciar-travadas",
+            action="store_true",
+            help="Devolve à fila as tarefas marcadas como 'processando' "
+            "(use apenas se nenhum outro worker estiver rodando).",
+        )
+
+    def handle(self, *args, **options):
+        from core.models import TarefaRelatorio
+
+        if options["reiniciar_travadas"]:
+            devolvidas = TarefaRelatorio.objects.filter(
+                status=TarefaRelatorio.PROCESSANDO
+            ).update(status=TarefaRelatorio.PENDENTE)
+            self.stdout.write(f"{devolvidas} tarefa(s) devolvida(s) à fila.")
+
+        processos = options["processos"]
+        em_andamento = {}
+
+        with ProcessPoolExecutor(
+            max_workers=processos,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=iniciar_processo,
+        ) as pool:
+            while True:
+                for tarefa_id in self.reservar(processos - len(em_andamento)):
+                    em_andamento[pool.submit(renderizar_tarefa, tarefa_id)] = tarefa_id
+
+                if not em_andamento:
+                    self.expirar()
+                    if options["uma_vez"]:
+                        break
+                    time.sleep(options["intervalo"])
+                    continue
+
+                concluidas, _ = wait(
+                    em_andamento, timeout=options["intervalo"], return_when=FIRST_COMPLETED
+                )
+                for futuro in concluidas:
+                    tarefa_id = em_andamento.pop(futuro)
+                    try:
+                        status = futuro.result()
+                    except Exception as erro:
+                        TarefaRelatorio.objects.filter(pk=tarefa_id).update(
+                            status=TarefaRelatorio.ERRO, erro=str(erro)
+                        )
+                        status = TarefaRelatorio.ERRO
+                    self.stdout.write(f"Tarefa {tarefa_id}: {status}")
+
+    def reservar(self, quantidade):
+        """Marca até ``quantidade`` tarefas pendentes como em processamento."""
+        from core.models import TarefaRelatorio
+
+        if quantidade <= 0:
+            return []
+
+        pendentes = TarefaRelatorio.objects.filter(
+            status=TarefaRelatorio.PENDENTE
+        ).order_by("criado_em").values_list("pk", flat=True)[:quantidade]
+
+        # O update condicional garante que dois workers não peguem a mesma tarefa
+        return [
+            tarefa_id
+            for tarefa_id in pendentes
+            if TarefaRelatorio.objects.filter(
+                pk=tarefa_id, status=TarefaRelatorio.PENDENTE
+            ).update(status=TarefaRelatorio.PROCESSANDO)
+        ]
+
+    def expirar(self):
+        """Apaga as tarefas (e os arquivos) concluídas há mais que a validade."""
+        from django.conf import settings
+        from django.utils import timezone
+
+        from core.models import TarefaRelatorio
+
+        limite = timezone.now() - datetime.timedelta(
+            seconds=settings.RELATORIO_VALIDADE_TAREFA
+        )
+        # Os arquivos saem no post_delete de cada tarefa (core.signals)
+        apagadas, _ = TarefaRelatorio.objects.filter(
+            status__in=[TarefaRelatorio.CONCLUIDO, TarefaRelatorio.ERRO],
+            concluido_em__lt=limite,
+        ).delete()
+        if apagadas:
+            self.stdout.write(f"{apagadas} tarefa(s) expirada(s) apagada(s).")
@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import Lancamento, ResumoMensal
+from core.utils.agregacoes import centavos, resumos_mensais
+
+
+CHAVE = ("usuario_id", "conta_id", "categoria_id", "mes")
+
+
+class Command(BaseCommand):
+    help = "Reconstrói os resumos mensais (ResumoMensal) a partir dos lançamentos."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verificar",
+            action="store_true",
+            help="Apenas compara os resumos gravados com o histórico, sem alterar nada.",
+        )
+
+    def handle(self, *args, **options):
+        if options["verificar"]:
+            divergentes = self.divergencias()
+            for chave, gravado, esperado in divergentes:
+                self.stderr.write(f"{chave}: gravado {gravado}, esperado {esperado}")
+            if divergentes:
+                raise CommandError(f"{len(divergentes)} resumo(s) divergente(s).")
+            self.stdout.write(self.style.SUCCESS("Todos os resumos conferem."))
+            return
+
+        with transaction.atomic():
+            ResumoMensal.objects.all().delete()
+            criados = ResumoMensal.objects.bulk_create(
+                (
+                    ResumoMensal(
+                        **{campo: linha[campo] for campo in CHAVE},
+                        receitas=centavos(linha["receitas"]),
+                        despesas=centavos(linha["despesas"]),
+                    )
+                    for linha in resumos_mensais(Lancamento.objects.all()).iterator()
+                ),
+                batch_size=500,
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{len(criados)} resumo(s) mensal(is) gerado(s).")
+        )
+
+    def divergencias(self):
+        def indexar(linhas):
+            return {
+                tuple(linha[campo] for campo in CHAVE): (
+                    centavos(linha["receitas"]),
+                    centavos(linha["despesas"]),
+                )
+                for linha in linhas
+                if linha["receitas"] or linha["despesas"]
+            }
+
+        esperados = indexar(resumos_mensais(Lancamento.objects.all()))
+        gravados = indexar(ResumoMensal.objects.values(*CHAVE, "receitas", "despesas"))
+
+        return [
+            (chave, gravados.get(chave), esperados.get(chave))
+            for chave in esperados.keys() | gravados.keys()
+            if gravados.get(chave) != esperados.get(chave)
+        ]
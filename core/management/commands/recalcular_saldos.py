@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import Conta, Lancamento, VersaoDados
+from core.utils.agregacoes import totais_por_conta
+
+
+class Command(BaseCommand):
+    help = "Recalcula os totais de receitas e despesas de cada conta a partir dos lançamentos."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verificar",
+            action="store_true",
+            help="Apenas compara os totais gravados com o histórico, sem alterar nada.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            divergentes = self.divergencias()
+
+            if options["verificar"]:
+                for conta, esperado in divergentes:
+                    self.stderr.write(
+                        f"Conta {conta.pk} ({conta.nome}): gravado "
+                        f"{conta.total_receitas}/{conta.total_despesas}, "
+                        f"esperado {esperado[0]}/{esperado[1]}"
+                    )
+                if divergentes:
+                    raise CommandError(
+                        f"{len(divergentes)} conta(s) com saldo divergente."
+                    )
+                self.stdout.write(self.style.SUCCESS("Todos os saldos conferem."))
+                return
+
+            for conta, (receitas, despesas) in divergentes:
+                conta.total_receitas = receitas
+                conta.total_despesas = despesas
+            Conta.objects.bulk_update(
+                [conta for conta, _ in divergentes],
+                Conta.CAMPOS_RAZAO,
+                batch_size=500,
+            )
+            # bulk_update não dispara sinais: invalida os caches de quem mudou
+            for usuario_id in {conta.usuario_id for conta, _ in divergentes}:
+                VersaoDados.incrementar(usuario_id)
+
+            if self.divergencias():
+                raise CommandError("Os saldos continuam divergentes após o recálculo.")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{len(divergentes)} conta(s) corrigida(s).")
+        )
+
+    def divergencias(self):
+        totais = totais_por_conta(Lancamento.objects.all())
+        divergentes = []
+        for conta in Conta.objects.select_for_update().iterator():
+            esperado = totais.get(conta.pk, (0, 0))
+            if (conta.total_receitas, conta.total_despesas) != esperado:
+                divergentes.append((conta, esperado))
+        return divergentes
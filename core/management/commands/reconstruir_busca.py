@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core.models import Lancamento
+from core.utils.busca import instalar_indice_busca
+
+
+class Command(BaseCommand):
+    help = (
+        "Recria o índice de busca das descrições (FTS5 no SQLite, GIN no "
+        "PostgreSQL) e o preenche a partir dos lançamentos. Use depois de "
+        "restaurar um backup ou de uma migração que reconstrua a tabela de "
+        "lançamentos no SQLite, o que apaga os triggers."
+    )
+
+    def handle(self, *args, **options):
+        instalar_indice_busca(connection)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Índice de busca pronto ({connection.vendor}, "
+                f"{Lancamento.objects.count()} lançamento(s))."
+            )
+        )
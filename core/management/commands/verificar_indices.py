@@ -0,0 +1,205 @@
+import datetime
+import re
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Categoria, Conta, Lancamento
+from core.utils.agregacoes import (
+    anexar_saldos,
+    resumo_financeiro,
+    serie_saldos,
+    totais_por_conta,
+)
+from core.utils.busca import buscar
+from core.utils.paginacao import paginar_por_cursor
+from core.utils.relatorio_generator import iterar_linhas, montar_contexto_relatorio
+from core.views import LANCAMENTOS_POR_PAGINA
+
+
+# Linhas do EXPLAIN QUERY PLAN (SQLite) ou do EXPLAIN (PostgreSQL) que indicam
+# leitura da tabela inteira. A tabela FTS5 da busca aparece como "SCAN ...
+# VIRTUAL TABLE", mas a busca nela é pelo índice invertido.
+VARREDURA_COMPLETA = {
+    "sqlite": re.compile(r"\bSCAN (?P<tabela>core_\w+)\b(?! USING| VIRTUAL TABLE)"),
+    "postgresql": re.compile(r"\bSeq Scan on (?P<tabela>core_\w+)"),
+}
+
+
+def consultas_das_views(usuario, conta, categoria):
+    """
+    (nome, função) que repetem o trabalho de cada view com os mesmos helpers
+    (paginar_por_cursor, anexar_saldos, buscar, montar_contexto_relatorio...)
+    e filtros típicos. As consultas são as que esses helpers executam, e não
+    cópias delas.
+    """
+    hoje = datetime.date.today()
+    inicio = hoje.replace(day=1)
+    cursor = f"{hoje:%Y-%m-%d}_{2**31}"
+    lancamentos = Lancamento.objects.filter(usuario=usuario).select_related(
+        "categoria", "conta"
+    )
+
+    def pagina(queryset, **cursores):
+        itens, _, _ = paginar_por_cursor(
+            queryset, tamanho=LANCAMENTOS_POR_PAGINA, **cursores
+        )
+        return itens
+
+    def pagina_com_saldo(queryset, conta=None, **cursores):
+        return anexar_saldos(pagina(queryset, **cursores), usuario, conta=conta)
+
+    def relatorio(inicio, fim):
+        contexto = montar_contexto_relatorio(usuario, inicio, fim)
+        return list(iterar_linhas(contexto["lancamentos"]))
+
+    periodo = {"data__gte": inicio, "data__lte": hoje}
+    return [
+        (
+            "dashboard: contas",
+            lambda: resumo_financeiro(list(Conta.objects.filter(usuario=usuario))),
+        ),
+        (
+            "dashboard: últimos lançamentos",
+            lambda: list(
+                Lancamento.objects.filter(usuario=usuario)
+                .select_related("categoria")
+                .order_by("-data")[:5]
+            ),
+        ),
+        ("listar_lancamentos", lambda: pagina_com_saldo(lancamentos)),
+        (
+            "listar_lancamentos: página seguinte",
+            lambda: pagina_com_saldo(lancamentos, apos=cursor),
+        ),
+        (
+            "listar_lancamentos: página anterior",
+            lambda: pagina_com_saldo(lancamentos, antes=f"{inicio:%Y-%m-%d}_0"),
+        ),
+        (
+            "listar_lancamentos: período",
+            lambda: pagina_com_saldo(lancamentos.filter(**periodo)),
+        ),
+        (
+            "listar_lancamentos: conta",
+            lambda: pagina_com_saldo(lancamentos.filter(conta=conta), conta=conta),
+        ),
+        (
+            "listar_lancamentos: categoria",
+            lambda: pagina(lancamentos.filter(categoria=categoria)),
+        ),
+        (
+            "listar_lancamentos: tipo",
+            lambda: pagina(lancamentos.filter(tipo="Despesa")),
+        ),
+        (
+            "listar_lancamentos: categoria e período",
+            lambda: pagina(lancamentos.filter(categoria=categoria, **periodo)),
+        ),
+        (
+            "listar_lancamentos: tipo e período",
+            lambda: pagina(lancamentos.filter(tipo="Receita", **periodo)),
+        ),
+        (
+            "listar_lancamentos: busca",
+            lambda: list(
+                buscar(lancamentos, usuario, "mercado").order_by(
+                    "-relevancia", "-data", "-pk"
+                )[:LANCAMENTOS_POR_PAGINA]
+            ),
+        ),
+        (
+            "listar_lancamentos: busca por data",
+            lambda: pagina(buscar(lancamentos, usuario, "mercado")),
+        ),
+        ("listar_categorias", lambda: list(Categoria.objects.filter(usuario=usuario))),
+        ("gerar_relatorio: meses inteiros", lambda: relatorio(inicio, hoje)),
+        (
+            "gerar_relatorio: dias avulsos",
+            lambda: relatorio((inicio - datetime.timedelta(days=1)).replace(day=15), hoje),
+        ),
+        ("saldos_por_periodo", lambda: serie_saldos(usuario, inicio, hoje)),
+        (
+            "saldo por conta",
+            lambda: totais_por_conta(Lancamento.objects.filter(conta=conta)),
+        ),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Roda EXPLAIN nas consultas das views e falha se alguma delas "
+        "varrer uma tabela inteira em vez de usar um índice."
+    )
+
+    def handle(self, *args, **options):
+        padrao = VARREDURA_COMPLETA.get(connection.vendor)
+        if padrao is None:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Banco '{connection.vendor}' não suportado; nada verificado."
+                )
+            )
+            return
+
+        # Um usuário provisório com um lançamento, para os helpers percorrerem
+        # todos os caminhos; tudo é desfeito no fim
+        with transaction.atomic():
+            falhas = self.verificar(padrao, *self.criar_exemplo())
+            transaction.set_rollback(True)
+
+        if falhas:
+            raise CommandError(f"{len(falhas)} consulta(s) sem índice adequado.")
+        self.stdout.write(self.style.SUCCESS("Todas as consultas usam índices."))
+
+    def criar_exemplo(self):
+        usuario = User.objects.create(username="verificar_indices")
+        conta = Conta.objects.create(nome="Conta", usuario=usuario)
+        categoria = Categoria.objects.create(nome="Mercado", tipo="Despesa", usuario=usuario)
+        Lancamento.objects.create(
+            usuario=usuario,
+            conta=conta,
+            categoria=categoria,
+            tipo="Despesa",
+            descricao="Mercado",
+            valor=1,
+            data=datetime.date.today(),
+        )
+        return usuario, conta, categoria
+
+    def verificar(self, padrao, usuario, conta, categoria):
+        if connection.vendor == "postgresql":
+            # Com tabelas pequenas o Postgres prefere Seq Scan mesmo com um
+            # índice disponível; desligá-lo mostra se o índice serve.
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+        falhas = []
+        for nome, executar in consultas_das_views(usuario, conta, categoria):
+            with CaptureQueriesContext(connection) as consultas:
+                executar()
+            planos = [
+                self.explicar(consulta["sql"])
+                for consulta in consultas.captured_queries
+                if consulta["sql"].lstrip().upper().startswith("SELECT")
+            ]
+            tabelas = [m.group("tabela") for plano in planos for m in padrao.finditer(plano)]
+            if not planos:
+                falhas.append(nome)
+                self.stderr.write(f"[FALHA] {nome}: nenhuma consulta executada")
+            elif tabelas:
+                falhas.append(nome)
+                self.stderr.write(f"[FALHA] {nome}: varredura em {', '.join(tabelas)}")
+                for plano in planos:
+                    self.stderr.write(f"    {plano}")
+            else:
+                self.stdout.write(f"[ok] {nome}")
+        return falhas
+
+    def explicar(self, sql):
+        prefixo = "EXPLAIN QUERY PLAN" if connection.vendor == "sqlite" else "EXPLAIN"
+        with connection.cursor() as cursor:
+            cursor.execute(f"{prefixo} {sql}")
+            return "\n    ".join(str(linha[-1]) for linha in cursor.fetchall())
@@ -0,0 +1,35 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class ArquivosEstaticosMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise que também roda na pilha assíncrona.
+
+    O WhiteNoise só declara suporte síncrono, e um único middleware síncrono
+    obriga o Django a passar toda requisição ASGI (views assíncronas
+    inclusive) por uma thread. Localizar o arquivo é uma busca em
+    dicionário, sem E/S, então pode rodar direto no event loop.
+    """
+
+    async_capable = True
+
+    def __init__(self, get_response, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.assincrono = iscoroutinefunction(get_response)
+        if self.assincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.assincrono:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            arquivo = self.find_file(request.path_info)
+        else:
+            arquivo = self.files.get(request.path_info)
+        if arquivo is not None:
+            return self.serve(arquivo, request)
+        return await self.get_response(request)
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:06
+
+from django.db import migrations, models
+from django.db.models import Q, Sum
+
+
+def preencher_totais(apps, schema_editor):
+    Conta = apps.get_model('core', 'Conta')
+    Lancamento = apps.get_model('core', 'Lancamento')
+
+    linhas = (
+        Lancamento.objects.order_by()
+        .values('conta_id')
+        .annotate(
+            receitas=Sum('valor', filter=Q(tipo='Receita')),
+            despesas=Sum('valor', filter=Q(tipo='Despesa')),
+        )
+    )
+    for linha in linhas:
+        Conta.objects.filter(pk=linha['conta_id']).update(
+            total_receitas=linha['receitas'] or 0,
+            total_despesas=linha['despesas'] or 0,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_alter_categoria_icone_alter_conta_saldo_inicial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conta',
+            name='total_despesas',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='conta',
+            name='total_receitas',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=14),
+        ),
+        migrations.RunPython(preencher_totais, migrations.RunPython.noop),
+    ]
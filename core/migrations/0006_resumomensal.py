@@ -0,0 +1,64 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Q, Sum
+from django.db.models.functions import TruncMonth
+
+
+def preencher_resumos(apps, schema_editor):
+    Lancamento = apps.get_model('core', 'Lancamento')
+    ResumoMensal = apps.get_model('core', 'ResumoMensal')
+
+    linhas = (
+        Lancamento.objects.order_by()
+        .annotate(mes=TruncMonth('data'))
+        .values('usuario_id', 'conta_id', 'categoria_id', 'mes')
+        .annotate(
+            receitas=Sum('valor', filter=Q(tipo='Receita')),
+            despesas=Sum('valor', filter=Q(tipo='Despesa')),
+        )
+    )
+    ResumoMensal.objects.bulk_create(
+        (
+            ResumoMensal(
+                usuario_id=linha['usuario_id'],
+                conta_id=linha['conta_id'],
+                categoria_id=linha['categoria_id'],
+                mes=linha['mes'],
+                receitas=linha['receitas'] or 0,
+                despesas=linha['despesas'] or 0,
+            )
+            for linha in linhas
+        ),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_conta_totais'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumoMensal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField()),
+                ('receitas', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('despesas', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('categoria', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.categoria')),
+                ('conta', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.conta')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['usuario', 'mes'], name='core_resumo_usuario_1a21cb_idx')],
+                'constraints': [models.UniqueConstraint(fields=('usuario', 'conta', 'categoria', 'mes'), name='resumo_mensal_unico')],
+            },
+        ),
+        migrations.RunPython(preencher_resumos, migrations.RunPython.noop),
+    ]
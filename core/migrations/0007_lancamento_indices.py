@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_resumomensal'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lancamento',
+            index=models.Index(fields=['usuario', 'data'], name='core_lancam_usuario_684ae9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lancamento',
+            index=models.Index(fields=['usuario', 'tipo', 'data'], name='core_lancam_usuario_26c6e2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lancamento',
+            index=models.Index(fields=['usuario', 'categoria', 'data'], name='core_lancam_usuario_9fbf32_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lancamento',
+            index=models.Index(fields=['conta', 'tipo'], name='core_lancam_conta_i_b4d898_idx'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:22
+
+import re
+import unicodedata
+from collections import Counter
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Cópia de core.utils.texto.palavras na data desta migração: a migração não
+# pode mudar de comportamento se o tokenizador do app mudar depois.
+_PALAVRA = re.compile(r'[^\W\d_]{3,}')
+
+
+def palavras(texto):
+    texto = unicodedata.normalize('NFKD', ' '.join((texto or '').split()).casefold())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return frozenset(palavra[:60] for palavra in _PALAVRA.findall(texto))
+
+
+def preencher_tokens(apps, schema_editor):
+    Lancamento = apps.get_model('core', 'Lancamento')
+    TokenCategoria = apps.get_model('core', 'TokenCategoria')
+
+    contagem = Counter()
+    rotulos = Lancamento.objects.values_list('usuario_id', 'categoria_id', 'descricao')
+    for usuario_id, categoria_id, descricao in rotulos.iterator():
+        for token in palavras(descricao):
+            contagem[(usuario_id, token, categoria_id)] += 1
+
+    TokenCategoria.objects.bulk_create(
+        (
+            TokenCategoria(
+                usuario_id=usuario_id,
+                token=token,
+                categoria_id=categoria_id,
+                ocorrencias=ocorrencias,
+            )
+            for (usuario_id, token, categoria_id), ocorrencias in contagem.items()
+        ),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_versaodados'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TokenCategoria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=60)),
+                ('ocorrencias', models.IntegerField(default=0)),
+                ('categoria', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.categoria')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('usuario', 'token', 'categoria'), name='token_categoria_unico')],
+            },
+        ),
+        migrations.RunPython(preencher_tokens, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:51
+
+import core.utils.comprovantes
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def contar_referencias(apps, schema_editor):
+    Lancamento = apps.get_model('core', 'Lancamento')
+    Comprovante = apps.get_model('core', 'Comprovante')
+
+    # Arquivos enviados antes do armazenamento por conteúdo mantêm o nome;
+    # deduplicar_comprovantes os migra depois
+    referencias = (
+        Lancamento.objects.exclude(comprovante__isnull=True)
+        .exclude(comprovante='')
+        .values('comprovante')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    Comprovante.objects.bulk_create(
+        (
+            Comprovante(arquivo=linha['comprovante'], referencias=linha['total'])
+            for linha in referencias.iterator()
+        ),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_tokencategoria"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="lancamento",
+            name="comprovante",
+            field=models.FileField(
+                blank=True,
+                null=True,
+                storage=core.utils.comprovantes.armazenamento_comprovantes,
+                upload_to="comprovantes/",
+            ),
+        ),
+        migrations.CreateModel(
+            name="Comprovante",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("arquivo", models.CharField(max_length=255, unique=True)),
+                ("referencias", models.IntegerField(default=0)),
+                (
+                    "atualizado_em",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pendente", "Pendente"),
+                            ("processando", "Processando"),
+                            ("concluido", "Concluído"),
+                            ("erro", "Erro"),
+                        ],
+                        db_index=True,
+                        default="pendente",
+                        max_length=12,
+                    ),
+                ),
+                (
+                    "previa",
+                    models.FileField(blank=True, upload_to="comprovantes/previas/"),
+                ),
+                (
+                    "miniatura",
+                    models.FileField(blank=True, upload_to="comprovantes/miniaturas/"),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["referencias", "atualizado_em"],
+                        name="core_compro_referen_68b349_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(contar_referencias, migrations.RunPython.noop),
+    ]
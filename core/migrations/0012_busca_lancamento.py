@@ -0,0 +1,108 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:06
+
+import core.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+# SQL de core.utils.busca na data desta migração, copiado para a migração não
+# mudar junto com o app. DocumentoFTS continua importado de core.models, como
+# qualquer campo próprio referenciado pelo estado das migrações.
+TABELA_FTS = "core_lancamento_busca"
+
+INSTALAR = {
+    "sqlite": [
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_FTS} USING fts5(
+            descricao, usuario_id,
+            content='core_lancamento', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """,
+        f"INSERT INTO {TABELA_FTS}({TABELA_FTS}, rank) VALUES ('rank', 'bm25(1.0, 0.0)')",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_ai AFTER INSERT ON core_lancamento BEGIN
+            INSERT INTO {TABELA_FTS}(rowid, descricao, usuario_id)
+            VALUES (new.id, new.descricao, new.usuario_id);
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_ad AFTER DELETE ON core_lancamento BEGIN
+            INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, descricao, usuario_id)
+            VALUES ('delete', old.id, old.descricao, old.usuario_id);
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_au
+        AFTER UPDATE OF descricao, usuario_id ON core_lancamento BEGIN
+            INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, descricao, usuario_id)
+            VALUES ('delete', old.id, old.descricao, old.usuario_id);
+            INSERT INTO {TABELA_FTS}(rowid, descricao, usuario_id)
+            VALUES (new.id, new.descricao, new.usuario_id);
+        END
+        """,
+        f"INSERT INTO {TABELA_FTS}({TABELA_FTS}) VALUES ('rebuild')",
+    ],
+    "postgresql": [
+        f"""
+        CREATE INDEX IF NOT EXISTS {TABELA_FTS}_gin ON core_lancamento
+        USING gin (to_tsvector('simple'::regconfig, COALESCE(descricao, '')))
+        """,
+    ],
+}
+
+REMOVER = {
+    "sqlite": [
+        f"DROP TRIGGER IF EXISTS {TABELA_FTS}_ai",
+        f"DROP TRIGGER IF EXISTS {TABELA_FTS}_ad",
+        f"DROP TRIGGER IF EXISTS {TABELA_FTS}_au",
+        f"DROP TABLE IF EXISTS {TABELA_FTS}",
+    ],
+    "postgresql": [f"DROP INDEX IF EXISTS {TABELA_FTS}_gin"],
+}
+
+
+def executar(comandos):
+    def operacao(apps, schema_editor):
+        connection = schema_editor.connection
+        with connection.cursor() as cursor:
+            for sql in comandos.get(connection.vendor, []):
+                cursor.execute(sql)
+
+    return operacao
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_comprovante"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BuscaLancamento",
+            fields=[
+                (
+                    "lancamento",
+                    models.OneToOneField(
+                        db_column="rowid",
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="busca",
+                        serialize=False,
+                        to="core.lancamento",
+                    ),
+                ),
+                (
+                    "documento",
+                    core.models.DocumentoFTS(db_column="core_lancamento_busca"),
+                ),
+                ("rank", models.FloatField()),
+            ],
+            options={
+                "db_table": "core_lancamento_busca",
+                "managed": False,
+            },
+        ),
+        migrations.RunPython(executar(INSTALAR), executar(REMOVER)),
+    ]
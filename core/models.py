@@ -1,5 +1,16 @@
-from django.db import models
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import Decimal
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+from core.utils.comprovantes import armazenamento_comprovantes
+from core.utils.icones import icone_para
+from core.utils.texto import palavras
 
 
 # ----------------------------------------
@@ -10,26 +21,33 @@ class Conta(models.Model):
     saldo_inicial = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     usuario = models.ForeignKey(User, on_delete=models.CASCADE)
 
+    # Totais acumulados dos lançamentos, mantidos por registrar_movimentos()
+    total_receitas = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0, editable=False
+    )
+    total_despesas = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0, editable=False
+    )
+
+    CAMPOS_RAZAO = ("total_receitas", "total_despesas")
+
+    def save(self, *args, **kwargs):
+        # Os totais só mudam via registrar_movimentos(); um save comum de uma
+        # instância carregada antes não pode sobrescrevê-los.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                campo.name
+                for campo in self._meta.concrete_fields
+                if not campo.primary_key and campo.name not in self.CAMPOS_RAZAO
+            ]
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.nome
 
     @property
     def saldo_total(self):
-        receitas = (
-            self.lancamento_set.filter(tipo="Receita").aggregate(
-                total=models.Sum("valor")
-            )["total"]
-            or 0
-        )
-
-        despesas = (
-            self.lancamento_set.filter(tipo="Despesa").aggregate(
-                total=models.Sum("valor")
-            )["total"]
-            or 0
-        )
-
-        return self.saldo_inicial + receitas - despesas
+        return self.saldo_inicial + self.total_receitas - self.total_despesas
 
 
 # ----------------------------------------
@@ -45,94 +63,8 @@ class Categoria(models.Model):
     usuario = models.ForeignKey(User, on_delete=models.CASCADE)
 
     def save(self, *args, **kwargs):
-        nome_lower = self.nome.lower()
-
-        icones_por_palavra = {
-            # Despesas - Contas e Serviços
-            "luz": "bi bi-lightbulb-fill",
-            "energia": "bi bi-lightning-charge-fill",
-            "internet": "bi bi-wifi",
-            "telefone": "bi bi-phone",
-            "água": "bi bi-droplet-half",
-            "netflix": "bi bi-tv-fill",
-            "spotify": "bi bi-music-note-beamed",
-            "amazon": "bi bi-box-seam-fill",
-            "prime": "bi bi-box-seam-fill",
-            # Despesas - Casa
-            "mercado": "bi bi-basket-fill",
-            "supermercado": "bi bi-cart4",
-            "aluguel": "bi bi-house-door-fill",
-            "condomínio": "bi bi-building",
-            "limpeza": "bi bi-bucket-fill",
-            "móveis": "bi bi-couch",
-            "eletrodoméstico": "bi bi-plug-fill",
-            # Transporte
-            "transporte": "bi bi-truck-front",
-            "carro": "bi bi-car-front-fill",
-            "uber": "bi bi-taxi-front-fill",
-            "gasolina": "bi bi-fuel-pump-fill",
-            "combustível": "bi bi-fuel-pump-fill",
-            "passagem": "bi bi-ticket-detailed",
-            "ônibus": "bi bi-bus-front-fill",
-            "viagem": "bi bi-airplane-fill",
-            # Alimentação
-            "comida": "bi bi-cup-straw",
-            "lanches": "bi bi-cup-hot-fill",
-            "restaurante": "bi bi-egg-fried",
-            "pizza": "bi bi-pie-chart-fill",
-            "hamburguer": "bi bi-cup-hot-fill",
-            "delivery": "bi bi-truck",
-            # Saúde
-            "remédio": "bi bi-capsule-pill",
-            "farmácia": "bi bi-capsule",
-            "médico": "bi bi-heart-pulse-fill",
-            "plano": "bi bi-card-checklist",
-            "hospital": "bi bi-hospital-fill",
-            # Renda / Receita
-            "salário": "bi bi-cash-stack",
-            "freela": "bi bi-briefcase-fill",
-            "pix": "bi bi-qr-code-scan",
-            "renda": "bi bi-graph-up",
-            "venda": "bi bi-cart-check-fill",
-            "bônus": "bi bi-award-fill",
-            # Bancos e Pagamentos
-            "banco": "bi bi-bank",
-            "transferência": "bi bi-arrow-left-right",
-            "cartao": "bi bi-credit-card-2-back-fill",
-            "cartão": "bi bi-credit-card-2-back-fill",
-            "boleto": "bi bi-receipt",
-            "nubank": "bi bi-credit-card",
-            "inter": "bi bi-bank",
-            "santander": "bi bi-building-fill",
-            "bradesco": "bi bi-piggy-bank-fill",
-            "itau": "bi bi-wallet2",
-            # Poupança e Finanças
-            "carteira": "bi bi-wallet-fill",
-            "poupança": "bi bi-piggy-bank-fill",
-            "investimento": "bi bi-bar-chart-fill",
-            "cripto": "bi bi-currency-bitcoin",
-            "ações": "bi bi-graph-up-arrow",
-            # Diversos
-            "outro": "bi bi-tag-fill",
-            "roupas": "bi bi-shop-window",
-            "presentes": "bi bi-gift-fill",
-            "academia": "bi bi-dumbbell",
-            "pets": "bi bi-paw-fill",
-            "filmes": "bi bi-film",
-            "estudos": "bi bi-book-half",
-            "educação": "bi bi-mortarboard-fill",
-            "curso": "bi bi-easel-fill",
-            "eventos": "bi bi-calendar-event-fill",
-        }
-
         if not self.icone:
-            for palavra, icone in icones_por_palavra.items():
-                if palavra in nome_lower:
-                    self.icone = icone
-                    break
-
-            if not self.icone:
-                self.icone = "bi bi-cash-coin"  # Padrão
+            self.icone = icone_para(self.nome)
 
         super().save(*args, **kwargs)
 
@@ -161,9 +93,526 @@ class Lancamento(models.Model):
 
     data = models.DateField()
 
-    comprovante = models.FileField(upload_to="comprovantes/", null=True, blank=True)
+    # Guardado pelo conteúdo (core.utils.comprovantes): lançamentos com o
+    # mesmo arquivo compartilham o nome, contado em Comprovante
+    comprovante = models.FileField(
+        upload_to="comprovantes/",
+        storage=armazenamento_comprovantes,
+        null=True,
+        blank=True,
+    )
 
     criado_em = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["usuario", "data"]),
+            models.Index(fields=["usuario", "tipo", "data"]),
+            models.Index(fields=["usuario", "categoria", "data"]),
+            models.Index(fields=["conta", "tipo"]),
+        ]
+
+    CAMPOS_MOVIMENTO = (
+        "usuario_id",
+        "conta_id",
+        "categoria_id",
+        "tipo",
+        "valor",
+        "data",
+    )
+
+    def movimento(self):
+        """Campos do lançamento que afetam os totais da conta e os resumos."""
+        return {
+            "usuario_id": self.usuario_id,
+            "conta_id": self.conta_id,
+            "categoria_id": self.categoria_id,
+            "tipo": self.tipo,
+            "valor": Decimal(str(self.valor)),
+            "data": self._meta.get_field("data").to_python(self.data),
+        }
+
+    def rotulo(self):
+        """Par (descrição, categoria) que alimenta o índice de sugestões."""
+        return (self.usuario_id, self.categoria_id, self.descricao)
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            anterior = rotulo_anterior = None
+            if not self._state.adding:
+                anterior = (
+                    Lancamento.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values(*self.CAMPOS_MOVIMENTO, "descricao", "comprovante")
+                    .first()
+                )
+            comprovante_anterior = None
+            if anterior:
+                rotulo_anterior = (
+                    anterior["usuario_id"],
+                    anterior["categoria_id"],
+                    anterior.pop("descricao"),
+                )
+                comprovante_anterior = anterior.pop("comprovante") or None
+
+            super().save(*args, **kwargs)
+
+            atual = self.movimento()
+            if anterior != atual:
+                if anterior:
+                    registrar_movimentos([anterior], sinal=-1)
+                registrar_movimentos([atual])
+
+            if rotulo_anterior != self.rotulo():
+                if rotulo_anterior:
+                    registrar_rotulos([rotulo_anterior], sinal=-1)
+                registrar_rotulos([self.rotulo()])
+
+            comprovante = self.comprovante.name or None
+            if comprovante_anterior != comprovante:
+                registrar_comprovantes([comprovante_anterior], sinal=-1)
+                registrar_comprovantes([comprovante])
+
     def __str__(self):
         return f"{self.tipo}: {self.descricao} - R$ {self.valor}"
+
+
+# ----------------------------------------
+#   BUSCA TEXTUAL (somente SQLite)
+# ----------------------------------------
+class DocumentoFTS(models.TextField):
+    """Coluna oculta de uma tabela FTS5, com o nome da tabela, usada no MATCH."""
+
+
+@DocumentoFTS.register_lookup
+class Corresponde(models.Lookup):
+    lookup_name = "corresponde"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", [*lhs_params, *rhs_params]
+
+
+class BuscaLancamento(models.Model):
+    """
+    Índice FTS5 das descrições, criado e mantido por triggers (ver
+    core.utils.busca); o Django só o lê, para juntar a busca aos filtros de
+    Lancamento. No PostgreSQL a busca usa um índice GIN e esta tabela não
+    existe.
+    """
+
+    lancamento = models.OneToOneField(
+        Lancamento,
+        primary_key=True,
+        db_column="rowid",
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        related_name="busca",
+    )
+    documento = DocumentoFTS(db_column="core_lancamento_busca")
+    rank = models.FloatField()  # bm25: quanto menor, mais relevante
+
+    class Meta:
+        managed = False
+        db_table = "core_lancamento_busca"
+
+
+# ----------------------------------------
+#   RESUMO MENSAL
+# ----------------------------------------
+class ResumoMensal(models.Model):
+    """Receitas e despesas de um mês, por conta e categoria."""
+
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE)
+    conta = models.ForeignKey(Conta, on_delete=models.CASCADE)
+    categoria = models.ForeignKey(Categoria, on_delete=models.CASCADE)
+
+    mes = models.DateField()  # sempre o dia 1º do mês
+
+    receitas = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    despesas = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["usuario", "conta", "categoria", "mes"],
+                name="resumo_mensal_unico",
+            )
+        ]
+        indexes = [models.Index(fields=["usuario", "mes"])]
+
+    def __str__(self):
+        return f"{self.mes:%m/%Y} - {self.conta} / {self.categoria}"
+
+
+# ----------------------------------------
+#   ÍNDICE DE DESCRIÇÕES (sugestão de categoria)
+# ----------------------------------------
+class TokenCategoria(models.Model):
+    """Quantos lançamentos de uma categoria têm a palavra na descrição."""
+
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE)
+    categoria = models.ForeignKey(Categoria, on_delete=models.CASCADE)
+    token = models.CharField(max_length=60)
+    ocorrencias = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["usuario", "token", "categoria"],
+                name="token_categoria_unico",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.token} → {self.categoria} ({self.ocorrencias})"
+
+
+# ----------------------------------------
+#   VERSÃO DOS DADOS DO USUÁRIO
+# ----------------------------------------
+class VersaoDados(models.Model):
+    """
+    Contador incrementado a cada alteração em lançamentos, contas ou
+    categorias do usuário; serve de chave para os caches derivados.
+    """
+
+    usuario = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True)
+    versao = models.PositiveBigIntegerField(default=0)
+
+    @classmethod
+    def atual(cls, usuario_id):
+        versao = (
+            cls.objects.filter(usuario_id=usuario_id)
+            .values_list("versao", flat=True)
+            .first()
+        )
+        return versao or 0
+
+    @classmethod
+    def incrementar(cls, usuario_id):
+        atualizados = cls.objects.filter(usuario_id=usuario_id).update(
+            versao=F("versao") + 1
+        )
+        if not atualizados:
+            _, criado = cls.objects.get_or_create(
+                usuario_id=usuario_id, defaults={"versao": 1}
+            )
+            if not criado:
+                cls.objects.filter(usuario_id=usuario_id).update(versao=F("versao") + 1)
+
+    def __str__(self):
+        return f"{self.usuario} v{self.versao}"
+
+
+# ----------------------------------------
+#   COMPROVANTE (arquivo e referências)
+# ----------------------------------------
+class Comprovante(models.Model):
+    """
+    Um arquivo de comprovante e quantos lançamentos o usam. A prévia e a
+    miniatura são geradas em segundo plano por processar_comprovantes, que
+    também apaga os arquivos que ficaram sem referências.
+    """
+
+    PENDENTE = "pendente"
+    PROCESSANDO = "processando"
+    CONCLUIDO = "concluido"
+    ERRO = "erro"
+
+    STATUS_CHOICES = [
+        (PENDENTE, "Pendente"),
+        (PROCESSANDO, "Processando"),
+        (CONCLUIDO, "Concluído"),
+        (ERRO, "Erro"),
+    ]
+
+    arquivo = models.CharField(max_length=255, unique=True)  # nome no storage
+    referencias = models.IntegerField(default=0)
+    atualizado_em = models.DateTimeField(default=timezone.now)
+
+    status = models.CharField(
+        max_length=12, choices=STATUS_CHOICES, default=PENDENTE, db_index=True
+    )
+    previa = models.FileField(upload_to="comprovantes/previas/", blank=True)
+    miniatura = models.FileField(upload_to="comprovantes/miniaturas/", blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["referencias", "atualizado_em"])]
+
+    def __str__(self):
+        return f"{self.arquivo} ({self.referencias} ref.)"
+
+
+# ----------------------------------------
+#   TAREFA DE RELATÓRIO (geração em segundo plano)
+# ----------------------------------------
+class TarefaRelatorio(models.Model):
+    PENDENTE = "pendente"
+    PROCESSANDO = "processando"
+    CONCLUIDO = "concluido"
+    ERRO = "erro"
+
+    STATUS_CHOICES = [
+        (PENDENTE, "Pendente"),
+        (PROCESSANDO, "Processando"),
+        (CONCLUIDO, "Concluído"),
+        (ERRO, "Erro"),
+    ]
+    FORMATO_CHOICES = [("pdf", "PDF"), ("excel", "Excel")]
+
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE)
+    data_inicio = models.DateField()
+    data_fim = models.DateField()
+    formato = models.CharField(max_length=10, choices=FORMATO_CHOICES)
+
+    status = models.CharField(
+        max_length=12, choices=STATUS_CHOICES, default=PENDENTE, db_index=True
+    )
+    arquivo = models.FileField(upload_to="relatorios/", null=True, blank=True)
+    erro = models.TextField(blank=True)
+
+    criado_em = models.DateTimeField(auto_now_add=True)
+    concluido_em = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Relatório {self.formato} {self.data_inicio} a {self.data_fim} ({self.status})"
+
+
+# ----------------------------------------
+#   RAZÃO (saldos incrementais)
+# ----------------------------------------
+class AcumuladorMovimentos:
+    """
+    Soma lançamentos por conta e por resumo mensal para gravá-los de uma vez.
+
+    Um lote inteiro custa uma atualização por conta envolvida e poucas
+    consultas em massa para os resumos, independente do número de linhas.
+    """
+
+    def __init__(self):
+        self.por_conta = defaultdict(lambda: [Decimal(0), Decimal(0)])
+        self.por_mes = defaultdict(lambda: [Decimal(0), Decimal(0)])
+
+    def adicionar(self, movimentos, sinal=1):
+        """``movimentos`` são dicts no formato de Lancamento.movimento()."""
+        for movimento in movimentos:
+            indice = 0 if movimento["tipo"] == "Receita" else 1
+            valor = sinal * movimento["valor"]
+            chave_mes = (
+                movimento["usuario_id"],
+                movimento["conta_id"],
+                movimento["categoria_id"],
+                movimento["data"].replace(day=1),
+            )
+            self.por_conta[movimento["conta_id"]][indice] += valor
+            self.por_mes[chave_mes][indice] += valor
+
+    def aplicar(self):
+        for conta_id, (receitas, despesas) in self.por_conta.items():
+            if receitas or despesas:
+                Conta.objects.filter(pk=conta_id).update(
+                    total_receitas=F("total_receitas") + receitas,
+                    total_despesas=F("total_despesas") + despesas,
+                )
+
+        deltas = {chave: valores for chave, valores in self.por_mes.items() if any(valores)}
+        if deltas:
+            self._aplicar_resumos(deltas)
+
+        self.por_conta.clear()
+        self.por_mes.clear()
+
+    def _aplicar_resumos(self, deltas):
+        chaves = list(deltas)
+        existentes = ResumoMensal.objects.filter(
+            usuario_id__in={c[0] for c in chaves},
+            conta_id__in={c[1] for c in chaves},
+            categoria_id__in={c[2] for c in chaves},
+            mes__in={c[3] for c in chaves},
+        )
+
+        atualizar = []
+        for resumo in existentes:
+            chave = (resumo.usuario_id, resumo.conta_id, resumo.categoria_id, resumo.mes)
+            if chave in deltas:
+                receitas, despesas = deltas.pop(chave)
+                resumo.receitas = F("receitas") + receitas
+                resumo.despesas = F("despesas") + despesas
+                atualizar.append(resumo)
+        ResumoMensal.objects.bulk_update(
+            atualizar, ["receitas", "despesas"], batch_size=500
+        )
+
+        # Resumo inexistente com valor negativo é um estorno de algo já
+        # removido em cascata junto com a conta ou a categoria.
+        novos = {
+            chave: valores
+            for chave, valores in deltas.items()
+            if valores[0] >= 0 and valores[1] >= 0
+        }
+        try:
+            with transaction.atomic():
+                ResumoMensal.objects.bulk_create(
+                    [
+                        ResumoMensal(
+                            usuario_id=usuario_id,
+                            conta_id=conta_id,
+                            categoria_id=categoria_id,
+                            mes=mes,
+                            receitas=receitas,
+                            despesas=despesas,
+                        )
+                        for (usuario_id, conta_id, categoria_id, mes), (
+                            receitas,
+                            despesas,
+                        ) in novos.items()
+                    ],
+                    batch_size=500,
+                )
+        except IntegrityError:
+            # Outra transação criou algum desses resumos ao mesmo tempo
+            for chave, valores in novos.items():
+                self._somar_resumo(chave, *valores)
+
+    @staticmethod
+    def _somar_resumo(chave, receitas, despesas):
+        usuario_id, conta_id, categoria_id, mes = chave
+        filtro = {
+            "usuario_id": usuario_id,
+            "conta_id": conta_id,
+            "categoria_id": categoria_id,
+            "mes": mes,
+        }
+        _, criado = ResumoMensal.objects.get_or_create(
+            **filtro, defaults={"receitas": receitas, "despesas": despesas}
+        )
+        if not criado:
+            ResumoMensal.objects.filter(**filtro).update(
+                receitas=F("receitas") + receitas,
+                despesas=F("despesas") + despesas,
+            )
+
+
+_EM_LOTE = ContextVar("em_lote", default=False)
+
+
+@contextmanager
+def em_lote():
+    """
+    Suspende os estornos e o versionamento feitos linha a linha pelos sinais
+    de Lancamento (core.signals); quem usa aplica tudo de uma vez depois.
+    """
+    anterior = _EM_LOTE.set(True)
+    try:
+        yield
+    finally:
+        _EM_LOTE.reset(anterior)
+
+
+def lote_ativo():
+    return _EM_LOTE.get()
+
+
+def registrar_movimentos(movimentos, sinal=1):
+    """
+    Aplica (sinal=1) ou estorna (sinal=-1) lançamentos nos totais das contas
+    e nos resumos mensais.
+    """
+    acumulador = AcumuladorMovimentos()
+    acumulador.adicionar(movimentos, sinal)
+    acumulador.aplicar()
+
+
+class ContadorRotulos:
+    """
+    Conta as palavras das descrições por categoria para gravar o índice de
+    sugestões (TokenCategoria) de uma vez, como o AcumuladorMovimentos.
+    """
+
+    def __init__(self):
+        self.contagem = Counter()
+
+    def adicionar(self, rotulos, sinal=1):
+        """``rotulos`` são tuplas no formato de Lancamento.rotulo()."""
+        for usuario_id, categoria_id, descricao in rotulos:
+            for token in palavras(descricao):
+                self.contagem[(usuario_id, token, categoria_id)] += sinal
+
+    def aplicar(self):
+        deltas = {chave: n for chave, n in self.contagem.items() if n}
+        self.contagem.clear()
+        if not deltas:
+            return
+
+        chaves = list(deltas)
+        atualizar = []
+        for inicio in range(0, len(chaves), 500):
+            parte = chaves[inicio : inicio + 500]
+            existentes = TokenCategoria.objects.filter(
+                usuario_id__in={c[0] for c in parte},
+                token__in={c[1] for c in parte},
+            ).only("pk", "usuario_id", "token", "categoria_id")
+            for token in existentes:
+                chave = (token.usuario_id, token.token, token.categoria_id)
+                if chave in deltas:
+                    token.ocorrencias = F("ocorrencias") + deltas.pop(chave)
+                    atualizar.append(token)
+        TokenCategoria.objects.bulk_update(atualizar, ["ocorrencias"], batch_size=500)
+
+        # Contagem negativa sem linha é de categoria já excluída em cascata
+        novos = {chave: n for chave, n in deltas.items() if n > 0}
+        try:
+            with transaction.atomic():
+                TokenCategoria.objects.bulk_create(
+                    [
+                        TokenCategoria(
+                            usuario_id=usuario_id,
+                            token=token,
+                            categoria_id=categoria_id,
+                            ocorrencias=n,
+                        )
+                        for (usuario_id, token, categoria_id), n in novos.items()
+                    ],
+                    batch_size=500,
+                )
+        except IntegrityError:
+            for (usuario_id, token, categoria_id), n in novos.items():
+                filtro = {
+                    "usuario_id": usuario_id,
+                    "token": token,
+                    "categoria_id": categoria_id,
+                }
+                _, criado = TokenCategoria.objects.get_or_create(
+                    **filtro, defaults={"ocorrencias": n}
+                )
+                if not criado:
+                    TokenCategoria.objects.filter(**filtro).update(
+                        ocorrencias=F("ocorrencias") + n
+                    )
+
+
+def registrar_comprovantes(nomes, sinal=1):
+    """Inclui (sinal=1) ou retira (sinal=-1) referências a arquivos de comprovante."""
+    agora = timezone.now()
+    for nome, quantidade in Counter(nome for nome in nomes if nome).items():
+        delta = sinal * quantidade
+        atualizados = Comprovante.objects.filter(arquivo=nome).update(
+            referencias=F("referencias") + delta, atualizado_em=agora
+        )
+        if not atualizados and delta > 0:
+            _, criado = Comprovante.objects.get_or_create(
+                arquivo=nome, defaults={"referencias": delta}
+            )
+            if not criado:
+                Comprovante.objects.filter(arquivo=nome).update(
+                    referencias=F("referencias") + delta, atualizado_em=agora
+                )
+
+
+def registrar_rotulos(rotulos, sinal=1):
+    """Inclui (sinal=1) ou retira (sinal=-1) descrições do índice de sugestões."""
+    contador = ContadorRotulos()
+    contador.adicionar(rotulos, sinal)
+    contador.aplicar()
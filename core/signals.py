@@ -0,0 +1,124 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .instrumentacao import medir_consulta
+from .models import (
+    AcumuladorMovimentos,
+    Categoria,
+    Conta,
+    ContadorRotulos,
+    Lancamento,
+    TarefaRelatorio,
+    VersaoDados,
+    lote_ativo,
+    registrar_comprovantes,
+    registrar_movimentos,
+    registrar_rotulos,
+)
+
+
+# Exclusões que levam lançamentos em cascata, e o campo que os liga
+CASCATAS = {Conta: "conta", Categoria: "categoria", User: "usuario"}
+
+
+def _modelo_da_origem(origin):
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+
+def _em_cascata(origin):
+    """Lançamento excluído junto com uma conta, categoria ou usuário."""
+    return _modelo_da_origem(origin) in CASCATAS
+
+
+@receiver(pre_delete, sender=Conta)
+@receiver(pre_delete, sender=Categoria)
+@receiver(pre_delete, sender=User)
+def estornar_em_cascata(sender, instance, origin=None, **kwargs):
+    """
+    Estorna numa passada só os lançamentos que saem em cascata, em vez de
+    um estorno por linha nos post_delete (que os ignoram, ver _em_cascata).
+    """
+    if lote_ativo():
+        return
+    # Na exclusão do usuário o pre_delete do próprio usuário já cuidou disso
+    if sender is not User and _modelo_da_origem(origin) is User:
+        return
+
+    lancamentos = Lancamento.objects.filter(**{CASCATAS[sender]: instance})
+    if sender is User:
+        # Contas, resumos e o índice de sugestões saem junto; só as
+        # referências aos comprovantes, que são compartilhados, continuam
+        registrar_comprovantes(
+            lancamentos.exclude(comprovante="").values_list("comprovante", flat=True),
+            sinal=-1,
+        )
+        return
+
+    movimentos, rotulos, comprovantes = AcumuladorMovimentos(), ContadorRotulos(), []
+    for linha in lancamentos.values(*Lancamento.CAMPOS_MOVIMENTO, "descricao", "comprovante"):
+        rotulos.adicionar(
+            [(linha["usuario_id"], linha["categoria_id"], linha.pop("descricao"))], sinal=-1
+        )
+        comprovantes.append(linha.pop("comprovante"))
+        movimentos.adicionar([linha], sinal=-1)
+    movimentos.aplicar()
+    rotulos.aplicar()
+    registrar_comprovantes(comprovantes, sinal=-1)
+
+
+# Lançamentos excluídos um a um ou por queryset (sem passar por
+# Lancamento.delete()) disparam post_delete dentro da mesma transação.
+@receiver(post_delete, sender=Lancamento)
+def estornar_lancamento(sender, instance, origin=None, **kwargs):
+    if lote_ativo() or _em_cascata(origin):
+        return
+    registrar_movimentos([instance.movimento()], sinal=-1)
+    registrar_rotulos([instance.rotulo()], sinal=-1)
+    registrar_comprovantes([instance.comprovante.name], sinal=-1)
+
+
+# Tarefas saem pelo processar_relatorios (expiradas) ou junto com o usuário
+@receiver(post_delete, sender=TarefaRelatorio)
+def apagar_arquivo_da_tarefa(sender, instance, **kwargs):
+    if instance.arquivo:
+        arquivo = instance.arquivo
+        transaction.on_commit(lambda: arquivo.delete(save=False))
+
+
+@receiver(post_save, sender=Lancamento)
+@receiver(post_save, sender=Conta)
+@receiver(post_save, sender=Categoria)
+@receiver(post_delete, sender=Lancamento)
+@receiver(post_delete, sender=Conta)
+@receiver(post_delete, sender=Categoria)
+def incrementar_versao(sender, instance, origin=None, **kwargs):
+    # Na exclusão do próprio usuário não há mais o que versionar; na de uma
+    # conta ou categoria basta o incremento dela, não um por lançamento
+    if lote_ativo() or _modelo_da_origem(origin) is User:
+        return
+    if sender is Lancamento and _em_cascata(origin):
+        return
+    VersaoDados.incrementar(instance.usuario_id)
+
+
+@receiver(connection_created)
+def ajustar_sqlite(sender, connection, **kwargs):
+    if connection.vendor != "sqlite" or not settings.SQLITE_OTIMIZADO:
+        return
+    with connection.cursor() as cursor:
+        for pragma, valor in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {pragma} = {valor}")
+
+
+@receiver(connection_created)
+def instrumentar_conexao(sender, connection, **kwargs):
+    if settings.INSTRUMENTACAO["AMOSTRAGEM"] <= 0:
+        return
+    # O objeto da conexão sobrevive a reconexões (CONN_MAX_AGE, health checks)
+    if medir_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(medir_consulta)
@@ -0,0 +1,25 @@
+from django import template
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from core.utils.comprovantes import versao_comprovante
+
+register = template.Library()
+
+
+@register.simple_tag
+def url_comprovante(lancamento, variante="", download=False):
+    """
+    {% url_comprovante lancamento "previa" %} → endpoint autenticado, com a
+    versão do conteúdo na URL para o navegador guardar o arquivo em cache.
+    """
+    parametros = {}
+    if variante:
+        parametros["variante"] = variante
+    versao = versao_comprovante(lancamento.comprovante.name, variante)
+    if versao:
+        parametros["v"] = versao
+    if download:
+        parametros["download"] = 1
+    url = reverse("baixar_comprovante", args=[lancamento.id])
+    return f"{url}?{urlencode(parametros)}" if parametros else url
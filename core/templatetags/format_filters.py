@@ -1,19 +1,22 @@
 from django import template
 
+from core.utils.moeda import abreviar, formatar_moeda, formatar_numero
+
 register = template.Library()
 
+
 @register.filter
 def abreviar_numero(valor):
-    try:
-        valor = float(valor)
-    except (ValueError, TypeError):
-        return valor
-
-    if valor >= 1_000_000_000:
-        return f"{valor/1_000_000_000:.2f} bilhões"
-    elif valor >= 1_000_000:
-        return f"{valor/1_000_000:.2f} milhões"
-    elif valor >= 1_000:
-        return f"{valor/1_000:.2f} mil"
-    else:
-        return f"{valor:.2f}"
+    return abreviar(valor)
+
+
+@register.filter
+def moeda(valor):
+    """{{ valor|moeda }} → R$ 1.234,56"""
+    return formatar_moeda(valor)
+
+
+@register.filter
+def numero(valor):
+    """{{ valor|numero }} → 1.234,56"""
+    return formatar_numero(valor)
@@ -0,0 +1,86 @@
+import datetime
+import io
+import tempfile
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.models import Categoria, Conta, Lancamento
+from core.utils.cache_relatorios import cache_relatorios
+
+
+class CasoComLancamentos(TestCase):
+    """
+    Usuário logado com duas categorias, três contas (saldo inicial 10,00) e
+    um salário e uma compra em cada conta. Arquivos (comprovantes, relatórios
+    e cache) vão para diretórios temporários.
+    """
+
+    def setUp(self):
+        diretorio = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(
+            override_settings(
+                MEDIA_ROOT=diretorio,
+                RELATORIO_CACHE={
+                    "BACKEND": "arquivos",
+                    "DIRETORIO": f"{diretorio}/cache",
+                    "MAX_BYTES": 10 * 1024 * 1024,
+                },
+            )
+        )
+        cache_relatorios.cache_clear()
+        self.addCleanup(cache_relatorios.cache_clear)
+        caches["template_fragments"].clear()
+
+        self.usuario = User.objects.create_user("ana", password="senha")
+        self.client.force_login(self.usuario)
+        self.receita = Categoria.objects.create(
+            nome="Salário", tipo="Receita", usuario=self.usuario
+        )
+        self.despesa = Categoria.objects.create(
+            nome="Mercado", tipo="Despesa", usuario=self.usuario
+        )
+        self.contas = [
+            Conta.objects.create(
+                nome=f"Conta {i}", saldo_inicial=Decimal("10"), usuario=self.usuario
+            )
+            for i in range(3)
+        ]
+        for i, conta in enumerate(self.contas):
+            self.lancar(conta, self.receita, "100.50", datetime.date(2024, 1, 10 + i), "Salário")
+            self.lancar(conta, self.despesa, "20.25", datetime.date(2024, 2, 1 + i), "Feira")
+
+    def lancar(self, conta, categoria, valor, data, descricao="x", usuario=None):
+        return Lancamento.objects.create(
+            usuario=usuario or self.usuario,
+            conta=conta,
+            categoria=categoria,
+            tipo=categoria.tipo,
+            descricao=descricao,
+            valor=Decimal(valor),
+            data=data,
+        )
+
+    def saldo_esperado(self, ate=None, conta=None):
+        """Saldo recalculado em Python a partir de todos os lançamentos."""
+        contas = [conta] if conta else Conta.objects.filter(usuario=self.usuario)
+        saldo = sum((c.saldo_inicial for c in contas), Decimal(0))
+        for lancamento in Lancamento.objects.filter(conta__in=contas):
+            if ate is None or lancamento.data <= ate:
+                sinal = 1 if lancamento.tipo == "Receita" else -1
+                saldo += sinal * lancamento.valor
+        return saldo
+
+    def comando(self, nome, *args):
+        """Roda um comando de gerenciamento e devolve o que ele escreveu."""
+        saida = io.StringIO()
+        call_command(nome, *args, stdout=saida, stderr=saida)
+        return saida.getvalue()
+
+    def verificar_razao(self):
+        """Falha se os totais das contas ou os resumos divergirem do histórico."""
+        self.comando("recalcular_saldos", "--verificar")
+        self.comando("recalcular_resumos", "--verificar")
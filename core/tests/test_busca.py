@@ -0,0 +1,90 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.db import connection
+
+from core.models import Categoria, Conta, Lancamento
+from core.tests.base import CasoComLancamentos
+from core.utils.busca import buscar
+
+
+class BuscaTests(CasoComLancamentos):
+    def setUp(self):
+        super().setUp()
+        self.postgres = connection.vendor == "postgresql"
+        data = datetime.date(2024, 3, 1)
+        conta = self.contas[0]
+        self.cafe = self.lancar(conta, self.despesa, "1", data, "Café da manhã padaria")
+        self.extra = self.lancar(conta, self.despesa, "1", data, "Mercado Extra")
+        self.feira = self.lancar(
+            conta, self.despesa, "1", datetime.date(2024, 4, 1), "mercado mercado feira"
+        )
+
+        outro = User.objects.create_user("beto", password="senha")
+        self.lancar(
+            Conta.objects.create(nome="B", usuario=outro),
+            Categoria.objects.create(nome="M", tipo="Despesa", usuario=outro),
+            "1",
+            data,
+            "Mercado do outro",
+            usuario=outro,
+        )
+        self.lancamentos = Lancamento.objects.filter(usuario=self.usuario)
+
+    def encontrados(self, texto):
+        return set(
+            buscar(self.lancamentos, self.usuario, texto).values_list("pk", flat=True)
+        )
+
+    def test_prefixo_e_usuario(self):
+        self.assertEqual(self.encontrados("MERCAD"), {self.extra.pk, self.feira.pk})
+        self.assertEqual(
+            self.encontrados("café" if self.postgres else "cafe"), {self.cafe.pk}
+        )
+        self.assertEqual(self.encontrados('merc" OR x'), set())
+
+    def test_relevancia(self):
+        ordem = buscar(self.lancamentos, self.usuario, "mercado").order_by("-relevancia")
+        self.assertEqual(
+            list(ordem.values_list("pk", flat=True)), [self.feira.pk, self.extra.pk]
+        )
+
+    def test_indice_acompanha_alteracoes(self):
+        Lancamento.objects.filter(pk=self.extra.pk).update(descricao="Farmácia")
+        self.assertEqual(self.encontrados("mercad"), {self.feira.pk})
+        self.assertEqual(self.encontrados("farm"), {self.extra.pk})
+
+        Lancamento.objects.bulk_create(
+            [
+                Lancamento(
+                    usuario=self.usuario,
+                    conta=self.contas[0],
+                    categoria=self.despesa,
+                    tipo="Despesa",
+                    descricao="Posto combustível",
+                    valor=1,
+                    data=datetime.date(2024, 1, 1),
+                )
+            ]
+        )
+        self.assertEqual(len(self.encontrados("combust")), 1)
+
+        self.feira.delete()
+        self.assertEqual(self.encontrados("mercad"), set())
+        self.despesa.delete()
+        self.assertEqual(self.encontrados("farm"), set())
+
+    def test_listagem(self):
+        resposta = self.client.get("/lancamentos/?busca=caf")
+        self.assertEqual([l.pk for l in resposta.context["lancamentos"]], [self.cafe.pk])
+        self.assertFalse(resposta.context["mostrar_saldo"])
+
+        resposta = self.client.get("/lancamentos/?busca=caf&ordem=data&data_fim=2024-02-01")
+        self.assertContains(resposta, "Nenhum lançamento encontrado")
+        self.assertEqual(self.client.get("/lancamentos/?busca=!!!").status_code, 200)
+
+    def test_reconstruir_busca(self):
+        if self.postgres:
+            self.skipTest("CREATE INDEX não roda com gatilhos pendentes na transação do teste")
+        self.comando("reconstruir_busca")
+        self.assertEqual(self.encontrados("padaria"), {self.cafe.pk})
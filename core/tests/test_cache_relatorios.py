@@ -0,0 +1,24 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Lancamento
+from core.tests.base import CasoComLancamentos
+
+
+class CacheRelatoriosTests(CasoComLancamentos):
+    url = "/relatorio/?data_inicio=2024-01-01&data_fim=2024-12-31&formato=pdf"
+
+    def test_reaproveita_ate_os_dados_mudarem(self):
+        with CaptureQueriesContext(connection) as gerando:
+            primeiro = b"".join(self.client.get(self.url))
+        with CaptureQueriesContext(connection) as do_cache:
+            segundo = b"".join(self.client.get(self.url))
+        self.assertEqual(primeiro, segundo)
+        self.assertLess(len(do_cache), len(gerando))
+
+        lancamento = Lancamento.objects.first()
+        lancamento.descricao = "Outra"
+        lancamento.save()
+        with CaptureQueriesContext(connection) as depois:
+            b"".join(self.client.get(self.url))
+        self.assertEqual(len(depois), len(gerando))
@@ -0,0 +1,141 @@
+import datetime
+from collections import Counter
+
+from django.contrib.auth.models import User
+
+from core.models import Categoria, Conta, Lancamento, TokenCategoria
+from core.tests.base import CasoComLancamentos
+from core.utils.categorizacao import IndiceCategorias
+from core.utils.texto import palavras
+
+
+DATA = datetime.date(2024, 3, 1)
+
+
+class IndiceCategoriasTests(CasoComLancamentos):
+    def setUp(self):
+        super().setUp()
+        self.farmacia = Categoria.objects.create(
+            nome="Farmácia", tipo="Despesa", usuario=self.usuario
+        )
+        conta = self.contas[0]
+        for _ in range(3):
+            self.lancar(conta, self.despesa, "1", DATA, "Padaria Pão Quente")
+        for _ in range(2):
+            self.lancar(conta, self.farmacia, "1", DATA, "Drogaria Pacheco")
+        self.lancar(conta, self.farmacia, "1", DATA, "Padaria do remédio")
+
+    def test_sugestao_e_ranking(self):
+        indice = IndiceCategorias.carregar(self.usuario.id)
+        self.assertEqual(indice.sugerir("PADARIA"), (self.despesa.pk, 0.75))
+        # padaria vota 3/4 em Mercado e 1/4 em Farmácia; drogaria, 1 em Farmácia
+        self.assertEqual(indice.sugerir("padaria drogaria"), (self.farmacia.pk, 0.625))
+        self.assertEqual(indice.sugerir("padaria", tipo="Receita"), (None, 0))
+        self.assertEqual(indice.sugerir("salario"), (self.receita.pk, 1.0))
+        self.assertEqual(indice.sugerir("xyz"), (None, 0))
+
+    def test_prefixo_da_ultima_palavra(self):
+        indice = IndiceCategorias.carregar(self.usuario.id)
+        self.assertEqual(indice.sugerir("pada"), (None, 0))
+        self.assertEqual(indice.sugerir("pada", prefixo=True), (self.despesa.pk, 0.75))
+        self.assertEqual(indice.sugerir("pa", prefixo=True), (None, 0))
+        # Só a última palavra vale como prefixo
+        self.assertEqual(
+            indice.sugerir("pão quente dro", prefixo=True), (self.despesa.pk, 2 / 3)
+        )
+        self.assertEqual(
+            indice.sugerir("dro pão quente", prefixo=True), (self.despesa.pk, 1.0)
+        )
+
+    def test_carregar_so_as_palavras_da_descricao(self):
+        indice = IndiceCategorias.carregar(self.usuario.id, descricao="Padaria dro")
+        self.assertEqual(set(indice.por_token), {"padaria", "drogaria"})
+        self.assertEqual(
+            indice.sugerir("Padaria dro", prefixo=True), (self.farmacia.pk, 0.625)
+        )
+
+    def test_aprender_atualiza_a_copia_em_memoria(self):
+        indice = IndiceCategorias.carregar(self.usuario.id, descricao="dro")
+        indice.aprender(self.despesa.pk, "Drogaria nova")
+        self.assertEqual(indice.sugerir("dro", prefixo=True), (self.farmacia.pk, 2 / 3))
+
+
+class TokensIncrementaisTests(CasoComLancamentos):
+    def tokens(self):
+        return {
+            (token, categoria_id): ocorrencias
+            for token, categoria_id, ocorrencias in TokenCategoria.objects.filter(
+                usuario=self.usuario, ocorrencias__gt=0
+            ).values_list("token", "categoria_id", "ocorrencias")
+        }
+
+    def esperados(self):
+        """Contagem refeita do zero a partir das descrições atuais."""
+        contagem = Counter()
+        for descricao, categoria_id in Lancamento.objects.filter(
+            usuario=self.usuario
+        ).values_list("descricao", "categoria_id"):
+            contagem.update((token, categoria_id) for token in palavras(descricao))
+        return dict(contagem)
+
+    def test_criacao_alteracao_e_exclusao(self):
+        lancamento = self.lancar(self.contas[0], self.despesa, "1", DATA, "Padaria Central")
+        self.assertEqual(self.tokens()[("padaria", self.despesa.pk)], 1)
+        self.assertEqual(self.tokens(), self.esperados())
+
+        lancamento.descricao = "Drogaria Central"
+        lancamento.categoria = self.receita
+        lancamento.tipo = "Receita"
+        lancamento.save()
+        self.assertNotIn(("padaria", self.despesa.pk), self.tokens())
+        self.assertEqual(self.tokens()[("central", self.receita.pk)], 1)
+        self.assertEqual(self.tokens(), self.esperados())
+
+        lancamento.delete()
+        self.assertNotIn(("drogaria", self.receita.pk), self.tokens())
+        self.assertEqual(self.tokens(), self.esperados())
+
+    def test_exclusao_da_categoria(self):
+        self.assertEqual(self.tokens()[("feira", self.despesa.pk)], 3)
+        self.despesa.delete()
+        self.assertEqual(self.tokens(), self.esperados())
+        self.assertFalse(
+            TokenCategoria.objects.filter(usuario=self.usuario, token="feira").exists()
+        )
+
+
+class SugerirCategoriaTests(CasoComLancamentos):
+    url = "/lancamentos/sugerir-categoria/"
+
+    def setUp(self):
+        super().setUp()
+        self.beto = User.objects.create_user("beto", password="senha")
+        self.categoria_beto = Categoria.objects.create(
+            nome="Padarias", tipo="Despesa", usuario=self.beto
+        )
+        conta = Conta.objects.create(nome="B", usuario=self.beto)
+        for _ in range(5):
+            self.lancar(conta, self.categoria_beto, "1", DATA, "Padaria feira", usuario=self.beto)
+
+    def sugerir(self, **parametros):
+        resposta = self.client.get(self.url, parametros)
+        self.assertEqual(resposta.status_code, 200)
+        return resposta.json()
+
+    def test_so_o_historico_do_usuario(self):
+        self.assertEqual(self.sugerir(descricao="padaria"), {"categoria": None, "confianca": 0})
+        self.assertEqual(
+            self.sugerir(descricao="Feira do bairro fei"),
+            {"categoria": self.despesa.pk, "confianca": 1.0},
+        )
+        self.assertEqual(self.sugerir(descricao="feira", tipo="Receita")["categoria"], None)
+
+        self.client.force_login(self.beto)
+        self.assertEqual(
+            self.sugerir(descricao="fei"),
+            {"categoria": self.categoria_beto.pk, "confianca": 1.0},
+        )
+
+    def test_exige_login(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url, {"descricao": "feira"}).status_code, 302)
@@ -0,0 +1,130 @@
+import datetime
+import io
+import os
+from unittest.mock import patch
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.conf import settings
+from django.test import override_settings
+from PIL import Image
+
+from core.management.commands.processar_comprovantes import Command, reduzir_comprovante
+from core.models import Comprovante, Lancamento
+from core.utils.comprovantes import digest_do_nome
+from core.tests.base import CasoComLancamentos
+
+ANTIGO = datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def imagem_jpeg(largura=3000, altura=2000):
+    saida = io.BytesIO()
+    Image.new("RGB", (largura, altura), "red").save(saida, "JPEG")
+    return saida.getvalue()
+
+
+class CasoComComprovantes(CasoComLancamentos):
+    """Dois lançamentos com o mesmo JPEG anexado."""
+
+    def setUp(self):
+        super().setUp()
+        self.jpeg = imagem_jpeg()
+        self.lancamentos = [self.com_comprovante(nome) for nome in ("a.JPG", "b.jpg")]
+        self.comprovante = Comprovante.objects.get()
+        self.url = f"/lancamento/{self.lancamentos[0].pk}/comprovante/arquivo/"
+
+    def com_comprovante(self, nome, conteudo=None, tipo="image/jpeg"):
+        lancamento = Lancamento(
+            usuario=self.usuario,
+            conta=self.contas[0],
+            categoria=self.despesa,
+            tipo="Despesa",
+            descricao="Recibo",
+            valor=1,
+            data=datetime.date(2024, 3, 1),
+        )
+        lancamento.comprovante = SimpleUploadedFile(nome, conteudo or self.jpeg, tipo)
+        lancamento.save()
+        return lancamento
+
+    def arquivos(self):
+        return [
+            os.path.join(raiz, nome)
+            for raiz, _, nomes in os.walk(settings.MEDIA_ROOT)
+            for nome in nomes
+            if "cache" not in raiz
+        ]
+
+
+class ComprovantesTests(CasoComComprovantes):
+    def test_mesmo_conteudo_um_arquivo(self):
+        self.assertEqual(
+            self.lancamentos[0].comprovante.name, self.lancamentos[1].comprovante.name
+        )
+        self.assertEqual(self.comprovante.referencias, 2)
+        self.assertEqual(len(self.arquivos()), 1)
+
+    def test_reducoes(self):
+        self.assertEqual(reduzir_comprovante(self.comprovante.pk), Comprovante.CONCLUIDO)
+        self.comprovante.refresh_from_db()
+        with Image.open(self.comprovante.previa.path) as previa:
+            self.assertEqual(previa.size, (1280, 853))
+        self.assertContains(self.client.get("/lancamentos/"), "variante=miniatura")
+
+        pdf = self.com_comprovante("n.pdf", b"%PDF-1.4", "application/pdf")
+        comprovante = Comprovante.objects.get(arquivo=pdf.comprovante.name)
+        self.assertEqual(reduzir_comprovante(comprovante.pk), Comprovante.CONCLUIDO)
+
+    def test_referencias_e_coleta(self):
+        self.lancamentos[0].comprovante = None
+        self.lancamentos[0].save()
+        self.comprovante.refresh_from_db()
+        self.assertEqual(self.comprovante.referencias, 1)
+
+        self.lancamentos[1].delete()
+        self.comprovante.refresh_from_db()
+        self.assertEqual(self.comprovante.referencias, 0)
+
+        with override_settings(COMPROVANTES={"CARENCIA_REMOCAO": -1}):
+            Command(stdout=io.StringIO()).coletar()
+        self.assertFalse(Comprovante.objects.exists())
+        self.assertEqual(self.arquivos(), [])
+
+    def test_exclusao_em_cascata_solta_as_referencias(self):
+        self.contas[0].delete()
+        self.assertEqual(Comprovante.objects.get().referencias, 0)
+
+        self.contas[0] = self.contas[1]
+        self.com_comprovante("c.jpg")
+        self.usuario.delete()
+        self.assertEqual(Comprovante.objects.get().referencias, 0)
+
+    def test_coleta_entre_o_exists_e_o_registro(self):
+        for lancamento in self.lancamentos:
+            lancamento.delete()
+        Comprovante.objects.update(atualizado_em=ANTIGO)
+        armazenamento = Lancamento._meta.get_field("comprovante").storage
+        exists = armazenamento.exists
+
+        def coleta_logo_depois(nome):
+            existe = exists(nome)
+            if digest_do_nome(nome):
+                Command(stdout=io.StringIO()).coletar()
+            return existe
+
+        with patch.object(armazenamento, "exists", coleta_logo_depois):
+            lancamento = self.com_comprovante("c.jpg")
+        self.assertEqual(Comprovante.objects.get().referencias, 1)
+        with armazenamento.open(lancamento.comprovante.name) as arquivo:
+            self.assertEqual(arquivo.read(), self.jpeg)
+        self.assertEqual(len(self.arquivos()), 1)
+
+    def test_reaproveitar_adia_a_coleta(self):
+        for lancamento in self.lancamentos:
+            lancamento.delete()
+        Comprovante.objects.update(atualizado_em=ANTIGO)
+        armazenamento = Lancamento._meta.get_field("comprovante").storage
+        nome = armazenamento.save("d.jpg", SimpleUploadedFile("d.jpg", self.jpeg))
+
+        Command(stdout=io.StringIO()).coletar()
+        self.assertTrue(armazenamento.exists(nome))
+        self.assertTrue(Comprovante.objects.filter(arquivo=nome).exists())
@@ -0,0 +1,28 @@
+import datetime
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import VersaoDados
+from core.tests.base import CasoComLancamentos
+
+
+class DashboardTests(CasoComLancamentos):
+    def test_totais(self):
+        resposta = self.client.get("/dashboard/")
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.context["resumo"]["saldo_total"], self.saldo_esperado())
+        self.assertContains(resposta, "R$ 270,75")
+
+    def test_blocos_em_cache_ate_a_versao_mudar(self):
+        self.client.get("/dashboard/")
+        with CaptureQueriesContext(connection) as consultas:
+            self.client.get("/dashboard/")
+        tabelas = " ".join(c["sql"] for c in consultas.captured_queries)
+        self.assertNotIn("core_lancamento", tabelas)
+        self.assertNotIn("core_conta", tabelas)
+
+        versao = VersaoDados.atual(self.usuario.id)
+        self.lancar(self.contas[0], self.receita, "1000", datetime.date(2025, 1, 1), "Bônus xyz")
+        self.assertEqual(VersaoDados.atual(self.usuario.id), versao + 1)
+        self.assertContains(self.client.get("/dashboard/"), "Bônus xyz")
@@ -0,0 +1,65 @@
+import os
+
+from django.contrib.auth.models import User
+from django.test import override_settings
+
+from core.management.commands.processar_comprovantes import reduzir_comprovante
+from core.tests.test_comprovantes import CasoComComprovantes
+
+
+class EntregaComprovanteTests(CasoComComprovantes):
+    def test_download_completo_e_304(self):
+        resposta = self.client.get(self.url)
+        self.assertEqual(b"".join(resposta), self.jpeg)
+        self.assertEqual(resposta["Accept-Ranges"], "bytes")
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_NONE_MATCH=resposta["ETag"]).status_code, 304
+        )
+        resposta = self.client.get(self.url + "?download=1")
+        self.assertIn("attachment", resposta["Content-Disposition"])
+
+    def test_range(self):
+        resposta = self.client.get(self.url, HTTP_RANGE="bytes=0-9")
+        self.assertEqual(resposta.status_code, 206)
+        self.assertEqual(b"".join(resposta), self.jpeg[:10])
+        self.assertEqual(resposta["Content-Range"], f"bytes 0-9/{len(self.jpeg)}")
+        self.assertEqual(resposta["Content-Length"], "10")
+
+        resposta = self.client.get(self.url, HTTP_RANGE="bytes=-5")
+        self.assertEqual(b"".join(resposta), self.jpeg[-5:])
+        fora = self.client.get(self.url, HTTP_RANGE=f"bytes={len(self.jpeg)}-")
+        self.assertEqual(fora.status_code, 416)
+
+    def test_if_range(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(
+            self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"x"').status_code,
+            200,
+        )
+        self.assertEqual(
+            self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=etag).status_code,
+            206,
+        )
+
+    def test_url_versionada_e_imutavel(self):
+        reduzir_comprovante(self.comprovante.pk)
+        digest = os.path.basename(self.comprovante.arquivo)[:64]
+        resposta = self.client.get(f"{self.url}?variante=previa&v={digest}-previa")
+        self.assertEqual(resposta.status_code, 200)
+        self.assertIn("immutable", resposta["Cache-Control"])
+        self.assertEqual(self.client.get(self.url + "?variante=xx").status_code, 404)
+
+    async def test_asgi_le_em_blocos(self):
+        await self.async_client.aforce_login(self.usuario)
+        resposta = await self.async_client.get(self.url)
+        self.assertTrue(resposta.is_async)
+        self.assertEqual(b"".join([b async for b in resposta.streaming_content]), self.jpeg)
+
+    def test_somente_o_dono(self):
+        self.client.force_login(User.objects.create_user("beto", password="senha"))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_x_accel_redirect(self):
+        with override_settings(COMPROVANTES={"ACCEL_REDIRECT": "/interno/"}):
+            resposta = self.client.get(self.url)
+        self.assertTrue(resposta["X-Accel-Redirect"].startswith("/interno/comprovantes/"))
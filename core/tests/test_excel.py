@@ -0,0 +1,18 @@
+import io
+
+import openpyxl
+
+from core.tests.base import CasoComLancamentos
+
+
+class RelatorioExcelTests(CasoComLancamentos):
+    def test_excel(self):
+        resposta = self.client.get(
+            "/relatorio/",
+            {"data_inicio": "2024-01-01", "data_fim": "2024-12-31", "formato": "excel"},
+        )
+        self.assertEqual(resposta.status_code, 200)
+        planilha = openpyxl.load_workbook(io.BytesIO(b"".join(resposta))).active
+        linhas = list(planilha.iter_rows(values_only=True))
+        self.assertEqual(linhas[6][:6], ("Data", "Tipo", "Categoria", "Conta", "Valor", "Saldo"))
+        self.assertEqual(len(linhas), 7 + 6)
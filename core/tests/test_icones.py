@@ -0,0 +1,72 @@
+from django.test import SimpleTestCase
+
+from core.models import Categoria
+from core.tests.base import CasoComLancamentos
+from core.utils.icones import ICONE_PADRAO, ICONES_POR_PALAVRA, icone_para
+
+
+def icone_pelo_laco_antigo(nome):
+    """O Categoria.save anterior: a primeira palavra do dicionário contida no nome."""
+    nome = nome.lower()
+    for palavra, icone in ICONES_POR_PALAVRA.items():
+        if palavra in nome:
+            return icone
+    return ICONE_PADRAO
+
+
+class IconeParaTests(SimpleTestCase):
+    def test_palavra_sozinha_igual_ao_laco_antigo(self):
+        for palavra, icone in ICONES_POR_PALAVRA.items():
+            # "supermercado" contém "mercado", "internet" contém "inter"...
+            contidas = [p for p in ICONES_POR_PALAVRA if p in palavra]
+            if contidas != [palavra]:
+                continue
+            for nome in (palavra, f"Gastos com {palavra.upper()}"):
+                self.assertEqual(icone_para(nome), icone, nome)
+                self.assertEqual(icone_pelo_laco_antigo(nome), icone, nome)
+
+    def test_mesmo_resultado_do_laco_antigo(self):
+        for nome in ("Conta de Luz", "Netflix", "Salário", "Banco Inter", "Internet", "Xyz", ""):
+            self.assertEqual(icone_para(nome), icone_pelo_laco_antigo(nome), nome)
+
+    def test_ordem_de_precedencia(self):
+        casos = {
+            # A mais longa vence na mesma posição; antes, a ordem do dicionário
+            "Supermercado": ("bi bi-cart4", "bi bi-basket-fill"),
+            # A que aparece primeiro no nome vence
+            "Plano de internet": ("bi bi-card-checklist", "bi bi-wifi"),
+            "Água e luz": ("bi bi-droplet-half", "bi bi-lightbulb-fill"),
+            # Sem acento e em maiúsculas
+            "Agua": ("bi bi-droplet-half", ICONE_PADRAO),
+            "FARMACIA": ("bi bi-capsule", ICONE_PADRAO),
+            "Poupanca": ("bi bi-piggy-bank-fill", ICONE_PADRAO),
+        }
+        for nome, (novo, antigo) in casos.items():
+            self.assertEqual(icone_para(nome), novo, nome)
+            self.assertEqual(icone_pelo_laco_antigo(nome), antigo, nome)
+
+
+class AtribuirIconesTests(CasoComLancamentos):
+    def setUp(self):
+        super().setUp()
+        self.vazia = Categoria.objects.create(nome="Farmácia", tipo="Despesa", usuario=self.usuario)
+        self.errada = Categoria.objects.create(nome="Aluguel", tipo="Despesa", usuario=self.usuario)
+        Categoria.objects.filter(pk=self.vazia.pk).update(icone="")
+        Categoria.objects.filter(pk=self.errada.pk).update(icone="bi bi-x")
+
+    def icones(self):
+        return dict(Categoria.objects.values_list("nome", "icone"))
+
+    def test_preenche_so_as_vazias(self):
+        antes = self.icones()
+        self.assertIn("1 categoria(s)", self.comando("atribuir_icones"))
+        self.assertEqual(self.icones(), {**antes, "Farmácia": "bi bi-capsule"})
+
+    def test_todas_atualiza_so_as_que_mudaram(self):
+        antes = self.icones()
+        self.assertIn("2 categoria(s)", self.comando("atribuir_icones", "--todas"))
+        self.assertEqual(
+            self.icones(),
+            {**antes, "Farmácia": "bi bi-capsule", "Aluguel": "bi bi-house-door-fill"},
+        )
+        self.assertIn("0 categoria(s)", self.comando("atribuir_icones", "--todas"))
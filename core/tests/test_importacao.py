@@ -0,0 +1,66 @@
+import datetime
+from decimal import Decimal
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from core.models import Lancamento
+from core.tests.base import CasoComLancamentos
+from core.utils.importacao import ErroLinha, ImportadorLancamentos, converter_valor
+
+
+class ImportacaoTests(CasoComLancamentos):
+    def test_importacao_em_lote(self):
+        importador = ImportadorLancamentos(self.usuario, conta=self.contas[0])
+        resultado = importador.importar(
+            iter(
+                [
+                    (2, {"data": "2024-03-01", "descricao": "Salário ACME", "valor": "50"}),
+                    (3, {"data": "2024-03-02", "descricao": "zzz", "valor": "5"}),
+                ]
+            )
+        )
+        self.assertEqual(resultado["importados"], 1)
+        self.verificar_razao()
+
+    def test_converter_valor(self):
+        self.assertEqual(converter_valor("R$ 1.234,565"), Decimal("1234.57"))
+        self.assertEqual(converter_valor("-0,005"), Decimal("-0.01"))
+        self.assertEqual(converter_valor("99999999.99"), Decimal("99999999.99"))
+        for texto in ("NaN", "sNaN", "Infinity", "-inf", "1e100", "123456789012", "99999999,995"):
+            with self.assertRaises(ErroLinha, msg=texto):
+                converter_valor(texto)
+
+    def test_valores_invalidos_nao_derrubam_o_arquivo(self):
+        valores = ["NaN", "Infinity", "123456789012", "12,345"]
+        importador = ImportadorLancamentos(
+            self.usuario, conta=self.contas[0], categoria=self.despesa
+        )
+        resultado = importador.importar(
+            (numero, {"data": "2024-03-01", "descricao": f"Linha {numero}", "valor": valor})
+            for numero, valor in enumerate(valores, start=2)
+        )
+        self.assertEqual(resultado["importados"], 1)
+        self.assertEqual([numero for numero, _ in resultado["erros"]], [2, 3, 4])
+        importado = Lancamento.objects.get(data=datetime.date(2024, 3, 1))
+        self.assertEqual((importado.descricao, importado.valor), ("Linha 5", Decimal("12.35")))
+        self.verificar_razao()
+
+    def test_csv_em_cp1252_pela_view(self):
+        conteudo = (
+            "data;descrição;valor\n"
+            "01/03/2024;Padaria São João;-12,50\n"
+            "02/03/2024;Inválido;NaN\n"
+        ).encode("cp1252")
+        resposta = self.client.post(
+            "/lancamentos/importar/",
+            {
+                "arquivo": SimpleUploadedFile("extrato.csv", conteudo),
+                "conta": self.contas[0].pk,
+                "categoria": self.despesa.pk,
+            },
+        )
+        self.assertEqual(resposta.status_code, 200)
+        resultado = resposta.context["resultado"]
+        self.assertEqual(resultado["importados"], 1)
+        self.assertEqual([numero for numero, _ in resultado["erros"]], [3])
+        self.assertTrue(Lancamento.objects.filter(descricao="Padaria São João").exists())
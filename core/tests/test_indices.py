@@ -0,0 +1,10 @@
+from django.contrib.auth.models import User
+
+from core.tests.base import CasoComLancamentos
+
+
+class VerificarIndicesTests(CasoComLancamentos):
+    def test_consultas_das_views_usam_indices(self):
+        saida = self.comando("verificar_indices")
+        self.assertIn("[ok] listar_lancamentos: página seguinte", saida)
+        self.assertFalse(User.objects.filter(username="verificar_indices").exists())
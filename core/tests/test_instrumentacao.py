@@ -0,0 +1,48 @@
+import io
+
+from django.core.signals import request_finished
+from django.db import close_old_connections
+from django.http import FileResponse
+from django.test import RequestFactory, override_settings
+
+from core.instrumentacao import InstrumentacaoMiddleware, histogramas
+from core.tests.base import CasoComLancamentos
+
+
+class InstrumentacaoTests(CasoComLancamentos):
+    def test_sem_server_timing_por_padrao(self):
+        resposta = self.client.get("/dashboard/")
+        self.assertNotIn("Server-Timing", resposta)
+
+    @override_settings(
+        INSTRUMENTACAO={"AMOSTRAGEM": 1.0, "JANELA": 16, "SERVER_TIMING": True}
+    )
+    def test_server_timing_quando_ligado(self):
+        resposta = self.client.get("/dashboard/")
+        self.assertIn("db;dur=", resposta["Server-Timing"])
+
+    def test_metricas_por_rota_somente_staff(self):
+        self.client.get("/dashboard/")
+        b"".join(self.client.get("/relatorio/?data_inicio=2024-01-01&data_fim=2024-12-31&formato=csv"))
+        self.assertEqual(self.client.get("/metricas/").status_code, 302)
+
+        self.usuario.is_staff = True
+        self.usuario.save()
+        texto = self.client.get("/metricas/").content.decode()
+        self.assertIn('fintrack_requisicao_segundos{rota="dashboard",quantile="0.99"}', texto)
+        self.assertIn('fintrack_consultas_count{rota="gerar_relatorio"}', texto)
+
+    def test_file_response_mantem_o_file_to_stream(self):
+        """Sem o file_to_stream o wsgi.file_wrapper (sendfile) não é usado."""
+        middleware = InstrumentacaoMiddleware(lambda request: FileResponse(io.BytesIO(b"abc")))
+        chave = ("requisicao_segundos", "-")
+        medidas = histogramas().contagens[chave]
+
+        resposta = middleware(RequestFactory().get("/"))
+        self.assertIsNotNone(resposta.file_to_stream)
+        self.assertEqual(histogramas().contagens[chave], medidas)
+        # Como no Client: fechar a resposta não pode fechar a conexão do teste
+        request_finished.disconnect(close_old_connections)
+        self.addCleanup(request_finished.connect, close_old_connections)
+        resposta.close()
+        self.assertEqual(histogramas().contagens[chave], medidas + 1)
@@ -0,0 +1,109 @@
+import json
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+
+from core.models import Conta, Lancamento, TokenCategoria, VersaoDados
+from core.tests.base import CasoComLancamentos
+
+
+class LoteTests(CasoComLancamentos):
+    url = "/api/lancamentos/lote/"
+
+    def enviar(self, corpo):
+        if not isinstance(corpo, str):
+            corpo = json.dumps(corpo)
+        return self.client.post(self.url, corpo, content_type="application/json")
+
+    def novo(self, **campos):
+        return {
+            "data": "2024-03-05",
+            "descricao": "Padaria centro",
+            "valor": "12.40",
+            "conta": self.contas[0].pk,
+            "categoria": self.despesa.pk,
+            **campos,
+        }
+
+    def test_lote_misto(self):
+        alheia = Conta.objects.create(
+            nome="Z", usuario=User.objects.create_user("beto", password="senha")
+        )
+        ids = list(
+            Lancamento.objects.filter(usuario=self.usuario)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        versao = VersaoDados.atual(self.usuario.id)
+
+        resposta = self.enviar(
+            {
+                "criar": [
+                    self.novo(ref="a"),
+                    self.novo(valor=0.1, categoria=self.receita.pk),
+                    self.novo(data="2024-13-06", valor="-1", conta=alheia.pk),
+                    "x",
+                ],
+                "atualizar": [
+                    {"id": ids[0], "valor": "200.00", "categoria": self.despesa.pk},
+                    {"id": ids[1], "descricao": "supermercado"},
+                    {"id": 999999},
+                    {"id": ids[2], "conta": alheia.pk},
+                ],
+                "excluir": [ids[3], ids[3], ids[4], "a"],
+            }
+        )
+        self.assertEqual(resposta.status_code, 200)
+        dados = resposta.json()
+        self.assertEqual([r["ok"] for r in dados["criar"]], [True, True, False, False])
+        self.assertEqual(dados["criar"][0]["ref"], "a")
+        self.assertEqual(set(dados["criar"][2]["erros"]), {"data", "valor", "conta"})
+        self.assertEqual([r["ok"] for r in dados["atualizar"]], [True, True, False, False])
+        self.assertEqual([r["ok"] for r in dados["excluir"]], [True, False, True, False])
+        self.assertEqual(dados["falhas"], 6)
+
+        self.assertEqual(VersaoDados.atual(self.usuario.id), versao + 1)
+        criado = Lancamento.objects.get(pk=dados["criar"][1]["id"])
+        self.assertEqual((criado.tipo, criado.valor), ("Receita", Decimal("0.10")))
+        alterado = Lancamento.objects.get(pk=ids[0])
+        self.assertEqual((alterado.tipo, alterado.valor), ("Despesa", Decimal("200.00")))
+        self.assertFalse(Lancamento.objects.filter(pk__in=[ids[3], ids[4]]).exists())
+        self.assertTrue(TokenCategoria.objects.filter(token="supermercado").exists())
+        self.verificar_razao()
+
+    def test_atomico(self):
+        antes = Lancamento.objects.count()
+        resposta = self.enviar(
+            {"criar": [self.novo(), self.novo(valor="-1")], "atomico": True}
+        )
+        self.assertEqual(resposta.status_code, 422)
+        self.assertFalse(resposta.json()["aplicado"])
+        self.assertEqual(Lancamento.objects.count(), antes)
+
+    def test_tipos_json_invalidos(self):
+        resposta = self.enviar(
+            {
+                "criar": [
+                    self.novo(data=123),
+                    self.novo(valor=True),
+                    self.novo(descricao=["x"]),
+                    self.novo(valor="NaN"),
+                    self.novo(valor=7),
+                ]
+            }
+        )
+        self.assertEqual(resposta.status_code, 200)
+        resultados = resposta.json()["criar"]
+        self.assertEqual([r["ok"] for r in resultados], [False, False, False, False, True])
+        self.assertEqual(list(resultados[0]["erros"]), ["data"])
+        self.assertEqual(list(resultados[1]["erros"]), ["valor"])
+        self.assertEqual(list(resultados[2]["erros"]), ["descricao"])
+
+    def test_pedidos_invalidos(self):
+        for corpo in ("{", "{}", "[]", {"criar": {}}):
+            self.assertEqual(self.enviar(corpo).status_code, 400, corpo)
+        with self.settings(API_LOTE_MAXIMO=1):
+            self.assertEqual(self.enviar({"excluir": [1, 2]}).status_code, 400)
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+        self.client.logout()
+        self.assertEqual(self.enviar({}).status_code, 401)
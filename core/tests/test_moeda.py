@@ -0,0 +1,77 @@
+from decimal import Decimal
+
+from django.template import Context, Template
+from django.test import SimpleTestCase
+
+from core.templatetags.format_filters import abreviar_numero, moeda, numero
+from core.utils.moeda import formatar_coluna
+
+
+class MoedaTests(SimpleTestCase):
+    def test_moeda_e_numero(self):
+        casos = {
+            Decimal("1234.5"): "1.234,50",
+            Decimal("1234567890.12"): "1.234.567.890,12",
+            # ROUND_HALF_UP sobre o Decimal exato, sem passar por float
+            Decimal("0.125"): "0,13",
+            Decimal("0.115"): "0,12",
+            Decimal("2.675"): "2,68",
+            Decimal("-1234.565"): "-1.234,57",
+            Decimal("-0.005"): "-0,01",
+            # Float entra pelo repr: 2.675 não vira 2.67499999...
+            2.675: "2,68",
+            0.1 + 0.2: "0,30",
+            7: "7,00",
+            "12.5": "12,50",
+        }
+        for valor, esperado in casos.items():
+            self.assertEqual(numero(valor), esperado, valor)
+            simbolo = f"-R$ {esperado[1:]}" if esperado.startswith("-") else f"R$ {esperado}"
+            self.assertEqual(moeda(valor), simbolo, valor)
+
+    def test_zero_sem_sinal(self):
+        for valor in (0, None, "", Decimal("0"), Decimal("-0"), Decimal("-0.004"), -0.0):
+            self.assertEqual(numero(valor), "0,00", repr(valor))
+            self.assertEqual(moeda(valor), "R$ 0,00", repr(valor))
+
+    def test_abreviar_numero(self):
+        casos = {
+            Decimal("999.99"): "999,99",
+            Decimal("999.995"): "1,00 mil",
+            Decimal("1000"): "1,00 mil",
+            Decimal("1234.565"): "1,23 mil",
+            Decimal("999994.99"): "999,99 mil",
+            Decimal("999999.995"): "1,00 milhões",
+            Decimal("1234567"): "1,23 milhões",
+            Decimal("1500000000"): "1,50 bilhões",
+            Decimal("1500000000000"): "1.500,00 bilhões",
+            Decimal("-1500"): "-1,50 mil",
+            Decimal("-999.99"): "-999,99",
+            Decimal("-0"): "0,00",
+            1500.0: "1,50 mil",
+            "2000000": "2,00 milhões",
+        }
+        for valor, esperado in casos.items():
+            self.assertEqual(abreviar_numero(valor), esperado, valor)
+        self.assertEqual(abreviar_numero("abc"), "abc")
+
+    def test_formatar_coluna(self):
+        valores = [Decimal("1.005"), Decimal("-0"), Decimal("-2.5"), Decimal("1234567.891")]
+        self.assertEqual(
+            formatar_coluna(valores),
+            ["R$ 1,01", "R$ 0,00", "-R$ 2,50", "R$ 1.234.567,89"],
+        )
+        self.assertEqual(
+            formatar_coluna(iter(valores), simbolo=False),
+            ["1,01", "0,00", "-2,50", "1.234.567,89"],
+        )
+        self.assertEqual(formatar_coluna([]), [])
+
+    def test_filtros_no_template(self):
+        template = Template(
+            "{% load format_filters %}{{ v|moeda }} {{ v|numero }} {{ v|abreviar_numero }}"
+        )
+        self.assertEqual(
+            template.render(Context({"v": Decimal("-2500.5")})),
+            "-R$ 2.500,50 -2.500,50 -2,50 mil",
+        )
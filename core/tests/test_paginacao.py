@@ -0,0 +1,44 @@
+import datetime
+
+from core.models import Lancamento
+from core.tests.base import CasoComLancamentos
+
+
+class PaginacaoTests(CasoComLancamentos):
+    def setUp(self):
+        super().setUp()
+        for i in range(120):
+            self.lancar(
+                self.contas[0],
+                self.despesa,
+                "1",
+                datetime.date(2023, 1, 1) + datetime.timedelta(days=i // 3),
+            )
+        self.ordem = list(
+            Lancamento.objects.filter(usuario=self.usuario)
+            .order_by("-data", "-pk")
+            .values_list("pk", flat=True)
+        )
+
+    def test_percorre_todas_as_paginas_sem_repetir(self):
+        vistos, url = [], "/lancamentos/"
+        while url:
+            resposta = self.client.get(url)
+            vistos += [l.pk for l in resposta.context["lancamentos"]]
+            cursor = resposta.context["cursor_proximo"]
+            url = f"/lancamentos/?apos={cursor}" if cursor else None
+        self.assertEqual(vistos, self.ordem)
+
+    def test_pagina_anterior(self):
+        primeira = self.client.get("/lancamentos/")
+        segunda = self.client.get(f"/lancamentos/?apos={primeira.context['cursor_proximo']}")
+        voltou = self.client.get(
+            f"/lancamentos/?antes={segunda.context['cursor_anterior']}"
+        )
+        self.assertEqual(
+            [l.pk for l in voltou.context["lancamentos"]], self.ordem[:50]
+        )
+
+    def test_filtro_e_cursor_invalido(self):
+        resposta = self.client.get("/lancamentos/?tipo=Receita&apos=lixo")
+        self.assertEqual(len(resposta.context["lancamentos"]), 3)
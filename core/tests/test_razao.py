@@ -0,0 +1,69 @@
+import datetime
+from decimal import Decimal
+
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Conta, Lancamento, TokenCategoria, VersaoDados
+from core.tests.base import CasoComLancamentos
+
+
+class TotaisDasContasTests(CasoComLancamentos):
+    def test_totais_acompanham_criacao_alteracao_e_exclusao(self):
+        c0, c1 = self.contas[0], self.contas[1]
+        lancamento = Lancamento.objects.get(conta=c0, tipo="Receita")
+
+        lancamento.conta = c1
+        lancamento.categoria = self.despesa
+        lancamento.tipo = "Despesa"
+        lancamento.valor = Decimal("5")
+        lancamento.save()
+
+        c0.refresh_from_db()
+        c1.refresh_from_db()
+        self.assertEqual(c0.saldo_total, Decimal("-10.25"))
+        self.assertEqual(c1.saldo_total, Decimal("85.25"))
+
+        lancamento.delete()
+        c1.refresh_from_db()
+        self.assertEqual(c1.saldo_total, Decimal("90.25"))
+        self.verificar_razao()
+
+    def test_save_da_conta_nao_sobrescreve_totais(self):
+        conta = Conta.objects.get(pk=self.contas[0].pk)
+        self.lancar(conta, self.receita, "7", datetime.date(2024, 3, 1))
+        conta.nome = "Renomeada"
+        conta.save()
+        conta.refresh_from_db()
+        self.assertEqual(conta.total_receitas, Decimal("107.50"))
+
+    def test_exclusao_em_cascata_estorna(self):
+        self.despesa.delete()
+        self.verificar_razao()
+
+    def test_exclusao_em_cascata_numa_passada(self):
+        conta = self.contas[0]
+        for i in range(60):
+            self.lancar(
+                conta, self.despesa, "1", datetime.date(2024, 5, 1 + i % 28), f"Padaria {i}"
+            )
+        versao = VersaoDados.atual(self.usuario.id)
+
+        with CaptureQueriesContext(connection) as consultas:
+            conta.delete()
+        self.assertLess(len(consultas), 30)
+        self.assertEqual(VersaoDados.atual(self.usuario.id), versao + 1)
+        self.verificar_razao()
+        self.assertFalse(
+            TokenCategoria.objects.filter(
+                usuario=self.usuario, token="padaria", ocorrencias__gt=0
+            ).exists()
+        )
+
+    def test_verificar_detecta_divergencia(self):
+        Conta.objects.filter(pk=self.contas[1].pk).update(total_receitas=0)
+        with self.assertRaises(CommandError):
+            self.comando("recalcular_saldos", "--verificar")
+        self.comando("recalcular_saldos")
+        self.comando("recalcular_saldos", "--verificar")
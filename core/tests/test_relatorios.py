@@ -0,0 +1,82 @@
+import datetime
+import json
+from decimal import Decimal
+from unittest.mock import patch
+
+from core.models import Lancamento
+from core.tests.base import CasoComLancamentos
+from core.utils.entrega import PARTES_POR_BLOCO
+from core.utils.relatorio_generator import gerar_relatorio_csv
+
+
+PERIODO = {"data_inicio": "2024-01-01", "data_fim": "2024-12-31"}
+
+
+class RelatoriosTests(CasoComLancamentos):
+    def baixar(self, formato, **parametros):
+        resposta = self.client.get("/relatorio/", {**PERIODO, **parametros, "formato": formato})
+        self.assertEqual(resposta.status_code, 200)
+        return b"".join(resposta)
+
+    def test_csv(self):
+        linhas = self.baixar("csv").decode().splitlines()
+        self.assertEqual(linhas[1], "Saldo Inicial,0.00")
+        self.assertEqual(linhas[6], "Data,Tipo,Categoria,Conta,Valor,Saldo,Descrição")
+        self.assertEqual(len(linhas), 7 + 6)
+
+    def test_jsonl_com_saldo_corrente(self):
+        linhas = [json.loads(l) for l in self.baixar("jsonl").decode().splitlines()]
+        resumo, lancamentos = linhas[0]["resumo"], linhas[1:]
+        saldo = Decimal(resumo["saldo_inicial"])
+        for linha in lancamentos:
+            valor = Decimal(linha["valor"])
+            saldo += valor if linha["tipo"] == "Receita" else -valor
+            self.assertEqual(Decimal(linha["saldo"]), saldo)
+        self.assertEqual(saldo, Decimal(resumo["saldo_final"]))
+
+    def test_pdf(self):
+        self.assertTrue(self.baixar("pdf").startswith(b"%PDF"))
+
+
+class RelatorioEmFluxoAsgiTests(CasoComLancamentos):
+    """No ASGI o CSV sai em blocos, sem gerar o arquivo inteiro antes."""
+
+    def setUp(self):
+        super().setUp()
+        self.async_client.force_login(self.usuario)
+        Lancamento.objects.bulk_create(
+            Lancamento(
+                usuario=self.usuario,
+                conta=self.contas[0],
+                categoria=self.despesa,
+                tipo="Despesa",
+                descricao=f"Compra {i}",
+                valor=1,
+                data=datetime.date(2024, 3, 1) + datetime.timedelta(days=i % 200),
+            )
+            for i in range(4 * PARTES_POR_BLOCO)
+        )
+        self.geradas = 0
+
+    def gerar_contando(self, contexto):
+        for parte in gerar_relatorio_csv(contexto):
+            self.geradas += 1
+            yield parte
+
+    async def test_csv_em_blocos(self):
+        with patch.dict(
+            "core.views.FORMATOS_EM_FLUXO",
+            {"csv": (self.gerar_contando, "text/csv; charset=utf-8")},
+        ):
+            resposta = await self.async_client.get(
+                "/relatorio/", {**PERIODO, "formato": "csv"}
+            )
+            self.assertTrue(resposta.is_async)
+            blocos = aiter(resposta.streaming_content)
+            primeiro = await anext(blocos)
+            self.assertLessEqual(self.geradas, PARTES_POR_BLOCO + 1)
+            restantes = [bloco async for bloco in blocos]
+
+        self.assertGreaterEqual(len(restantes), 4)
+        linhas = b"".join([primeiro, *restantes]).decode().splitlines()
+        self.assertEqual(len(linhas), 7 + 6 + 4 * PARTES_POR_BLOCO)
@@ -0,0 +1,72 @@
+import datetime
+import json
+import random
+from decimal import Decimal
+
+from django.core.management.base import CommandError
+
+from core.models import Lancamento, ResumoMensal
+from core.tests.base import CasoComLancamentos
+from core.utils.agregacoes import totais_periodo
+from core.utils.relatorio_generator import gerar_relatorio_jsonl, montar_contexto_relatorio
+
+
+class ResumosMensaisTests(CasoComLancamentos):
+    def test_totais_periodo_batem_com_o_historico(self):
+        aleatorio = random.Random(1)
+        for _ in range(150):
+            categoria = aleatorio.choice([self.receita, self.despesa])
+            self.lancar(
+                aleatorio.choice(self.contas),
+                categoria,
+                Decimal(aleatorio.randint(1, 10000)) / 100,
+                datetime.date(2022, 1, 1) + datetime.timedelta(days=aleatorio.randint(0, 900)),
+            )
+        lancamentos = list(Lancamento.objects.all())
+        for lancamento in lancamentos[:20]:
+            lancamento.data += datetime.timedelta(days=40)
+            lancamento.save()
+        for lancamento in lancamentos[20:30]:
+            lancamento.delete()
+        self.comando("recalcular_resumos", "--verificar")
+
+        lancamentos = list(Lancamento.objects.filter(usuario=self.usuario))
+        for _ in range(100):
+            inicio = datetime.date(2021, 12, 1) + datetime.timedelta(
+                days=aleatorio.randint(0, 1000)
+            )
+            fim = inicio + datetime.timedelta(days=aleatorio.choice([0, 1, 29, 31, 400]))
+            if aleatorio.random() < 0.2:
+                inicio = inicio.replace(day=1)
+
+            def soma(tipo, condicao):
+                return sum(
+                    (l.valor for l in lancamentos if l.tipo == tipo and condicao(l.data)),
+                    Decimal(0),
+                )
+
+            antes = lambda data: data < inicio
+            dentro = lambda data: inicio <= data <= fim
+            self.assertEqual(
+                totais_periodo(self.usuario, inicio, fim),
+                {
+                    "saldo_inicial": soma("Receita", antes) - soma("Despesa", antes),
+                    "receitas": soma("Receita", dentro),
+                    "despesas": soma("Despesa", dentro),
+                },
+                (inicio, fim),
+            )
+
+    def test_recalcular_resumos_reconstroi(self):
+        ResumoMensal.objects.all().delete()
+        with self.assertRaises(CommandError):
+            self.comando("recalcular_resumos", "--verificar")
+        self.comando("recalcular_resumos")
+        self.comando("recalcular_resumos", "--verificar")
+
+    def test_saldo_do_contexto_parte_do_periodo_anterior(self):
+        inicio, fim = datetime.date(2024, 1, 11), datetime.date(2024, 2, 2)
+        contexto = montar_contexto_relatorio(self.usuario, inicio, fim)
+        self.assertEqual(contexto["saldo_inicial"], Decimal("100.50"))
+        ultima = json.loads(list(gerar_relatorio_jsonl(contexto))[-1])
+        self.assertEqual(Decimal(ultima["saldo"]), contexto["saldo_final"])
@@ -0,0 +1,99 @@
+import datetime
+import io
+import random
+from decimal import Decimal
+from unittest.mock import patch
+
+import openpyxl
+
+from core.models import Conta, Lancamento
+from core.tests.base import CasoComLancamentos
+from core.utils.agregacoes import centavos
+from core.utils.relatorio_generator import gerar_relatorio_pdf, montar_contexto_relatorio
+
+
+class SaldoCorrenteTests(CasoComLancamentos):
+    def setUp(self):
+        super().setUp()
+        aleatorio = random.Random(5)
+        for _ in range(130):
+            categoria = aleatorio.choice([self.receita, self.despesa])
+            self.lancar(
+                aleatorio.choice(self.contas),
+                categoria,
+                Decimal(aleatorio.randint(1, 99999)) / 100,
+                datetime.date(2024, 1, 1) + datetime.timedelta(days=aleatorio.randint(0, 200)),
+            )
+
+    def esperados(self, conta=None):
+        saldo = self.saldo_esperado(ate=datetime.date(1900, 1, 1), conta=conta)
+        lancamentos = Lancamento.objects.filter(usuario=self.usuario).order_by("data", "pk")
+        if conta:
+            lancamentos = lancamentos.filter(conta=conta)
+        saldos = {}
+        for lancamento in lancamentos:
+            saldo += lancamento.valor if lancamento.tipo == "Receita" else -lancamento.valor
+            saldos[lancamento.pk] = saldo
+        return saldos
+
+    def test_saldo_em_todas_as_paginas(self):
+        esperados, vistos, url = self.esperados(), 0, "/lancamentos/"
+        while url:
+            resposta = self.client.get(url)
+            self.assertTrue(resposta.context["mostrar_saldo"])
+            for lancamento in resposta.context["lancamentos"]:
+                self.assertEqual(lancamento.saldo, esperados[lancamento.pk])
+                vistos += 1
+            cursor = resposta.context["cursor_proximo"]
+            url = f"/lancamentos/?apos={cursor}" if cursor else None
+        self.assertEqual(vistos, len(esperados))
+
+    def test_saldo_por_conta(self):
+        conta = self.contas[1]
+        esperados = self.esperados(conta)
+        resposta = self.client.get(f"/lancamentos/?conta={conta.pk}&data_fim=2024-05-01")
+        self.assertTrue(resposta.context["lancamentos"])
+        for lancamento in resposta.context["lancamentos"]:
+            self.assertEqual(lancamento.saldo, esperados[lancamento.pk])
+
+    def test_sem_saldo_com_filtro_de_tipo(self):
+        resposta = self.client.get("/lancamentos/?tipo=Receita")
+        self.assertFalse(resposta.context["mostrar_saldo"])
+        self.assertNotContains(resposta, ">Saldo<")
+
+
+class SaldoZeradoTests(CasoComLancamentos):
+    """No SQLite a soma da janela é float: 0.30 - 0.10 - 0.20 dá -2.7e-17."""
+
+    def setUp(self):
+        super().setUp()
+        self.conta = Conta.objects.create(nome="Zerada", usuario=self.usuario)
+        data = datetime.date(2025, 1, 1)
+        self.lancar(self.conta, self.receita, "0.30", data)
+        self.lancar(self.conta, self.despesa, "0.10", data)
+        self.lancar(self.conta, self.despesa, "0.20", data)
+
+    def test_centavos_sem_zero_negativo(self):
+        self.assertEqual(str(centavos(0.3 - 0.1 - 0.2)), "0.00")
+
+    def test_listagem(self):
+        resposta = self.client.get(f"/lancamentos/?conta={self.conta.pk}")
+        self.assertEqual(str(resposta.context["lancamentos"][0].saldo), "0.00")
+        self.assertNotContains(resposta, "-R$ 0,00")
+
+    def test_relatorios(self):
+        Lancamento.objects.exclude(conta=self.conta).delete()
+        periodo = {"data_inicio": "2025-01-01", "data_fim": "2025-01-31"}
+        csv = b"".join(self.client.get("/relatorio/", {**periodo, "formato": "csv"}))
+        self.assertTrue(csv.decode().splitlines()[-1].endswith(",0.00,x"))
+
+        excel = b"".join(self.client.get("/relatorio/", {**periodo, "formato": "excel"}))
+        linhas = list(openpyxl.load_workbook(io.BytesIO(excel)).active.iter_rows(values_only=True))
+        self.assertEqual(linhas[-1][5], "R$ 0,00")
+
+        contexto = montar_contexto_relatorio(
+            self.usuario, datetime.date(2025, 1, 1), datetime.date(2025, 1, 31)
+        )
+        with patch("core.utils.relatorio_generator.Table") as tabela:
+            gerar_relatorio_pdf(contexto)
+        self.assertEqual(tabela.call_args.args[0][-1][5], "R$ 0,00")
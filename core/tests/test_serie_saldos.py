@@ -0,0 +1,56 @@
+import datetime
+import random
+from decimal import Decimal
+
+from core.tests.base import CasoComLancamentos
+
+
+class SerieSaldosTests(CasoComLancamentos):
+    def setUp(self):
+        super().setUp()
+        aleatorio = random.Random(3)
+        for _ in range(200):
+            categoria = aleatorio.choice([self.receita, self.despesa])
+            self.lancar(
+                aleatorio.choice(self.contas),
+                categoria,
+                Decimal(aleatorio.randint(1, 99999)) / 100,
+                datetime.date(2020, 1, 1) + datetime.timedelta(days=aleatorio.randint(0, 5 * 365)),
+            )
+
+    def test_saldo_diario(self):
+        dados = self.client.get("/api/saldos/?inicio=2021-03-15&fim=2021-06-20").json()
+        self.assertEqual(dados["granularidade"], "dia")
+        self.assertEqual(
+            Decimal(dados["saldo_anterior"]), self.saldo_esperado(datetime.date(2021, 3, 14))
+        )
+        for ponto in dados["pontos"]:
+            data = datetime.date.fromisoformat(ponto["periodo"])
+            self.assertEqual(Decimal(ponto["saldo"]), self.saldo_esperado(data))
+
+    def test_saldo_mensal_por_conta(self):
+        conta = self.contas[2]
+        dados = self.client.get(
+            f"/api/saldos/?inicio=2020-02-10&fim=2024-12-31&granularidade=mes&conta={conta.pk}"
+        ).json()
+        self.assertEqual(dados["granularidade"], "mes")
+        for ponto in dados["pontos"]:
+            mes = datetime.date.fromisoformat(ponto["periodo"])
+            fim_do_mes = (mes + datetime.timedelta(days=32)).replace(day=1) - datetime.timedelta(days=1)
+            self.assertEqual(Decimal(ponto["saldo"]), self.saldo_esperado(fim_do_mes, conta))
+
+    def test_granularidade_sobe_para_caber(self):
+        url = "/api/saldos/?inicio=2020-01-01&fim=2024-12-31"
+        self.assertEqual(self.client.get(url).json()["granularidade"], "semana")
+        self.assertEqual(self.client.get(url + "&pontos=10").json()["granularidade"], "ano")
+
+    def test_parametros_invalidos(self):
+        self.assertEqual(self.client.get("/api/saldos/?conta=x").status_code, 400)
+        self.assertEqual(self.client.get("/api/saldos/?granularidade=hora").status_code, 400)
+        self.assertEqual(
+            self.client.get("/api/saldos/?inicio=2024-02-01&fim=2024-01-01").status_code, 400
+        )
+        self.assertEqual(self.client.get("/api/saldos/?fim=0001-01-05").status_code, 400)
+        self.assertEqual(self.client.get("/api/saldos/?conta=99999").status_code, 404)
+        self.client.logout()
+        self.assertEqual(self.client.get("/api/saldos/").status_code, 401)
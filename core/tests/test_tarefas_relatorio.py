@@ -0,0 +1,73 @@
+import datetime
+import io
+
+from django.test import override_settings
+
+from core.models import TarefaRelatorio
+from core.tests.base import CasoComLancamentos
+
+
+PERIODO = {"data_inicio": "2024-01-01", "data_fim": "2024-12-31"}
+
+
+class TarefasRelatorioTests(CasoComLancamentos):
+    def test_relatorio_grande_vai_para_a_fila(self):
+        with override_settings(RELATORIO_LIMITE_SINCRONO=3):
+            resposta = self.client.get("/relatorio/", {**PERIODO, "formato": "pdf"})
+        tarefa = TarefaRelatorio.objects.get()
+        self.assertRedirects(resposta, f"/relatorio/tarefas/{tarefa.pk}/")
+        self.assertContains(self.client.get(resposta.url), "sendo gerado")
+
+        status = self.client.get(f"/relatorio/tarefas/{tarefa.pk}/?formato=json").json()
+        self.assertEqual(status["status"], TarefaRelatorio.PENDENTE)
+        self.assertIsNone(status["download"])
+        self.assertEqual(
+            self.client.get(f"/relatorio/tarefas/{tarefa.pk}/download/").status_code, 404
+        )
+
+    def test_worker_gera_o_arquivo(self):
+        from core.management.commands.processar_relatorios import renderizar_tarefa
+
+        tarefa = TarefaRelatorio.objects.create(
+            usuario=self.usuario,
+            data_inicio=datetime.date(2024, 1, 1),
+            data_fim=datetime.date(2024, 12, 31),
+            formato="excel",
+        )
+        self.assertEqual(renderizar_tarefa(tarefa.pk), TarefaRelatorio.CONCLUIDO)
+        resposta = self.client.get(f"/relatorio/tarefas/{tarefa.pk}/download/")
+        self.assertEqual(resposta.status_code, 200)
+        self.assertTrue(b"".join(resposta).startswith(b"PK"))
+
+    def test_tarefas_expiradas_saem_com_o_arquivo(self):
+        from core.management.commands.processar_relatorios import Command, renderizar_tarefa
+
+        tarefas = [
+            TarefaRelatorio.objects.create(
+                usuario=self.usuario,
+                data_inicio=datetime.date(2024, 1, 1),
+                data_fim=datetime.date(2024, 12, 31),
+                formato="pdf",
+            )
+            for _ in range(3)
+        ]
+        for tarefa in tarefas[:2]:
+            renderizar_tarefa(tarefa.pk)
+            tarefa.refresh_from_db()
+        antiga, recente, pendente = tarefas
+        TarefaRelatorio.objects.filter(pk=antiga.pk).update(
+            concluido_em=antiga.concluido_em - datetime.timedelta(days=8)
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Command(stdout=io.StringIO()).expirar()
+        self.assertEqual(
+            set(TarefaRelatorio.objects.values_list("pk", flat=True)),
+            {recente.pk, pendente.pk},
+        )
+        self.assertFalse(antiga.arquivo.storage.exists(antiga.arquivo.name))
+        self.assertTrue(recente.arquivo.storage.exists(recente.arquivo.name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.usuario.delete()
+        self.assertFalse(recente.arquivo.storage.exists(recente.arquivo.name))
@@ -9,6 +9,7 @@ from django.contrib.auth import views as auth_views
 urlpatterns = [
     path('', views.home, name='home'),
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('api/saldos/', views.saldos_por_periodo, name='saldos_por_periodo'),
     
     #Perfil usuarios
     path('perfil/', views.perfil_usuario, name='perfil_usuario'),
@@ -28,6 +29,8 @@ urlpatterns = [
 
     #Relatorios
     path('relatorio/', views.gerar_relatorio, name='gerar_relatorio'),
+    path('relatorio/tarefas/<int:tarefa_id>/', views.status_relatorio, name='status_relatorio'),
+    path('relatorio/tarefas/<int:tarefa_id>/download/', views.baixar_relatorio, name='baixar_relatorio'),
 
     #Contas bancárias
     path('bancos/', views.listar_contas, name='listar_contas'),
@@ -46,9 +49,13 @@ urlpatterns = [
     path("lancar/", views.lancar_movimento, name="lancar"),
     path("lancamentos/", views.listar_lancamentos, name="listar_lancamentos"),
     path('lancamento/novo/', views.criar_lancamento, name='criar_lancamento'),
+    path('lancamentos/importar/', views.importar_lancamentos, name='importar_lancamentos'),
+    path('lancamentos/sugerir-categoria/', views.sugerir_categoria, name='sugerir_categoria'),
+    path('api/lancamentos/lote/', views.lancamentos_em_lote, name='lancamentos_em_lote'),
     path('lancamento/<int:lancamento_id>/editar/', views.editar_lancamento, name='editar_lancamento'),
     path('lancamentos/<int:pk>/excluir/', views.excluir_lancamento, name='excluir_lancamento'),
     path("lancamento/<int:lancamento_id>/comprovante/", views.visualizar_comprovante, name="visualizar_comprovante"),
+    path("lancamento/<int:lancamento_id>/comprovante/arquivo/", views.baixar_comprovante, name="baixar_comprovante"),
     
     
     #Categorias
@@ -57,4 +64,7 @@ urlpatterns = [
     path('categorias/<int:id>/editar/', views.editar_categoria, name='editar_categoria'),
     path("categorias/<int:id>/excluir/", views.excluir_categoria, name="excluir_categoria"),
 
+    # Métricas (Prometheus)
+    path('metricas/', views.metricas, name='metricas'),
+
 ]
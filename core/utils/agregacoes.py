@@ -0,0 +1,322 @@
+import datetime
+from decimal import Decimal
+
+from django.db.models import (
+    Case,
+    DecimalField,
+    F,
+    Func,
+    Q,
+    Sum,
+    Value,
+    When,
+    Window,
+)
+from django.db.models.functions import Trunc, TruncMonth
+
+from core.models import Conta, Lancamento, ResumoMensal
+
+
+CENTAVO = Decimal("0.01")
+
+RECEITA = Q(tipo="Receita")
+DESPESA = Q(tipo="Despesa")
+
+# Receitas somam e despesas subtraem do saldo
+VALOR_COM_SINAL = Case(
+    When(DESPESA, then=-F("valor")), default=F("valor"), output_field=DecimalField()
+)
+
+
+def centavos(valor):
+    """
+    Arredonda para centavos; somas no SQLite voltam como float. O "+ 0"
+    transforma o -0.00 de um float como -2.7e-17 em 0.00.
+    """
+    return Decimal(valor or 0).quantize(CENTAVO) + 0
+
+
+def totais_por_conta(lancamentos):
+    """
+    Receitas e despesas de cada conta em uma única consulta agrupada.
+
+    Retorna {conta_id: (receitas, despesas)}. Recalcula a partir do
+    histórico; para leitura use os totais mantidos em Conta.
+    """
+    linhas = (
+        lancamentos.order_by()
+        .values("conta_id")
+        .annotate(
+            receitas=Sum("valor", filter=RECEITA),
+            despesas=Sum("valor", filter=DESPESA),
+        )
+    )
+    return {
+        linha["conta_id"]: (centavos(linha["receitas"]), centavos(linha["despesas"]))
+        for linha in linhas
+    }
+
+
+def resumo_financeiro(contas):
+    """
+    Totais gerais e saldos por conta do usuário.
+
+    Lê os totais mantidos em cada Conta, então custa uma única consulta
+    independente da quantidade de contas e de lançamentos.
+    """
+    total_receitas = total_despesas = saldos_iniciais = Decimal(0)
+
+    saldos_por_conta = []
+    for conta in contas:
+        total_receitas += conta.total_receitas
+        total_despesas += conta.total_despesas
+        saldos_iniciais += conta.saldo_inicial
+        saldos_por_conta.append(
+            {
+                "nome": conta.nome,
+                "saldo": conta.saldo_total,
+                "receitas": conta.total_receitas,
+                "despesas": conta.total_despesas,
+            }
+        )
+
+    return {
+        "saldo_total": saldos_iniciais + total_receitas - total_despesas,
+        "total_receitas": total_receitas,
+        "total_despesas": total_despesas,
+        "saldos_por_conta": saldos_por_conta,
+    }
+
+
+def resumos_mensais(lancamentos):
+    """
+    Recalcula os resumos mensais a partir do histórico, agrupando por
+    usuário, conta, categoria e mês em uma única consulta.
+    """
+    return (
+        lancamentos.order_by()
+        .annotate(mes=TruncMonth("data"))
+        .values("usuario_id", "conta_id", "categoria_id", "mes")
+        .annotate(
+            receitas=Sum("valor", filter=RECEITA),
+            despesas=Sum("valor", filter=DESPESA),
+        )
+    )
+
+
+def _fim_do_mes(data):
+    proximo = (data.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
+    return proximo - datetime.timedelta(days=1)
+
+
+def totais_periodo(usuario, inicio, fim, conta=None):
+    """
+    Saldo anterior a ``inicio`` e receitas/despesas entre ``inicio`` e ``fim``,
+    de todas as contas do usuário ou só de ``conta``.
+
+    Os meses inteiros vêm de ResumoMensal; apenas os dias soltos do mês de
+    ``inicio`` e do mês de ``fim`` são somados direto dos lançamentos. São
+    duas consultas, independente do tamanho do histórico.
+    """
+    mes_inicio = inicio.replace(day=1)
+
+    # Meses completamente dentro do período
+    if inicio == mes_inicio:
+        primeiro_dia = inicio
+    else:
+        primeiro_dia = _fim_do_mes(inicio) + datetime.timedelta(days=1)
+    if fim == _fim_do_mes(fim):
+        ultimo_dia = fim
+    else:
+        ultimo_dia = fim.replace(day=1) - datetime.timedelta(days=1)
+
+    agregados = {
+        "anteriores_receitas": Sum("receitas", filter=Q(mes__lt=mes_inicio)),
+        "anteriores_despesas": Sum("despesas", filter=Q(mes__lt=mes_inicio)),
+    }
+    periodo_bruto = Q(data__range=(inicio, fim))
+    if primeiro_dia <= ultimo_dia:
+        meses = Q(mes__range=(primeiro_dia, ultimo_dia.replace(day=1)))
+        agregados["receitas"] = Sum("receitas", filter=meses)
+        agregados["despesas"] = Sum("despesas", filter=meses)
+        periodo_bruto = Q(data__gte=inicio, data__lt=primeiro_dia) | Q(
+            data__gt=ultimo_dia, data__lte=fim
+        )
+
+    filtro = {"usuario": usuario}
+    if conta is not None:
+        filtro["conta"] = conta
+
+    resumos = ResumoMensal.objects.filter(**filtro).aggregate(**agregados)
+
+    anteriores = Q(data__gte=mes_inicio, data__lt=inicio)
+    brutos = Lancamento.objects.filter(anteriores | periodo_bruto, **filtro).aggregate(
+        anteriores_receitas=Sum("valor", filter=anteriores & RECEITA),
+        anteriores_despesas=Sum("valor", filter=anteriores & DESPESA),
+        receitas=Sum("valor", filter=periodo_bruto & RECEITA),
+        despesas=Sum("valor", filter=periodo_bruto & DESPESA),
+    )
+
+    def total(campo):
+        return centavos((resumos.get(campo) or 0) + (brutos[campo] or 0))
+
+    return {
+        "saldo_inicial": total("anteriores_receitas") - total("anteriores_despesas"),
+        "receitas": total("receitas"),
+        "despesas": total("despesas"),
+    }
+
+
+# -------------------- SALDO CORRENTE --------------------
+
+
+def saldos_iniciais(usuario, conta=None):
+    """Saldo de abertura de ``conta`` ou a soma das contas do usuário."""
+    if conta is not None:
+        return conta.saldo_inicial
+    total = Conta.objects.filter(usuario=usuario).aggregate(
+        total=Sum("saldo_inicial")
+    )["total"]
+    return centavos(total)
+
+
+def saldo_corrente(saldo_inicial=0):
+    """
+    Expressão para annotate: saldo logo após cada lançamento, na ordem
+    (data, id), partindo de ``saldo_inicial``. É um SUM() OVER calculado
+    pelo banco sobre as linhas da própria consulta, então só faz sentido
+    numa consulta com todos os lançamentos do trecho (sem filtro de tipo
+    ou categoria). No SQLite o resultado volta como float: use centavos().
+    """
+    return Window(
+        Sum(VALOR_COM_SINAL), order_by=[F("data").asc(), F("pk").asc()]
+    ) + Value(Decimal(saldo_inicial), output_field=DecimalField())
+
+
+def saldo_antes(usuario, data, pk, conta=None):
+    """
+    Saldo, com os saldos de abertura, imediatamente antes do lançamento
+    (data, pk). Os meses anteriores vêm de ResumoMensal e só o mês de
+    ``data`` é somado dos lançamentos, então o custo não cresce com o
+    histórico.
+    """
+    filtro = {"usuario": usuario}
+    if conta is not None:
+        filtro["conta"] = conta
+    mes = data.replace(day=1)
+
+    meses = ResumoMensal.objects.filter(mes__lt=mes, **filtro).aggregate(
+        receitas=Sum("receitas"), despesas=Sum("despesas")
+    )
+    no_mes = Lancamento.objects.filter(
+        Q(data__lt=data) | Q(data=data, pk__lt=pk), data__gte=mes, **filtro
+    ).aggregate(saldo=Sum(VALOR_COM_SINAL))
+
+    return (
+        saldos_iniciais(usuario, conta)
+        + centavos(meses["receitas"])
+        - centavos(meses["despesas"])
+        + centavos(no_mes["saldo"])
+    )
+
+
+def anexar_saldos(lancamentos, usuario, conta=None):
+    """
+    Preenche ``lancamento.saldo`` numa página contínua da listagem (todos os
+    lançamentos entre o mais antigo e o mais recente dela). A janela roda só
+    sobre as linhas da página, partindo do saldo antes da mais antiga.
+    """
+    if not lancamentos:
+        return lancamentos
+    primeiro = min(lancamentos, key=lambda l: (l.data, l.pk))
+    anterior = saldo_antes(usuario, primeiro.data, primeiro.pk, conta=conta)
+
+    saldos = dict(
+        Lancamento.objects.filter(pk__in=[l.pk for l in lancamentos])
+        .annotate(saldo=saldo_corrente(anterior))
+        .values_list("pk", "saldo")
+    )
+    for lancamento in lancamentos:
+        lancamento.saldo = centavos(saldos[lancamento.pk])
+    return lancamentos
+
+
+# -------------------- SÉRIE DE SALDOS --------------------
+
+# Da mais fina para a mais grossa, com a duração aproximada de cada período
+GRANULARIDADES = {
+    "dia": ("day", 1),
+    "semana": ("week", 7),
+    "mes": ("month", 30.44),
+    "ano": ("year", 365.25),
+}
+
+
+class _SomaAcumulada(Func):
+    # SUM() usado dentro de Window sobre somas já agrupadas; o Sum do Django
+    # recusa receber outro agregado
+    function = "SUM"
+    window_compatible = True
+    output_field = DecimalField()
+
+
+def escolher_granularidade(inicio, fim, max_pontos, minima="dia"):
+    """
+    A granularidade mais fina, a partir de ``minima``, que cobre o período com
+    no máximo ``max_pontos`` pontos; "ano" se nenhuma couber.
+    """
+    dias = (fim - inicio).days + 1
+    nomes = list(GRANULARIDADES)
+    for nome in nomes[nomes.index(minima) :]:
+        if dias / GRANULARIDADES[nome][1] <= max_pontos:
+            return nome
+    return nomes[-1]
+
+
+def serie_saldos(usuario, inicio, fim, granularidade="dia", conta=None):
+    """
+    Receitas, despesas e saldo ao fim de cada período entre ``inicio`` e
+    ``fim``, de todas as contas do usuário ou só de ``conta``.
+
+    O saldo acumulado é calculado no banco com SUM() OVER (ORDER BY período),
+    numa única consulta agrupada sobre o índice (usuario, data); o ponto de
+    partida é o saldo inicial das contas mais o saldo anterior a ``inicio``,
+    que vem dos resumos mensais. Períodos sem lançamentos não aparecem.
+
+    Retorna (saldo_anterior, pontos).
+    """
+    anterior = saldos_iniciais(usuario, conta) + totais_periodo(
+        usuario, inicio, inicio, conta=conta
+    )["saldo_inicial"]
+
+    lancamentos = Lancamento.objects.filter(usuario=usuario, data__range=(inicio, fim))
+    if conta is not None:
+        lancamentos = lancamentos.filter(conta=conta)
+
+    linhas = (
+        lancamentos.order_by()
+        .annotate(periodo=Trunc("data", GRANULARIDADES[granularidade][0]))
+        .values("periodo")
+        .annotate(
+            receitas=Sum("valor", filter=RECEITA, default=0),
+            despesas=Sum("valor", filter=DESPESA, default=0),
+        )
+        .annotate(
+            acumulado=Window(
+                _SomaAcumulada(F("receitas") - F("despesas")),
+                order_by=F("periodo").asc(),
+            )
+        )
+        .order_by("periodo")
+    )
+
+    pontos = [
+        {
+            "periodo": linha["periodo"],
+            "receitas": centavos(linha["receitas"]),
+            "despesas": centavos(linha["despesas"]),
+            "saldo": anterior + centavos(linha["acumulado"]),
+        }
+        for linha in linhas
+    ]
+    return anterior, pontos
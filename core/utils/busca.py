@@ -0,0 +1,148 @@
+"""
+Busca textual nas descrições dos lançamentos, com índice e ranking.
+
+SQLite: tabela virtual FTS5 (core_lancamento_busca) com conteúdo externo
+em core_lancamento, mantida por triggers, então também acompanha
+bulk_create, update() e exclusões em cascata. Indexa a descrição e o id do
+usuário; a consulta cruza as duas listas de ocorrências em vez de filtrar
+os resultados de todos os usuários. Acentos e maiúsculas são ignorados.
+
+PostgreSQL: índice GIN sobre to_tsvector('simple', descricao), mantido
+pelo próprio banco. A configuração "simple" não reduz as palavras ao
+radical, o que quebraria a busca por prefixo ("merc" não casa com o
+radical de "mercado"); diferente do SQLite, os acentos contam.
+
+Outros bancos caem num icontains por termo, sem índice.
+"""
+
+import re
+
+from django.db import connections
+from django.db.models import F, FloatField, Q, Value
+
+TABELA_FTS = "core_lancamento_busca"
+CONFIG_POSTGRES = "simple"
+MAX_TERMOS = 8
+
+_TERMO = re.compile(r"\w+")
+
+_FTS5 = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_FTS} USING fts5(
+        descricao, usuario_id,
+        content='core_lancamento', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    # O id do usuário só filtra; a relevância vem da descrição
+    f"INSERT INTO {TABELA_FTS}({TABELA_FTS}, rank) VALUES ('rank', 'bm25(1.0, 0.0)')",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_ai AFTER INSERT ON core_lancamento BEGIN
+        INSERT INTO {TABELA_FTS}(rowid, descricao, usuario_id)
+        VALUES (new.id, new.descricao, new.usuario_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_ad AFTER DELETE ON core_lancamento BEGIN
+        INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, descricao, usuario_id)
+        VALUES ('delete', old.id, old.descricao, old.usuario_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_au
+    AFTER UPDATE OF descricao, usuario_id ON core_lancamento BEGIN
+        INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, descricao, usuario_id)
+        VALUES ('delete', old.id, old.descricao, old.usuario_id);
+        INSERT INTO {TABELA_FTS}(rowid, descricao, usuario_id)
+        VALUES (new.id, new.descricao, new.usuario_id);
+    END
+    """,
+    f"INSERT INTO {TABELA_FTS}({TABELA_FTS}) VALUES ('rebuild')",
+]
+
+_GIN = [
+    f"""
+    CREATE INDEX IF NOT EXISTS {TABELA_FTS}_gin ON core_lancamento
+    USING gin (to_tsvector('{CONFIG_POSTGRES}'::regconfig, COALESCE(descricao, '')))
+    """,
+]
+
+
+def instalar_indice_busca(connection):
+    """
+    Cria (ou recria) o índice de busca e o preenche a partir dos lançamentos.
+    Idempotente: pode rodar de novo, por exemplo depois de uma migração que
+    reconstrua core_lancamento no SQLite, o que apaga os triggers.
+    """
+    comandos = {"sqlite": _FTS5, "postgresql": _GIN}.get(connection.vendor, [])
+    with connection.cursor() as cursor:
+        for sql in comandos:
+            cursor.execute(sql)
+
+
+def remover_indice_busca(connection):
+    if connection.vendor == "sqlite":
+        comandos = [
+            f"DROP TRIGGER IF EXISTS {TABELA_FTS}_ai",
+            f"DROP TRIGGER IF EXISTS {TABELA_FTS}_ad",
+            f"DROP TRIGGER IF EXISTS {TABELA_FTS}_au",
+            f"DROP TABLE IF EXISTS {TABELA_FTS}",
+        ]
+    elif connection.vendor == "postgresql":
+        comandos = [f"DROP INDEX IF EXISTS {TABELA_FTS}_gin"]
+    else:
+        comandos = []
+    with connection.cursor() as cursor:
+        for sql in comandos:
+            cursor.execute(sql)
+
+
+def termos_busca(texto):
+    """Palavras do texto digitado, sem a sintaxe de consulta de cada banco."""
+    return _TERMO.findall((texto or "").lower())[:MAX_TERMOS]
+
+
+def buscar(lancamentos, usuario, texto):
+    """
+    Restringe ``lancamentos`` aos que têm todas as palavras de ``texto`` (a
+    última também como prefixo, para a busca enquanto se digita) e anota
+    ``relevancia``, maior para os mais relevantes. Combina com os demais
+    filtros do queryset.
+    """
+    termos = termos_busca(texto)
+    if not termos:
+        return lancamentos.annotate(relevancia=Value(0.0, output_field=FloatField()))
+
+    vendor = connections[lancamentos.db].vendor
+    if vendor == "sqlite":
+        consulta = " AND ".join(
+            f'"{termo}"' + ("*" if i == len(termos) - 1 else "")
+            for i, termo in enumerate(termos)
+        )
+        return lancamentos.filter(
+            busca__documento__corresponde=(
+                f"{{usuario_id}} : {usuario.id} AND {{descricao}} : ({consulta})"
+            )
+        ).annotate(relevancia=-F("busca__rank"))
+
+    if vendor == "postgresql":
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+        vetor = SearchVector("descricao", config=CONFIG_POSTGRES)
+        consulta = SearchQuery(
+            " & ".join(termos[:-1] + [f"{termos[-1]}:*"]),
+            config=CONFIG_POSTGRES,
+            search_type="raw",
+        )
+        return (
+            lancamentos.annotate(documento=vetor)
+            .filter(documento=consulta)
+            .annotate(relevancia=SearchRank(vetor, consulta))
+        )
+
+    filtro = Q()
+    for termo in termos:
+        filtro &= Q(descricao__icontains=termo)
+    return lancamentos.filter(filtro).annotate(
+        relevancia=Value(0.0, output_field=FloatField())
+    )
@@ -0,0 +1,114 @@
+import functools
+import hashlib
+import os
+import shutil
+import tempfile
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import caches
+
+from core.models import VersaoDados
+
+
+# Incrementar quando as colunas ou o layout dos relatórios mudarem, para não
+# servir arquivos gerados no formato antigo
+LAYOUT = 2
+
+
+def chave_relatorio(usuario_id, inicio, fim, formato):
+    """
+    Chave do relatório gerado. Inclui a versão dos dados do usuário, então
+    qualquer alteração no razão faz as entradas antigas deixarem de ser usadas.
+    """
+    versao = VersaoDados.atual(usuario_id)
+    return (
+        f"relatorio:{usuario_id}:{inicio:%Y-%m-%d}:{fim:%Y-%m-%d}:{formato}"
+        f":v{versao}:l{LAYOUT}"
+    )
+
+
+class CacheDjango:
+    """Guarda os bytes em um cache do Django; a expulsão fica a cargo dele."""
+
+    def __init__(self, alias="default", timeout=None):
+        self.cache = caches[alias]
+        self.timeout = timeout
+
+    def obter(self, chave):
+        conteudo = self.cache.get(chave)
+        return BytesIO(conteudo) if conteudo is not None else None
+
+    def guardar(self, chave, arquivo):
+        arquivo.seek(0)
+        self.cache.set(chave, arquivo.read(), self.timeout)
+        arquivo.seek(0)
+
+
+class CacheArquivos:
+    """
+    Um arquivo por relatório em ``diretorio``, com tamanho total limitado a
+    ``max_bytes``. Cada leitura atualiza o mtime do arquivo, e ao passar do
+    limite os menos usados recentemente são apagados (LRU).
+    """
+
+    def __init__(self, diretorio, max_bytes):
+        self.diretorio = Path(diretorio)
+        self.max_bytes = max_bytes
+
+    def _caminho(self, chave):
+        return self.diretorio / hashlib.sha256(chave.encode()).hexdigest()
+
+    def obter(self, chave):
+        caminho = self._caminho(chave)
+        try:
+            os.utime(caminho)
+            return open(caminho, "rb")
+        except FileNotFoundError:
+            return None
+
+    def guardar(self, chave, arquivo):
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+
+        # Grava em um temporário e renomeia para leitores nunca verem o
+        # arquivo pela metade.
+        arquivo.seek(0)
+        with tempfile.NamedTemporaryFile(
+            dir=self.diretorio, prefix=".", delete=False
+        ) as tmp:
+            shutil.copyfileobj(arquivo, tmp)
+        os.replace(tmp.name, self._caminho(chave))
+        arquivo.seek(0)
+
+        self._podar()
+
+    def _podar(self):
+        entradas = []
+        total = 0
+        for entrada in os.scandir(self.diretorio):
+            if entrada.name.startswith("."):  # gravação em andamento
+                continue
+            try:
+                info = entrada.stat()
+            except FileNotFoundError:
+                continue
+            entradas.append((info.st_mtime, info.st_size, entrada.path))
+            total += info.st_size
+
+        for _, tamanho, caminho in sorted(entradas):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(caminho)
+            except FileNotFoundError:
+                pass
+            total -= tamanho
+
+
+@functools.cache
+def cache_relatorios():
+    config = settings.RELATORIO_CACHE
+    if config["BACKEND"] == "django":
+        return CacheDjango(config.get("ALIAS", "default"), config.get("TIMEOUT"))
+    return CacheArquivos(config["DIRETORIO"], config["MAX_BYTES"])
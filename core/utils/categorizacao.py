@@ -0,0 +1,106 @@
+import bisect
+import re
+from collections import defaultdict
+
+from django.db.models import Q
+
+from core.models import Categoria, TokenCategoria
+from core.utils.texto import normalizar, palavras
+
+
+CONFIANCA_MINIMA = 0.5
+
+
+class IndiceCategorias:
+    """
+    Índice palavra → categorias de um usuário, montado a partir do
+    TokenCategoria, para sugerir a categoria de uma descrição em memória.
+
+    Cada palavra da descrição vota nas categorias em que já apareceu, na
+    proporção das ocorrências; a categoria mais votada é a sugestão e a
+    confiança é a sua fração dos votos.
+    """
+
+    def __init__(self, usuario_id, linhas, tipos):
+        self.usuario_id = usuario_id
+        self.tipos = tipos  # {categoria_id: "Receita" | "Despesa"}
+        self.por_token = defaultdict(dict)
+        for token, categoria_id, ocorrencias in linhas:
+            if ocorrencias > 0:
+                self.por_token[token][categoria_id] = ocorrencias
+        self._ordenados = None
+
+    @classmethod
+    def carregar(cls, usuario_id, descricao=None):
+        """
+        Carrega o índice inteiro do usuário ou, com ``descricao``, só as
+        palavras dela (a última também como prefixo, para quem ainda está
+        digitando).
+        """
+        linhas = TokenCategoria.objects.filter(usuario_id=usuario_id, ocorrencias__gt=0)
+        if descricao is not None:
+            filtro = Q(token__in=palavras(descricao))
+            prefixo = cls._prefixo(descricao)
+            if prefixo:
+                filtro |= Q(token__gte=prefixo, token__lt=prefixo + "\uffff")
+            linhas = linhas.filter(filtro)
+
+        tipos = dict(
+            Categoria.objects.filter(usuario_id=usuario_id).values_list("id", "tipo")
+        )
+        return cls(
+            usuario_id,
+            linhas.values_list("token", "categoria_id", "ocorrencias"),
+            tipos,
+        )
+
+    @staticmethod
+    def _prefixo(descricao):
+        partes = re.findall(r"[^\W\d_]+", normalizar(descricao))
+        return partes[-1] if partes and len(partes[-1]) >= 3 else ""
+
+    def _com_prefixo(self, prefixo):
+        if self._ordenados is None:
+            self._ordenados = sorted(self.por_token)
+        inicio = bisect.bisect_left(self._ordenados, prefixo)
+        fim = bisect.bisect_left(self._ordenados, prefixo + "\uffff")
+        return self._ordenados[inicio:fim]
+
+    def sugerir(self, descricao, tipo=None, prefixo=False):
+        """
+        Retorna (categoria_id, confiança) ou (None, 0). Com ``tipo`` só
+        considera categorias de receita ou de despesa.
+        """
+        tokens = set(palavras(descricao))
+        if prefixo:
+            ultimo = self._prefixo(descricao)
+            if ultimo:
+                tokens.discard(ultimo)
+                tokens.update(self._com_prefixo(ultimo))
+
+        votos = defaultdict(float)
+        for token in tokens:
+            categorias = self.por_token.get(token)
+            if not categorias:
+                continue
+            if tipo:
+                categorias = {
+                    c: n for c, n in categorias.items() if self.tipos.get(c) == tipo
+                }
+                if not categorias:
+                    continue
+            total = sum(categorias.values())
+            for categoria_id, ocorrencias in categorias.items():
+                votos[categoria_id] += ocorrencias / total
+
+        if not votos:
+            return None, 0
+        categoria_id = max(votos, key=votos.get)
+        return categoria_id, votos[categoria_id] / sum(votos.values())
+
+    def aprender(self, categoria_id, descricao):
+        """Atualiza só a cópia em memória (o banco é atualizado no save/importação)."""
+        for token in palavras(descricao):
+            categorias = self.por_token[token]
+            categorias[categoria_id] = categorias.get(categoria_id, 0) + 1
+        self._ordenados = None
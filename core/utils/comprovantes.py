@@ -0,0 +1,129 @@
+"""
+Comprovantes guardados pelo conteúdo: o nome do arquivo é o SHA-256 dos
+bytes, então o mesmo recibo enviado várias vezes ocupa espaço uma vez só.
+Quantos lançamentos usam cada arquivo fica em core.models.Comprovante.
+"""
+
+import hashlib
+import io
+import os
+import re
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from PIL import Image, ImageOps
+
+
+PASTA = "comprovantes"
+_EXTENSAO = re.compile(r"\.[a-z0-9]{1,8}")
+_POR_CONTEUDO = re.compile(rf"{PASTA}/[0-9a-f]{{2}}/([0-9a-f]{{64}})")
+
+
+def hash_arquivo(arquivo):
+    """SHA-256 em hexadecimal de um File do Django, lido em blocos."""
+    digest = hashlib.sha256()
+    for bloco in arquivo.chunks():
+        digest.update(bloco)
+    arquivo.seek(0)
+    return digest.hexdigest()
+
+
+def nome_por_conteudo(digest, nome_original):
+    """comprovantes/ab/abcd…ef.jpg; a extensão original é mantida."""
+    extensao = os.path.splitext(nome_original)[1].lower()
+    if not _EXTENSAO.fullmatch(extensao):
+        extensao = ""
+    return f"{PASTA}/{digest[:2]}/{digest}{extensao}"
+
+
+def digest_do_nome(nome):
+    """O hash embutido num nome por conteúdo, ou None (arquivos antigos)."""
+    encontrado = _POR_CONTEUDO.match(nome)
+    return encontrado.group(1) if encontrado else None
+
+
+def versao_comprovante(nome, variante=""):
+    """Identificador do conteúdo para ETag e URLs, ou None (arquivos antigos)."""
+    digest = digest_do_nome(nome)
+    if digest is None:
+        return None
+    return f"{digest}-{variante}" if variante else digest
+
+
+class ArmazenamentoPorConteudo(FileSystemStorage):
+    """Ignora o nome enviado; se o conteúdo já existe, reaproveita o arquivo."""
+
+    def _save(self, name, content):
+        from django.utils import timezone
+
+        from core.models import Comprovante
+
+        nome = nome_por_conteudo(hash_arquivo(content), name)
+        if not self.exists(nome):
+            return super()._save(nome, content)
+
+        # Renovar o registro tira o arquivo da coleta de órfãos
+        # (processar_comprovantes) até a referência ser contada. Se não há
+        # registro, a coleta pode tê-lo apagado depois do exists(): o update
+        # espera a transação dela terminar e o arquivo é gravado de novo, por
+        # um temporário, para quem já o lê não ver um arquivo pela metade.
+        if Comprovante.objects.filter(arquivo=nome).update(atualizado_em=timezone.now()):
+            return nome
+        temporario = super()._save(f"{nome}.tmp", content)
+        os.replace(self.path(temporario), self.path(nome))
+        return nome
+
+
+def armazenamento_comprovantes():
+    return ArmazenamentoPorConteudo()
+
+
+# -------------------- REDUÇÕES --------------------
+
+
+def _jpeg(imagem, qualidade):
+    saida = io.BytesIO()
+    imagem.save(saida, "JPEG", quality=qualidade, optimize=True)
+    return ContentFile(saida.getvalue())
+
+
+def gerar_reducoes(arquivo, previa_px, miniatura_px, qualidade):
+    """
+    Prévia e miniatura em JPEG, com o maior lado limitado a ``previa_px`` e
+    ``miniatura_px``. Levanta PIL.UnidentifiedImageError se o arquivo não
+    for imagem (PDF, por exemplo).
+    """
+    with Image.open(arquivo) as original:
+        # Em JPEG, decodifica já numa escala reduzida (bem mais rápido)
+        original.draft("RGB", (previa_px, previa_px))
+        imagem = ImageOps.exif_transpose(original)
+        if imagem.mode in ("RGBA", "LA", "P"):
+            imagem = imagem.convert("RGBA")
+            fundo = Image.new("RGB", imagem.size, "white")
+            fundo.paste(imagem, mask=imagem.getchannel("A"))
+            imagem = fundo
+        elif imagem.mode != "RGB":
+            imagem = imagem.convert("RGB")
+        imagem.thumbnail((previa_px, previa_px))
+
+    miniatura = imagem.copy()
+    miniatura.thumbnail((miniatura_px, miniatura_px))
+    return _jpeg(imagem, qualidade), _jpeg(miniatura, qualidade)
+
+
+def anexar_comprovantes(lancamentos):
+    """
+    Preenche ``lancamento.arquivo_comprovante`` (Comprovante ou None) numa
+    única consulta, para os templates usarem prévia e miniatura.
+    """
+    from core.models import Comprovante
+
+    nomes = {l.comprovante.name for l in lancamentos if l.comprovante}
+    por_nome = (
+        {c.arquivo: c for c in Comprovante.objects.filter(arquivo__in=nomes)}
+        if nomes
+        else {}
+    )
+    for lancamento in lancamentos:
+        lancamento.arquivo_comprovante = por_nome.get(lancamento.comprovante.name)
+    return lancamentos
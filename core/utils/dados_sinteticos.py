@@ -0,0 +1,150 @@
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from core.models import (
+    AcumuladorMovimentos,
+    Categoria,
+    Conta,
+    ContadorRotulos,
+    Lancamento,
+    VersaoDados,
+)
+from core.utils.icones import atribuir_icones
+
+
+CONTAS = ["Nubank", "Itaú", "Bradesco", "Santander", "Inter", "Carteira", "Caixa"]
+
+# nome, tipo, peso (frequência relativa), faixa de valor, descrições típicas
+CATEGORIAS = [
+    (
+        "Mercado",
+        "Despesa",
+        20,
+        (30, 600),
+        ["Supermercado Pão de Açúcar", "Carrefour", "Atacadão", "Assaí Atacadista"],
+    ),
+    (
+        "Restaurante",
+        "Despesa",
+        14,
+        (25, 250),
+        ["iFood", "Restaurante Madero", "Outback", "Padaria Real"],
+    ),
+    (
+        "Transporte",
+        "Despesa",
+        12,
+        (8, 90),
+        ["Uber *Trip", "99 Táxi", "Recarga Bilhete Único"],
+    ),
+    (
+        "Combustível",
+        "Despesa",
+        6,
+        (80, 350),
+        ["Posto Shell", "Posto Ipiranga", "Posto BR"],
+    ),
+    ("Farmácia", "Despesa", 5, (15, 300), ["Drogasil", "Droga Raia", "Pague Menos"]),
+    ("Luz", "Despesa", 2, (90, 450), ["Conta de luz Enel", "Conta de luz Cemig"]),
+    ("Internet", "Despesa", 2, (99, 199), ["Vivo Fibra", "Claro Net Virtua"]),
+    (
+        "Aluguel",
+        "Despesa",
+        2,
+        (1200, 3500),
+        ["Aluguel apartamento", "Aluguel imobiliária"],
+    ),
+    ("Netflix", "Despesa", 3, (20, 60), ["Netflix.com", "Spotify", "Amazon Prime"]),
+    ("Academia", "Despesa", 2, (90, 180), ["Smart Fit", "Bodytech"]),
+    ("Educação", "Despesa", 2, (40, 900), ["Udemy", "Alura", "Mensalidade faculdade"]),
+    ("Roupas", "Despesa", 3, (60, 500), ["Renner", "C&A", "Zara"]),
+    ("Presentes", "Despesa", 1, (50, 400), ["Presente aniversário", "Amazon.com.br"]),
+    ("Salário", "Receita", 3, (3500, 12000), ["Salário ACME Ltda", "Salário mensal"]),
+    (
+        "Freela",
+        "Receita",
+        2,
+        (300, 4000),
+        ["Pix recebido cliente", "Projeto freelance"],
+    ),
+    (
+        "Investimento",
+        "Receita",
+        2,
+        (10, 900),
+        ["Rendimento CDB", "Dividendos ITSA4", "Resgate Tesouro Selic"],
+    ),
+    ("Venda", "Receita", 1, (50, 2000), ["Venda OLX", "Venda Mercado Livre"]),
+]
+
+
+def gerar_usuario(
+    username,
+    rng,
+    contas=4,
+    categorias=len(CATEGORIAS),
+    lancamentos=1000,
+    anos=3,
+    senha=None,
+    lote=2000,
+):
+    """
+    Cria um usuário com contas, categorias e ``lancamentos`` distribuídos
+    pelos últimos ``anos``, gravando em lote como a importação de extratos.
+
+    ``rng`` é um random.Random, para que a mesma semente gere os mesmos dados.
+    """
+    with transaction.atomic():
+        usuario = User.objects.create_user(username, password=senha)
+
+        contas_criadas = Conta.objects.bulk_create(
+            Conta(
+                nome=nome,
+                saldo_inicial=Decimal(rng.randrange(0, 500_000)) / 100,
+                usuario=usuario,
+            )
+            for nome in CONTAS[:contas]
+        )
+
+        modelos = CATEGORIAS[:categorias]
+        categorias_criadas = [
+            Categoria(nome=nome, tipo=tipo, usuario=usuario)
+            for nome, tipo, *_ in modelos
+        ]
+        atribuir_icones(categorias_criadas)
+        Categoria.objects.bulk_create(categorias_criadas)
+        pesos = [peso for _, _, peso, _, _ in modelos]
+
+        hoje = datetime.date.today()
+        dias = max(anos * 365, 1)
+        movimentos = AcumuladorMovimentos()
+        rotulos = ContadorRotulos()
+
+        for inicio in range(0, lancamentos, lote):
+            linhas = []
+            for _ in range(min(lote, lancamentos - inicio)):
+                indice = rng.choices(range(len(modelos)), weights=pesos)[0]
+                _, tipo, _, (minimo, maximo), descricoes = modelos[indice]
+                linhas.append(
+                    Lancamento(
+                        usuario=usuario,
+                        conta=rng.choice(contas_criadas),
+                        categoria=categorias_criadas[indice],
+                        tipo=tipo,
+                        descricao=rng.choice(descricoes),
+                        valor=Decimal(rng.randrange(minimo * 100, maximo * 100)) / 100,
+                        data=hoje - datetime.timedelta(days=rng.randrange(dias)),
+                    )
+                )
+            Lancamento.objects.bulk_create(linhas)
+            movimentos.adicionar(l.movimento() for l in linhas)
+            rotulos.adicionar(l.rotulo() for l in linhas)
+
+        movimentos.aplicar()
+        rotulos.aplicar()
+        VersaoDados.incrementar(usuario.id)
+
+    return usuario
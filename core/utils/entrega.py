@@ -0,0 +1,221 @@
+"""
+Entrega de arquivos privados (comprovantes) com ETag forte, respostas 304,
+Range e transferência sem cópia, e de relatórios em fluxo.
+
+No ASGI o Django só envia em fluxo iteradores assíncronos: um gerador
+síncrono ou um FileResponse é consumido inteiro (sync_to_async(list)) antes
+do primeiro byte. responder_em_fluxo() e responder_arquivo() escolhem o
+iterador certo para a pilha em que a requisição chegou.
+
+Transferência sem cópia só existe no WSGI, onde a resposta é um
+FileResponse sobre uma janela do arquivo e o wsgi.file_wrapper do gunicorn
+síncrono usa sendfile, a partir da posição do arquivo e limitado ao
+Content-Length. No ASGI (a implantação padrão, gunicorn com UvicornWorker)
+não há file_wrapper nem sendfile: o corpo é lido em blocos numa thread, sem
+carregar o arquivo inteiro, mas passando por Python. Para servir comprovantes
+sem cópia no ASGI configure COMPROVANTES["ACCEL_REDIRECT"]: o Django só
+autoriza e o nginx entrega (com Range e sendfile) via X-Accel-Redirect.
+"""
+
+import itertools
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+
+TAMANHO_BLOCO = 64 * 1024
+PARTES_POR_BLOCO = 500
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+class _Trecho:
+    """Janela [inicio, inicio + tamanho) de um arquivo aberto, lida em sequência."""
+
+    def __init__(self, arquivo, inicio, tamanho):
+        arquivo.seek(inicio)
+        self.arquivo = arquivo
+        self.restante = tamanho
+
+    def read(self, tamanho=-1):
+        if tamanho < 0 or tamanho > self.restante:
+            tamanho = self.restante
+        dados = self.arquivo.read(tamanho)
+        self.restante -= len(dados)
+        return dados
+
+    def fileno(self):
+        return self.arquivo.fileno()
+
+    def close(self):
+        self.arquivo.close()
+
+
+async def _ler_em_blocos(trecho):
+    try:
+        ler = sync_to_async(trecho.read, thread_sensitive=False)
+        while bloco := await ler(TAMANHO_BLOCO):
+            yield bloco
+    finally:
+        trecho.close()
+
+
+async def _consumir_em_thread(partes, por_vez=PARTES_POR_BLOCO):
+    """
+    Percorre um gerador síncrono, que pode estar lendo um cursor do banco, na
+    thread compartilhada do sync_to_async (a mesma da view síncrona que o
+    criou, então a mesma conexão), ``por_vez`` partes a cada ida.
+    """
+    iterador = iter(partes)
+    proximas = sync_to_async(lambda: list(itertools.islice(iterador, por_vez)))
+    try:
+        while lote := await proximas():
+            yield b"".join(p.encode() if isinstance(p, str) else p for p in lote)
+    finally:
+        if hasattr(iterador, "close"):
+            await sync_to_async(iterador.close)()
+
+
+def responder_em_fluxo(request, partes, content_type):
+    """StreamingHttpResponse com ``partes`` (str ou bytes em UTF-8) nas duas pilhas."""
+    if isinstance(request, ASGIRequest):
+        partes = _consumir_em_thread(partes)
+    return StreamingHttpResponse(partes, content_type=content_type)
+
+
+def _responder_trecho(request, trecho, content_type):
+    if isinstance(request, ASGIRequest):
+        resposta = StreamingHttpResponse(_ler_em_blocos(trecho), content_type=content_type)
+    else:
+        resposta = FileResponse(trecho, content_type=content_type)
+    resposta["Content-Length"] = trecho.restante
+    return resposta
+
+
+def responder_arquivo(request, arquivo, content_type, nome_download, anexo=False):
+    """
+    Resposta com um arquivo já aberto (relatório gerado ou em cache). No WSGI
+    é um FileResponse; no ASGI o corpo é lido em blocos numa thread.
+    """
+    if not isinstance(request, ASGIRequest):
+        return FileResponse(
+            arquivo, content_type=content_type, as_attachment=anexo, filename=nome_download
+        )
+    inicio = arquivo.tell()
+    tamanho = arquivo.seek(0, os.SEEK_END) - inicio
+    resposta = _responder_trecho(request, _Trecho(arquivo, inicio, tamanho), content_type)
+    resposta["Content-Disposition"] = content_disposition_header(anexo, nome_download)
+    return resposta
+
+
+def intervalo_pedido(request, tamanho, etag, modificado):
+    """
+    (inicio, fim) inclusivo do cabeçalho Range, None para o arquivo inteiro
+    ou "invalido" se o intervalo não cabe no arquivo (416). Só um intervalo
+    por pedido; múltiplos intervalos recebem o arquivo inteiro, como a RFC
+    9110 permite.
+    """
+    cabecalho = request.META.get("HTTP_RANGE", "")
+    encontrado = _RANGE.fullmatch(cabecalho.strip())
+    if request.method != "GET" or not encontrado:
+        return None
+
+    # If-Range: o intervalo só vale se o cliente ainda tem esta versão
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if if_range:
+        if if_range.startswith(('"', "W/")):
+            if if_range != etag:
+                return None
+        elif parse_http_date_safe(if_range) != modificado:
+            return None
+
+    inicio, fim = encontrado.groups()
+    if not inicio and not fim:
+        return None
+    if not inicio:
+        # bytes=-N: os últimos N bytes
+        sufixo = int(fim)
+        if sufixo == 0 or tamanho == 0:
+            return "invalido"
+        return max(tamanho - sufixo, 0), tamanho - 1
+    inicio = int(inicio)
+    fim = min(int(fim), tamanho - 1) if fim else tamanho - 1
+    if inicio >= tamanho or inicio > fim:
+        return "invalido"
+    return inicio, fim
+
+
+def servir_arquivo(request, armazenamento, nome, versao=None, nome_download="", anexo=False):
+    """
+    Responde ``request`` com o arquivo ``nome`` de ``armazenamento``.
+
+    ``versao`` identifica o conteúdo (o hash, para arquivos guardados por
+    conteúdo) e vira o ETag forte; se a URL traz ``v=<versao>`` a resposta é
+    imutável e o navegador nem revalida. Sem versão, o ETag vem do tamanho e
+    da data de modificação.
+    """
+    try:
+        arquivo = armazenamento.open(nome, "rb")
+    except FileNotFoundError:
+        raise Http404("Arquivo não encontrado.")
+
+    estado = os.fstat(arquivo.fileno())
+    tamanho, modificado = estado.st_size, int(estado.st_mtime)
+    etag = f'"{versao}"' if versao else f'"{estado.st_mtime_ns:x}-{tamanho:x}"'
+
+    cabecalhos = {
+        "ETag": etag,
+        "Last-Modified": http_date(modificado),
+        "Cache-Control": (
+            "private, max-age=31536000, immutable"
+            if versao and request.GET.get("v") == versao
+            else "private, no-cache"
+        ),
+        "Accept-Ranges": "bytes",
+    }
+
+    condicional = get_conditional_response(
+        request, etag=etag, last_modified=modificado
+    )
+    if condicional is not None:
+        arquivo.close()
+        for campo, valor in cabecalhos.items():
+            condicional[campo] = valor
+        return condicional
+
+    content_type = mimetypes.guess_type(nome)[0] or "application/octet-stream"
+    nome_download = nome_download or os.path.basename(nome)
+    cabecalhos["Content-Disposition"] = content_disposition_header(anexo, nome_download)
+
+    intervalo = intervalo_pedido(request, tamanho, etag, modificado)
+    if intervalo == "invalido":
+        arquivo.close()
+        resposta = HttpResponse(status=416)
+        resposta["Content-Range"] = f"bytes */{tamanho}"
+        return resposta
+    inicio, fim = intervalo or (0, tamanho - 1)
+    comprimento = max(fim - inicio + 1, 0)
+
+    prefixo_proxy = settings.COMPROVANTES["ACCEL_REDIRECT"]
+    if prefixo_proxy:
+        # O nginx trata o Range sozinho a partir dos cabeçalhos originais
+        arquivo.close()
+        resposta = HttpResponse(content_type=content_type)
+        resposta["X-Accel-Redirect"] = quote(prefixo_proxy.rstrip("/") + "/" + nome)
+    else:
+        trecho = _Trecho(arquivo, inicio, comprimento)
+        resposta = _responder_trecho(request, trecho, content_type)
+        if intervalo:
+            resposta.status_code = 206
+            resposta["Content-Range"] = f"bytes {inicio}-{fim}/{tamanho}"
+
+    for campo, valor in cabecalhos.items():
+        resposta[campo] = valor
+    return resposta
@@ -0,0 +1,120 @@
+import re
+
+from core.utils.texto import normalizar
+
+
+ICONE_PADRAO = "bi bi-cash-coin"
+
+ICONES_POR_PALAVRA = {
+    # Despesas - Contas e Serviços
+    "luz": "bi bi-lightbulb-fill",
+    "energia": "bi bi-lightning-charge-fill",
+    "internet": "bi bi-wifi",
+    "telefone": "bi bi-phone",
+    "água": "bi bi-droplet-half",
+    "netflix": "bi bi-tv-fill",
+    "spotify": "bi bi-music-note-beamed",
+    "amazon": "bi bi-box-seam-fill",
+    "prime": "bi bi-box-seam-fill",
+    # Despesas - Casa
+    "mercado": "bi bi-basket-fill",
+    "supermercado": "bi bi-cart4",
+    "aluguel": "bi bi-house-door-fill",
+    "condomínio": "bi bi-building",
+    "limpeza": "bi bi-bucket-fill",
+    "móveis": "bi bi-couch",
+    "eletrodoméstico": "bi bi-plug-fill",
+    # Transporte
+    "transporte": "bi bi-truck-front",
+    "carro": "bi bi-car-front-fill",
+    "uber": "bi bi-taxi-front-fill",
+    "gasolina": "bi bi-fuel-pump-fill",
+    "combustível": "bi bi-fuel-pump-fill",
+    "passagem": "bi bi-ticket-detailed",
+    "ônibus": "bi bi-bus-front-fill",
+    "viagem": "bi bi-airplane-fill",
+    # Alimentação
+    "comida": "bi bi-cup-straw",
+    "lanches": "bi bi-cup-hot-fill",
+    "restaurante": "bi bi-egg-fried",
+    "pizza": "bi bi-pie-chart-fill",
+    "hamburguer": "bi bi-cup-hot-fill",
+    "delivery": "bi bi-truck",
+    # Saúde
+    "remédio": "bi bi-capsule-pill",
+    "farmácia": "bi bi-capsule",
+    "médico": "bi bi-heart-pulse-fill",
+    "plano": "bi bi-card-checklist",
+    "hospital": "bi bi-hospital-fill",
+    # Renda / Receita
+    "salário": "bi bi-cash-stack",
+    "freela": "bi bi-briefcase-fill",
+    "pix": "bi bi-qr-code-scan",
+    "renda": "bi bi-graph-up",
+    "venda": "bi bi-cart-check-fill",
+    "bônus": "bi bi-award-fill",
+    # Bancos e Pagamentos
+    "banco": "bi bi-bank",
+    "transferência": "bi bi-arrow-left-right",
+    "cartao": "bi bi-credit-card-2-back-fill",
+    "cartão": "bi bi-credit-card-2-back-fill",
+    "boleto": "bi bi-receipt",
+    "nubank": "bi bi-credit-card",
+    "inter": "bi bi-bank",
+    "santander": "bi bi-building-fill",
+    "bradesco": "bi bi-piggy-bank-fill",
+    "itau": "bi bi-wallet2",
+    # Poupança e Finanças
+    "carteira": "bi bi-wallet-fill",
+    "poupança": "bi bi-piggy-bank-fill",
+    "investimento": "bi bi-bar-chart-fill",
+    "cripto": "bi bi-currency-bitcoin",
+    "ações": "bi bi-graph-up-arrow",
+    # Diversos
+    "outro": "bi bi-tag-fill",
+    "roupas": "bi bi-shop-window",
+    "presentes": "bi bi-gift-fill",
+    "academia": "bi bi-dumbbell",
+    "pets": "bi bi-paw-fill",
+    "filmes": "bi bi-film",
+    "estudos": "bi bi-book-half",
+    "educação": "bi bi-mortarboard-fill",
+    "curso": "bi bi-easel-fill",
+    "eventos": "bi bi-calendar-event-fill",
+}
+
+
+# Todas as palavras numa única alternação, comparadas sem acento. As mais
+# longas vêm primeiro para que, na mesma posição, "supermercado" vença
+# "mercado" e "internet" vença "inter".
+_ICONES = {normalizar(palavra): icone for palavra, icone in ICONES_POR_PALAVRA.items()}
+_PALAVRAS = re.compile(
+    "|".join(re.escape(p) for p in sorted(_ICONES, key=lambda p: (-len(p), p)))
+)
+
+
+def icone_para(nome):
+    """
+    Ícone de uma categoria pelo nome.
+
+    Vale a palavra-chave que aparece primeiro no nome; se várias começam na
+    mesma posição, a mais longa. Sem nenhuma, devolve ``ICONE_PADRAO``.
+    """
+    encontrada = _PALAVRAS.search(normalizar(nome))
+    return _ICONES[encontrada.group()] if encontrada else ICONE_PADRAO
+
+
+def atribuir_icones(categorias, sobrescrever=False):
+    """
+    Preenche ``icone`` em memória, sem salvar, para uso com bulk_create ou
+    bulk_update. Devolve as categorias que mudaram.
+    """
+    alteradas = []
+    for categoria in categorias:
+        if categoria.icone and not sobrescrever:
+            continue
+        icone = icone_para(categoria.nome)
+        if icone != categoria.icone:
+            categoria.icone = icone
+            alteradas.append(categoria)
+    return alteradas
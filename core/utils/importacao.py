@@ -0,0 +1,276 @@
+import codecs
+import csv
+import datetime
+import io
+import re
+import time
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from django.db import transaction
+
+from core.models import (
+    AcumuladorMovimentos,
+    Categoria,
+    Conta,
+    ContadorRotulos,
+    Lancamento,
+    VersaoDados,
+)
+from core.utils.categorizacao import CONFIANCA_MINIMA, IndiceCategorias
+from core.utils.texto import normalizar
+
+
+FORMATOS_DATA = ("%Y-%m-%d", "%d/%m/%Y", "%d/%m/%y", "%Y%m%d")
+
+# Limites de Lancamento.valor: o bulk_create não valida, e o SQLite aceitaria
+# valores que o PostgreSQL recusa no meio do lote
+_CAMPO_VALOR = Lancamento._meta.get_field("valor")
+CENTAVO = Decimal(1).scaleb(-_CAMPO_VALOR.decimal_places)
+VALOR_MAXIMO = Decimal(10) ** (_CAMPO_VALOR.max_digits - _CAMPO_VALOR.decimal_places)
+
+
+class ErroLinha(ValueError):
+    pass
+
+
+def converter_valor(texto):
+    """
+    Aceita "1234.56", "1.234,56", "-50,00" e "R$ 10,00", arredondando para
+    centavos. NaN, infinito e valores que não cabem no campo são erros da linha.
+    """
+    texto = (texto or "").replace("R$", "").replace(" ", "").strip()
+    if "," in texto:
+        texto = texto.replace(".", "").replace(",", ".")
+    try:
+        # Infinity e números grandes demais para os centavos falham no quantize
+        valor = Decimal(texto).quantize(CENTAVO, ROUND_HALF_UP)
+    except InvalidOperation:
+        raise ErroLinha(f"valor inválido: {texto!r}")
+    if not valor.is_finite():
+        raise ErroLinha(f"valor inválido: {texto!r}")
+    if abs(valor) >= VALOR_MAXIMO:
+        raise ErroLinha(f"valor acima do limite: {texto!r}")
+    return valor
+
+
+def converter_data(texto):
+    texto = (texto or "").strip()
+    for formato in FORMATOS_DATA:
+        try:
+            return datetime.datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    raise ErroLinha(f"data inválida: {texto!r}")
+
+
+# -------------------- LEITORES --------------------
+
+
+def ler_csv(arquivo):
+    """
+    Lê um CSV com cabeçalho (data, descricao, valor e, opcionalmente, conta,
+    categoria e tipo), separado por vírgula ou ponto e vírgula.
+
+    Gera (número da linha, dict) sem carregar o arquivo inteiro. Como no OFX,
+    arquivos que não começam em UTF-8 são lidos como cp1252, a codificação dos
+    extratos de muitos bancos.
+    """
+    inicio = arquivo.read(64 * 1024)
+    arquivo.seek(0)
+    try:
+        # Decodificador incremental: o trecho pode cortar um caractere ao meio
+        codecs.getincrementaldecoder("utf-8")().decode(inicio)
+        codificacao = "utf-8-sig"
+    except UnicodeDecodeError:
+        codificacao = "cp1252"
+    texto = io.TextIOWrapper(
+        arquivo, encoding=codificacao, errors="replace", newline=""
+    )
+    amostra = texto.readline()
+    delimitador = ";" if amostra.count(";") > amostra.count(",") else ","
+    cabecalho = [
+        normalizar(campo)
+        for campo in next(csv.reader([amostra], delimiter=delimitador))
+    ]
+
+    for numero, linha in enumerate(csv.reader(texto, delimiter=delimitador), start=2):
+        if any(linha):
+            yield numero, dict(zip(cabecalho, linha))
+
+
+_TAG_OFX = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<\r\n]*)")
+
+
+def ler_ofx(arquivo):
+    """
+    Lê as transações (<STMTTRN>) de um extrato OFX, SGML (1.x) ou XML (2.x),
+    linha a linha.
+
+    Gera (número da linha, dict) com data, descricao, valor e tipo.
+    """
+    inicio = arquivo.read(1024)
+    arquivo.seek(0)
+    codificacao = "utf-8" if b"UTF-8" in inicio.upper() else "cp1252"
+    texto = io.TextIOWrapper(arquivo, encoding=codificacao, errors="replace")
+
+    transacao = None
+    for numero, linha in enumerate(texto, start=1):
+        for fechamento, tag, valor in _TAG_OFX.findall(linha):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if fechamento and transacao is not None:
+                    yield transacao.pop("_linha"), _transacao_ofx(transacao)
+                    transacao = None
+                elif not fechamento:
+                    transacao = {"_linha": numero}
+            elif transacao is not None and not fechamento:
+                transacao[tag] = valor.strip()
+
+
+def _transacao_ofx(transacao):
+    valor = transacao.get("TRNAMT", "")
+    return {
+        "data": transacao.get("DTPOSTED", "")[:8],
+        "descricao": transacao.get("MEMO") or transacao.get("NAME", ""),
+        "valor": valor,
+        "tipo": "Despesa" if valor.strip().startswith("-") else "Receita",
+    }
+
+
+LEITORES = {"csv": ler_csv, "ofx": ler_ofx}
+
+
+def detectar_formato(nome_arquivo):
+    extensao = nome_arquivo.rsplit(".", 1)[-1].lower()
+    return extensao if extensao in LEITORES else "csv"
+
+
+# -------------------- IMPORTAÇÃO --------------------
+
+
+class ImportadorLancamentos:
+    """
+    Importa lançamentos de um usuário em lotes com bulk_create.
+
+    Contas e categorias são carregadas uma única vez e resolvidas por nome
+    em memória. Linhas sem categoria usam a sugestão do histórico de
+    descrições e, sem sugestão confiável, a categoria padrão. Os totais das
+    contas, os resumos mensais e o índice de descrições, que o bulk_create
+    não atualiza sozinho, são acumulados e gravados uma vez no fim.
+    """
+
+    def __init__(
+        self, usuario, conta=None, categoria=None, tamanho_lote=1000, sugerir=True
+    ):
+        self.usuario = usuario
+        self.conta_padrao = conta
+        self.categoria_padrao = categoria
+        self.tamanho_lote = tamanho_lote
+        self.movimentos = AcumuladorMovimentos()
+        self.rotulos = ContadorRotulos()
+        self.indice = IndiceCategorias.carregar(usuario.id) if sugerir else None
+
+        self.contas = {
+            normalizar(c.nome): c for c in Conta.objects.filter(usuario=usuario)
+        }
+        self.categorias = {}
+        self.categorias_por_id = {}
+        for categoria in Categoria.objects.filter(usuario=usuario):
+            self.categorias_por_id[categoria.id] = categoria
+            nome = normalizar(categoria.nome)
+            self.categorias[(nome, categoria.tipo)] = categoria
+            self.categorias.setdefault((nome, None), categoria)
+
+    def converter(self, linha):
+        data = converter_data(linha.get("data"))
+        descricao = (linha.get("descricao") or "").strip()[:255]
+        if not descricao:
+            raise ErroLinha("descrição vazia")
+        valor = converter_valor(linha.get("valor"))
+        tipo = (linha.get("tipo") or "").strip().capitalize() or None
+        if tipo not in (None, "Receita", "Despesa"):
+            raise ErroLinha(f"tipo inválido: {tipo!r}")
+        if tipo is None and valor < 0:
+            tipo = "Despesa"
+
+        conta = self.conta_padrao
+        if linha.get("conta"):
+            conta = self.contas.get(normalizar(linha["conta"]))
+            if conta is None:
+                raise ErroLinha(f"conta não encontrada: {linha['conta']!r}")
+        if conta is None:
+            raise ErroLinha("conta não informada")
+
+        categoria = self.resolver_categoria(linha, descricao, tipo)
+        if categoria is None:
+            raise ErroLinha("categoria não informada")
+
+        return Lancamento(
+            usuario=self.usuario,
+            conta=conta,
+            categoria=categoria,
+            tipo=tipo or categoria.tipo,
+            descricao=descricao,
+            valor=abs(valor),
+            data=data,
+        )
+
+    def resolver_categoria(self, linha, descricao, tipo):
+        if linha.get("categoria"):
+            nome = normalizar(linha["categoria"])
+            categoria = self.categorias.get((nome, tipo)) or self.categorias.get(
+                (nome, None)
+            )
+            if categoria is None:
+                raise ErroLinha(f"categoria não encontrada: {linha['categoria']!r}")
+            return categoria
+
+        # Sem categoria no arquivo, tenta o histórico antes da categoria padrão
+        if self.indice is not None:
+            categoria_id, confianca = self.indice.sugerir(descricao, tipo)
+            if categoria_id and confianca >= CONFIANCA_MINIMA:
+                return self.categorias_por_id[categoria_id]
+        return self.categoria_padrao
+
+    def importar(self, linhas):
+        inicio = time.perf_counter()
+        importados = 0
+        erros = []
+        lote = []
+
+        with transaction.atomic():
+            for numero, linha in linhas:
+                try:
+                    lote.append(self.converter(linha))
+                except ErroLinha as erro:
+                    erros.append((numero, str(erro)))
+                    continue
+
+                if len(lote) >= self.tamanho_lote:
+                    importados += self.gravar(lote)
+                    lote = []
+
+            importados += self.gravar(lote)
+            if importados:
+                self.movimentos.aplicar()
+                self.rotulos.aplicar()
+                VersaoDados.incrementar(self.usuario.id)
+
+        segundos = time.perf_counter() - inicio
+        return {
+            "importados": importados,
+            "erros": erros,
+            "segundos": segundos,
+            "por_segundo": importados / segundos if segundos else 0,
+        }
+
+    def gravar(self, lote):
+        if not lote:
+            return 0
+        Lancamento.objects.bulk_create(lote)
+        self.movimentos.adicionar(l.movimento() for l in lote)
+        self.rotulos.adicionar(l.rotulo() for l in lote)
+        if self.indice is not None:
+            for lancamento in lote:
+                self.indice.aprender(lancamento.categoria_id, lancamento.descricao)
+        return len(lote)
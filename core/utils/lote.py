@@ -0,0 +1,270 @@
+"""
+Criação, alteração e exclusão de lançamentos em lote (API JSON).
+
+Um lote inteiro roda numa transação: contas, categorias e lançamentos
+citados são buscados uma vez cada, as gravações usam bulk_create,
+bulk_update e um único DELETE, e os totais das contas, os resumos mensais,
+o índice de descrições e a versão dos dados são atualizados uma vez no fim,
+como na importação de extratos.
+"""
+
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from core.models import (
+    AcumuladorMovimentos,
+    Categoria,
+    Conta,
+    ContadorRotulos,
+    Lancamento,
+    VersaoDados,
+    em_lote,
+    registrar_comprovantes,
+)
+
+
+CAMPOS_EDITAVEIS = ("data", "descricao", "valor", "conta", "categoria")
+
+# Tipos JSON aceitos em cada campo; o clean() dos campos do modelo levanta
+# TypeError (e não ValidationError) com alguns tipos, e aceitaria true como 1
+TIPOS_JSON = {"data": (str,), "descricao": (str,), "valor": (str, int, float)}
+
+
+class ErroLote(ValueError):
+    """O pedido como um todo é inválido (formato ou tamanho)."""
+
+
+def _inteiro(valor):
+    """O id vindo do JSON, ou None se não for um inteiro."""
+    return valor if isinstance(valor, int) and not isinstance(valor, bool) else None
+
+
+def _ids(valores):
+    return {_inteiro(v) for v in valores} - {None}
+
+
+class LoteLancamentos:
+    """
+    Aplica um lote no formato::
+
+        {"criar": [{"data": "2025-01-31", "descricao": "...", "valor": "10.50",
+                    "conta": 1, "categoria": 2, "ref": "opcional"}, ...],
+         "atualizar": [{"id": 10, "valor": "12.00"}, ...],
+         "excluir": [11, 12],
+         "atomico": false}
+
+    Cada item recebe um resultado próprio, na ordem enviada. Itens inválidos
+    não impedem os demais, a não ser com ``"atomico": true``, quando nada é
+    gravado se algum item falhar. O tipo do lançamento segue a categoria,
+    como no formulário.
+    """
+
+    def __init__(self, usuario, maximo=500):
+        self.usuario = usuario
+        self.maximo = maximo
+        self.movimentos = AcumuladorMovimentos()
+        self.rotulos = ContadorRotulos()
+
+    def aplicar(self, dados):
+        if not isinstance(dados, dict):
+            raise ErroLote("O corpo deve ser um objeto JSON.")
+        criar = dados.get("criar") or []
+        atualizar = dados.get("atualizar") or []
+        excluir = dados.get("excluir") or []
+        if not all(isinstance(lista, list) for lista in (criar, atualizar, excluir)):
+            raise ErroLote("'criar', 'atualizar' e 'excluir' devem ser listas.")
+        total = len(criar) + len(atualizar) + len(excluir)
+        if not total:
+            raise ErroLote("Lote vazio.")
+        if total > self.maximo:
+            raise ErroLote(f"O lote aceita no máximo {self.maximo} itens.")
+
+        with transaction.atomic():
+            self.carregar(criar, atualizar, excluir)
+            resultados = {
+                "criar": [self.validar_novo(item) for item in criar],
+                "atualizar": self.validar_alteracoes(atualizar, excluir),
+                "excluir": self.validar_exclusoes(excluir),
+            }
+            falhas = sum(
+                not r["ok"] for lista in resultados.values() for r in lista
+            )
+
+            if falhas and dados.get("atomico"):
+                for lista in resultados.values():
+                    for resultado in lista:
+                        resultado.pop("_objeto", None)
+                return {"aplicado": False, "falhas": falhas, **resultados}
+
+            alterados = self.gravar(resultados)
+            if alterados:
+                self.movimentos.aplicar()
+                self.rotulos.aplicar()
+                VersaoDados.incrementar(self.usuario.id)
+
+        return {"aplicado": True, "falhas": falhas, **resultados}
+
+    # -------------------- CARGA --------------------
+
+    def carregar(self, criar, atualizar, excluir):
+        """Uma consulta para as contas, uma para as categorias e uma para os lançamentos."""
+        itens = [i for i in criar + atualizar if isinstance(i, dict)]
+        contas = _ids(i.get("conta") for i in itens)
+        categorias = _ids(i.get("categoria") for i in itens)
+        lancamentos = _ids(i.get("id") for i in atualizar if isinstance(i, dict))
+        lancamentos |= _ids(excluir)
+
+        self.contas = (
+            Conta.objects.filter(usuario=self.usuario).in_bulk(contas) if contas else {}
+        )
+        self.categorias = (
+            Categoria.objects.filter(usuario=self.usuario).in_bulk(categorias)
+            if categorias
+            else {}
+        )
+        self.lancamentos = (
+            Lancamento.objects.select_for_update()
+            .filter(usuario=self.usuario)
+            .in_bulk(lancamentos)
+            if lancamentos
+            else {}
+        )
+
+    # -------------------- VALIDAÇÃO --------------------
+
+    def validar_novo(self, item):
+        if not isinstance(item, dict):
+            return {"ok": False, "erros": {"__all__": ["Item deve ser um objeto."]}}
+        lancamento = Lancamento(usuario=self.usuario)
+        erros = self.preencher(lancamento, item, obrigatorios=CAMPOS_EDITAVEIS)
+        resultado = {"ok": not erros}
+        if "ref" in item:
+            resultado["ref"] = item["ref"]
+        if erros:
+            resultado["erros"] = erros
+        else:
+            resultado["_objeto"] = lancamento
+        return resultado
+
+    def validar_alteracoes(self, itens, excluir):
+        excluidos = _ids(excluir)
+        vistos = set()
+        resultados = []
+        for item in itens:
+            pk = item.get("id") if isinstance(item, dict) else None
+            resultado = {"id": pk, "ok": False}
+            resultados.append(resultado)
+
+            lancamento = self.lancamentos.get(_inteiro(pk))
+            if lancamento is None:
+                resultado["erros"] = {"id": ["Lançamento não encontrado."]}
+            elif pk in vistos or pk in excluidos:
+                resultado["erros"] = {"id": ["Lançamento repetido no lote."]}
+            else:
+                vistos.add(pk)
+                anterior = (lancamento.movimento(), lancamento.rotulo())
+                erros = self.preencher(lancamento, item)
+                if erros:
+                    resultado["erros"] = erros
+                else:
+                    resultado.update(ok=True, _objeto=(lancamento, anterior))
+        return resultados
+
+    def validar_exclusoes(self, ids):
+        vistos = set()
+        resultados = []
+        for pk in ids:
+            lancamento = self.lancamentos.get(_inteiro(pk))
+            if lancamento is None:
+                erro = "Lançamento não encontrado."
+            elif pk in vistos:
+                erro = "Lançamento repetido no lote."
+            else:
+                vistos.add(pk)
+                resultados.append({"id": pk, "ok": True, "_objeto": lancamento})
+                continue
+            resultados.append({"id": pk, "ok": False, "erros": {"id": [erro]}})
+        return resultados
+
+    def preencher(self, lancamento, item, obrigatorios=()):
+        """Copia os campos de ``item`` para ``lancamento``; devolve os erros."""
+        erros = {}
+        for campo in CAMPOS_EDITAVEIS:
+            if campo not in item:
+                if campo in obrigatorios:
+                    erros[campo] = ["Este campo é obrigatório."]
+                continue
+            try:
+                valor = self.converter(campo, item[campo])
+            except ValidationError as erro:
+                erros[campo] = erro.messages
+                continue
+            setattr(lancamento, campo, valor)
+
+        if not erros and "categoria" in item:
+            lancamento.tipo = lancamento.categoria.tipo
+        return erros
+
+    def converter(self, campo, valor):
+        if campo == "conta":
+            conta = self.contas.get(_inteiro(valor))
+            if conta is None:
+                raise ValidationError("Conta não encontrada.")
+            return conta
+        if campo == "categoria":
+            categoria = self.categorias.get(_inteiro(valor))
+            if categoria is None:
+                raise ValidationError("Categoria não encontrada.")
+            return categoria
+
+        if isinstance(valor, bool) or not isinstance(valor, TIPOS_JSON[campo]):
+            raise ValidationError("Tipo inválido.")
+        if campo == "valor" and isinstance(valor, float):
+            # Evita 0.1 virar 0.1000000000000000055...
+            valor = str(valor)
+        valor = Lancamento._meta.get_field(campo).clean(valor, None)
+        if campo == "valor" and valor <= Decimal(0):
+            raise ValidationError("O valor deve ser positivo.")
+        return valor
+
+    # -------------------- GRAVAÇÃO --------------------
+
+    def gravar(self, resultados):
+        novos = [r.pop("_objeto") for r in resultados["criar"] if r["ok"]]
+        alterados = [r.pop("_objeto") for r in resultados["atualizar"] if r["ok"]]
+        excluidos = [r.pop("_objeto") for r in resultados["excluir"] if r["ok"]]
+
+        if novos:
+            Lancamento.objects.bulk_create(novos)
+            self.movimentos.adicionar(l.movimento() for l in novos)
+            self.rotulos.adicionar(l.rotulo() for l in novos)
+            validos = (r for r in resultados["criar"] if r["ok"])
+            for resultado, lancamento in zip(validos, novos):
+                resultado["id"] = lancamento.pk
+
+        if alterados:
+            Lancamento.objects.bulk_update(
+                [lancamento for lancamento, _ in alterados],
+                ["data", "descricao", "valor", "conta", "categoria", "tipo"],
+                batch_size=500,
+            )
+            for lancamento, (movimento, rotulo) in alterados:
+                self.movimentos.adicionar([movimento], sinal=-1)
+                self.movimentos.adicionar([lancamento.movimento()])
+                self.rotulos.adicionar([rotulo], sinal=-1)
+                self.rotulos.adicionar([lancamento.rotulo()])
+
+        if excluidos:
+            # Os sinais de exclusão estornariam linha a linha; aqui o estorno
+            # vai junto com o resto do lote
+            with em_lote():
+                Lancamento.objects.filter(pk__in=[l.pk for l in excluidos]).delete()
+            self.movimentos.adicionar((l.movimento() for l in excluidos), sinal=-1)
+            self.rotulos.adicionar((l.rotulo() for l in excluidos), sinal=-1)
+            registrar_comprovantes(
+                [l.comprovante.name for l in excluidos], sinal=-1
+            )
+
+        return len(novos) + len(alterados) + len(excluidos)
@@ -0,0 +1,76 @@
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+# Formatação em pt_BR (1.234,56) sem babel: o format() de Decimal já agrupa
+# os milhares sem passar por float e um translate troca os separadores.
+SIMBOLO = "R$"
+_PT_BR = str.maketrans({",": ".", ".": ","})
+CENTAVO = Decimal("0.01")
+
+ABREVIACOES = (
+    (Decimal(1_000_000_000), "bilhões"),
+    (Decimal(1_000_000), "milhões"),
+    (Decimal(1_000), "mil"),
+)
+
+
+def _decimal(valor):
+    if isinstance(valor, Decimal):
+        return valor
+    if isinstance(valor, float):
+        return Decimal(repr(valor))
+    return Decimal(valor or 0)
+
+
+def _en(valor):
+    """
+    Valor com duas casas no formato en_US (1,234.56), exato para Decimal.
+    Meio centavo arredonda para longe do zero e o "+ 0" troca -0.00 por 0.00.
+    """
+    return f"{_decimal(valor).quantize(CENTAVO, ROUND_HALF_UP) + 0:,}"
+
+
+def _com_simbolo(numero):
+    if numero.startswith("-"):
+        return f"-{SIMBOLO} {numero[1:]}"
+    return f"{SIMBOLO} {numero}"
+
+
+def formatar_numero(valor):
+    """1234.5 → "1.234,50"."""
+    return _en(valor).translate(_PT_BR)
+
+
+def formatar_moeda(valor):
+    """1234.5 → "R$ 1.234,50"; negativos como "-R$ 1.234,50"."""
+    return _com_simbolo(formatar_numero(valor))
+
+
+def formatar_coluna(valores, simbolo=True):
+    """
+    Formata uma coluna inteira de valores de uma vez: um único translate
+    sobre o texto concatenado em vez de um por valor.
+    """
+    numeros = "\n".join(_en(valor) for valor in valores).translate(_PT_BR)
+    if not numeros:
+        return []
+    numeros = numeros.split("\n")
+    return [_com_simbolo(n) for n in numeros] if simbolo else numeros
+
+
+def abreviar(valor):
+    """1234567 → "1,23 milhões"; abaixo de mil, o número completo."""
+    try:
+        valor = _decimal(valor)
+    except (InvalidOperation, TypeError, ValueError):
+        return valor
+    if not valor.is_finite():
+        return valor
+
+    # Sobe de unidade enquanto o valor arredondado passar de mil: 999.999,995
+    # vira "1,00 milhões", e não "1.000,00 mil"
+    numero, sufixo = valor.quantize(CENTAVO, ROUND_HALF_UP), None
+    for limite, nome in reversed(ABREVIACOES):
+        if abs(numero) < 1000:
+            break
+        numero, sufixo = (valor / limite).quantize(CENTAVO, ROUND_HALF_UP), nome
+    return f"{formatar_numero(numero)} {sufixo}" if sufixo else formatar_numero(numero)
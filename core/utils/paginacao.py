@@ -0,0 +1,62 @@
+import datetime
+
+from django.db.models import Q
+
+
+def cursor_de(lancamento):
+    return f"{lancamento.data:%Y-%m-%d}_{lancamento.pk}"
+
+
+def ler_cursor(cursor):
+    """Converte "AAAA-MM-DD_id" em (data, id); None se o cursor for inválido."""
+    try:
+        data, pk = cursor.split("_")
+        return datetime.datetime.strptime(data, "%Y-%m-%d").date(), int(pk)
+    except (AttributeError, ValueError):
+        return None
+
+
+def paginar_por_cursor(lancamentos, apos="", antes="", tamanho=50):
+    """
+    Paginação por chave (data, id), do mais recente para o mais antigo.
+
+    ``apos`` traz a página seguinte (mais antiga) a partir de um cursor e
+    ``antes`` a página anterior (mais recente). Cada página é uma busca no
+    índice a partir do cursor, sem OFFSET, então o custo não cresce com o
+    tamanho do histórico.
+
+    Retorna (itens, cursor_proximo, cursor_anterior); os cursores são None
+    quando não há mais páginas naquela direção.
+    """
+    chave_antes = ler_cursor(antes)
+    chave_apos = ler_cursor(apos) if chave_antes is None else None
+
+    if chave_antes:
+        data, pk = chave_antes
+        itens = list(
+            lancamentos.filter(Q(data__gt=data) | Q(data=data, pk__gt=pk)).order_by(
+                "data", "pk"
+            )[: tamanho + 1]
+        )
+        if not itens:
+            return paginar_por_cursor(lancamentos, tamanho=tamanho)
+        tem_recentes = len(itens) > tamanho
+        itens = itens[:tamanho][::-1]
+        tem_antigos = True
+    else:
+        if chave_apos:
+            data, pk = chave_apos
+            lancamentos = lancamentos.filter(Q(data__lt=data) | Q(data=data, pk__lt=pk))
+        itens = list(lancamentos.order_by("-data", "-pk")[: tamanho + 1])
+        tem_antigos = len(itens) > tamanho
+        itens = itens[:tamanho]
+        tem_recentes = chave_apos is not None
+
+    if not itens:
+        return itens, None, None
+
+    return (
+        itens,
+        cursor_de(itens[-1]) if tem_antigos else None,
+        cursor_de(itens[0]) if tem_recentes else None,
+    )
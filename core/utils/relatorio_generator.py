@@ -1,12 +1,75 @@
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment
 from io import BytesIO
+import csv
+import json
+import tempfile
+
+from django.db.models import QuerySet
 
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet
 
+from core.models import Lancamento
+from core.utils.agregacoes import centavos, saldo_corrente, totais_periodo
+from core.utils.moeda import formatar_coluna, formatar_moeda
+
+
+# Acima disso o arquivo gerado sai da memória para um temporário em disco
+LIMITE_ARQUIVO_EM_MEMORIA = 8 * 1024 * 1024
+
+
+def iterar_lancamentos(lancamentos, chunk_size=2000):
+    """Percorre os lançamentos em blocos, já com categoria e conta carregadas."""
+    if isinstance(lancamentos, QuerySet):
+        return lancamentos.select_related("categoria", "conta").iterator(
+            chunk_size=chunk_size
+        )
+    return iter(lancamentos)
+
+
+def montar_contexto_relatorio(usuario, inicio, fim):
+    """Lançamentos e resumo do período, no formato esperado pelos geradores."""
+    totais = totais_periodo(usuario, inicio, fim)
+    saldo_inicial = totais["saldo_inicial"]
+
+    # O saldo após cada lançamento sai do banco na mesma consulta, ainda
+    # lida em blocos pelos geradores; no SQLite vem como float, então cada
+    # gerador passa o valor por centavos()
+    lancamentos = (
+        Lancamento.objects.filter(usuario=usuario, data__range=[inicio, fim])
+        .annotate(saldo=saldo_corrente(saldo_inicial))
+        .order_by("data", "pk")
+    )
+
+    receitas = totais["receitas"]
+    despesas = totais["despesas"]
+
+    saldo_final = saldo_inicial + receitas - despesas
+    saldo_inicial_fmt, receitas_fmt, despesas_fmt, saldo_final_fmt = formatar_coluna(
+        [saldo_inicial, receitas, despesas, saldo_final]
+    )
+
+    return {
+        "usuario": usuario,
+        "inicio": inicio,
+        "fim": fim,
+        "data_inicio": inicio.strftime("%d/%m/%Y"),
+        "data_fim": fim.strftime("%d/%m/%Y"),
+        "lancamentos": lancamentos,
+        "saldo_inicial": saldo_inicial,
+        "receitas": receitas,
+        "despesas": despesas,
+        "saldo_final": saldo_final,
+        "saldo_inicial_fmt": saldo_inicial_fmt,
+        "receitas_fmt": receitas_fmt,
+        "despesas_fmt": despesas_fmt,
+        "saldo_final_fmt": saldo_final_fmt,
+    }
+
 
 def gerar_relatorio_pdf(context):
     buffer = BytesIO()
@@ -35,9 +98,9 @@ def gerar_relatorio_pdf(context):
     )
     elements.append(Spacer(1, 12))
 
-    data = [["Data", "Tipo", "Categoria", "Conta", "Valor", "Descrição"]]
+    data = [["Data", "Tipo", "Categoria", "Conta", "Valor", "Saldo", "Descrição"]]
 
-    for l in context["lancamentos"]:
+    for l in iterar_lancamentos(context["lancamentos"]):
         # 🔥 Aceita ambos os padrões: "R"/"D" ou "Receita"/"Despesa"
         if l.tipo in ["R", "Receita"]:
             tipo = "Receita"
@@ -47,22 +110,26 @@ def gerar_relatorio_pdf(context):
         categoria = l.categoria.nome if l.categoria else "-"
         conta = l.conta.nome if l.conta else "-"
 
-        valor_formatado = (
-            f"R$ {l.valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-        )
-
         data.append(
             [
                 l.data.strftime("%d/%m/%Y"),
                 tipo,
                 categoria,
                 conta,
-                valor_formatado,
+                l.valor,
+                centavos(l.saldo),
                 l.descricao,
             ]
         )
 
-    table = Table(data, colWidths=[60, 60, 90, 80, 100, 130])
+    # As colunas de valores são formatadas de uma vez no fim
+    for coluna in (4, 5):
+        for linha, valor_formatado in zip(
+            data[1:], formatar_coluna(linha[coluna] for linha in data[1:])
+        ):
+            linha[coluna] = valor_formatado
+
+    table = Table(data, colWidths=[55, 50, 75, 70, 80, 80, 120])
     table.setStyle(
         TableStyle(
             [
@@ -82,9 +149,12 @@ def gerar_relatorio_pdf(context):
 
 
 def gerar_relatorio_excel(context):
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Relatório Financeiro"
+    # Modo somente escrita: as linhas vão direto para o arquivo em vez de
+    # ficarem todas em memória como células do openpyxl.
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Relatório Financeiro")
+    ws.column_dimensions["E"].width = 20
+    ws.column_dimensions["F"].width = 20
 
     # Resumo
     ws.append(["Relatório", f"{context['data_inicio']} a {context['data_fim']}"])
@@ -95,22 +165,26 @@ def gerar_relatorio_excel(context):
     ws.append([])
 
     # Cabeçalho da tabela
-    header = ["Data", "Tipo", "Categoria", "Conta", "Valor", "Descrição"]
+    header = []
+    for titulo in ["Data", "Tipo", "Categoria", "Conta", "Valor", "Saldo", "Descrição"]:
+        cell = WriteOnlyCell(ws, value=titulo)
+        cell.font = Font(bold=True)
+        header.append(cell)
     ws.append(header)
 
-    for col in ws[7]:
-        col.font = Font(bold=True)
+    alinhamento_valor = Alignment(horizontal="right")
 
     # Linhas da tabela
-    for l in context["lancamentos"]:
+    for l in iterar_lancamentos(context["lancamentos"]):
         tipo = l.tipo  # CORREÇÃO FINAL
 
         categoria = l.categoria.nome if l.categoria else "-"
         conta = l.conta.nome if l.conta else "-"
 
-        valor_formatado = (
-            f"R$ {l.valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-        )
+        valor_formatado = WriteOnlyCell(ws, value=formatar_moeda(l.valor))
+        valor_formatado.alignment = alinhamento_valor
+        saldo_formatado = WriteOnlyCell(ws, value=formatar_moeda(centavos(l.saldo)))
+        saldo_formatado.alignment = alinhamento_valor
 
         ws.append(
             [
@@ -119,17 +193,112 @@ def gerar_relatorio_excel(context):
                 categoria,
                 conta,
                 valor_formatado,
+                saldo_formatado,
                 l.descricao,
             ]
         )
 
-    ws.column_dimensions["E"].width = 20
+    arquivo = tempfile.SpooledTemporaryFile(max_size=LIMITE_ARQUIVO_EM_MEMORIA)
+    wb.save(arquivo)
+    arquivo.seek(0)
+    return arquivo
 
-    for row in ws.iter_rows(min_row=8, min_col=5, max_col=5):
-        for cell in row:
-            cell.alignment = Alignment(horizontal="right")
 
-    buffer = BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-    return buffer
+# formato: (gerador, content_type, nome do arquivo)
+FORMATOS_ARQUIVO = {
+    "pdf": (gerar_relatorio_pdf, "application/pdf", "relatorio.pdf"),
+    "excel": (
+        gerar_relatorio_excel,
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "relatorio.xlsx",
+    ),
+}
+
+
+# -------------------- FORMATOS EM FLUXO (CSV / JSONL) --------------------
+
+CAMPOS_LINHA = (
+    "data",
+    "tipo",
+    "categoria__nome",
+    "conta__nome",
+    "valor",
+    "saldo",
+    "descricao",
+)
+
+
+def iterar_linhas(lancamentos, chunk_size=2000):
+    """
+    Tuplas (data, tipo, categoria, conta, valor, saldo, descricao) lidas em
+    blocos por um cursor no servidor, sem instanciar os modelos.
+    """
+    if isinstance(lancamentos, QuerySet):
+        linhas = lancamentos.values_list(*CAMPOS_LINHA).iterator(chunk_size=chunk_size)
+    else:
+        linhas = (
+            (l.data, l.tipo, l.categoria.nome, l.conta.nome, l.valor, l.saldo, l.descricao)
+            for l in lancamentos
+        )
+    # O saldo da janela volta como float no SQLite
+    return (
+        (data, tipo, categoria, conta, valor, centavos(saldo), descricao)
+        for data, tipo, categoria, conta, valor, saldo, descricao in linhas
+    )
+
+
+class _Eco:
+    """Arquivo falso: o csv.writer devolve a linha formatada em vez de gravá-la."""
+
+    def write(self, valor):
+        return valor
+
+
+def gerar_relatorio_csv(context):
+    writer = csv.writer(_Eco())
+
+    # Resumo, no mesmo formato do Excel, com valores sem formatação
+    yield writer.writerow(["Relatório", context["inicio"], context["fim"]])
+    yield writer.writerow(["Saldo Inicial", context["saldo_inicial"]])
+    yield writer.writerow(["Receitas", context["receitas"]])
+    yield writer.writerow(["Despesas", context["despesas"]])
+    yield writer.writerow(["Saldo Final", context["saldo_final"]])
+    yield writer.writerow([])
+
+    yield writer.writerow(
+        ["Data", "Tipo", "Categoria", "Conta", "Valor", "Saldo", "Descrição"]
+    )
+    for linha in iterar_linhas(context["lancamentos"]):
+        yield writer.writerow(linha)
+
+
+def gerar_relatorio_jsonl(context):
+    yield json.dumps(
+        {
+            "resumo": {
+                "data_inicio": context["inicio"].isoformat(),
+                "data_fim": context["fim"].isoformat(),
+                "saldo_inicial": str(context["saldo_inicial"]),
+                "receitas": str(context["receitas"]),
+                "despesas": str(context["despesas"]),
+                "saldo_final": str(context["saldo_final"]),
+            }
+        },
+        ensure_ascii=False,
+    ) + "\n"
+
+    for data, tipo, categoria, conta, valor, saldo, descricao in iterar_linhas(
+        context["lancamentos"]
+    ):
+        yield json.dumps(
+            {
+                "data": data.isoformat(),
+                "tipo": tipo,
+                "categoria": categoria,
+                "conta": conta,
+                "valor": str(valor),
+                "saldo": str(saldo),
+                "descricao": descricao,
+            },
+            ensure_ascii=False,
+        ) + "\n"
@@ -0,0 +1,23 @@
+import functools
+import re
+import unicodedata
+
+
+# Nomes de conta/categoria e descrições de extrato se repetem muito
+@functools.lru_cache(maxsize=4096)
+def normalizar(texto):
+    """Minúsculas, sem acentos e com espaços simples, para comparar nomes."""
+    texto = unicodedata.normalize("NFKD", " ".join((texto or "").split()).casefold())
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+
+_PALAVRA = re.compile(r"[^\W\d_]{3,}")
+
+
+@functools.lru_cache(maxsize=4096)
+def palavras(texto):
+    """
+    Palavras normalizadas de três letras ou mais (cortadas em 60), sem
+    repetição e sem números.
+    """
+    return frozenset(palavra[:60] for palavra in _PALAVRA.findall(normalizar(texto)))
@@ -1,20 +1,80 @@
 import datetime
+import json
+import os
 from pyexpat.errors import messages
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 from django.db.models import Sum
 from django import forms
-from django.http import FileResponse
+from django.http import (
+    Http404,
+    HttpResponse,
+    JsonResponse,
+)
+from django.urls import reverse
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+from django.utils.functional import SimpleLazyObject
+from django.views.decorators.http import require_POST
 from django.contrib.auth import update_session_auth_hash
 from django.db.models import Sum, Case, When, F
 
-from .models import Conta, Lancamento, Categoria
-from .forms import ContaForm, LancamentoForm, CategoriaForm
-from .utils.relatorio_generator import gerar_relatorio_pdf, gerar_relatorio_excel
-from babel.numbers import format_currency
+from .models import (
+    Categoria,
+    Comprovante,
+    Conta,
+    Lancamento,
+    TarefaRelatorio,
+    VersaoDados,
+)
+from .forms import ContaForm, LancamentoForm, CategoriaForm, ImportacaoForm
+from .utils.relatorio_generator import (
+    FORMATOS_ARQUIVO,
+    gerar_relatorio_csv,
+    gerar_relatorio_jsonl,
+    montar_contexto_relatorio,
+)
+from .utils.agregacoes import (
+    GRANULARIDADES,
+    anexar_saldos,
+    escolher_granularidade,
+    resumo_financeiro,
+    serie_saldos,
+)
+from .utils.paginacao import paginar_por_cursor
+from .utils.cache_relatorios import cache_relatorios, chave_relatorio
+from .utils.importacao import LEITORES, ImportadorLancamentos, detectar_formato
+from .utils.lote import ErroLote, LoteLancamentos
+from .utils.categorizacao import CONFIANCA_MINIMA, IndiceCategorias
+from .utils.busca import buscar
+from .utils.comprovantes import anexar_comprovantes, versao_comprovante
+from .utils.entrega import responder_arquivo, responder_em_fluxo, servir_arquivo
+from .instrumentacao import histogramas
+
+
+# As views mais acessadas (dashboard e listagens) são assíncronas: no ASGI o
+# worker atende outras requisições enquanto espera o banco. Os dados são
+# materializados antes do render, que roda numa thread via sync_to_async
+# (o template ainda acessa request.user, que é carregado de forma síncrona).
+_render = sync_to_async(render)
+
+
+async def _listar(queryset):
+    return [item async for item in queryset]
+
+
+async def _usuario(request):
+    # request.user é preguiçoso e tem cache próprio, separado do auser();
+    # sem isso o template buscaria o usuário de novo
+    request.user = await request.auser()
+    return request.user
 
 
 # Página inicial
@@ -86,73 +146,128 @@ def cadastro(request):
 
 
 # Dashboard
+
+# Blocos do dashboard em cache ({% cache %} em core/dashboard.html), pela
+# versão dos dados do usuário, e as consultas de que cada um depende
+FRAGMENTOS_DASHBOARD = {
+    "dashboard_totais": "contas",
+    "dashboard_ultimos": "ultimos",
+    "dashboard_saldos": "contas",
+}
+
+
 @login_required
-def dashboard(request):
-    usuario = request.user
-    contas = Conta.objects.filter(usuario=usuario)
-    lancamentos = Lancamento.objects.filter(usuario=usuario)
+async def dashboard(request):
+    usuario = await _usuario(request)
+    versao = await sync_to_async(VersaoDados.atual)(usuario.id)
+
+    cache_fragmentos = caches["template_fragments"]
+    chaves = {
+        nome: make_template_fragment_key(nome, [usuario.id, versao])
+        for nome in FRAGMENTOS_DASHBOARD
+    }
+    prontos = await cache_fragmentos.aget_many(chaves.values())
+    faltando = {
+        FRAGMENTOS_DASHBOARD[nome]
+        for nome, chave in chaves.items()
+        if chave not in prontos
+    }
 
-    total_receitas = (
-        lancamentos.filter(tipo="Receita").aggregate(total=Sum("valor"))["total"] or 0
-    )
-    total_despesas = (
-        lancamentos.filter(tipo="Despesa").aggregate(total=Sum("valor"))["total"] or 0
-    )
-    saldo_total = (
-        sum([c.saldo_inicial for c in contas]) + total_receitas - total_despesas
+    # Só consulta o que os blocos fora do cache vão usar. Os demais dados
+    # seguem preguiçosos, caso um fragmento expire entre a checagem e o render.
+    contas = Conta.objects.filter(usuario=usuario)
+    ultimos_lancamentos = (
+        Lancamento.objects.filter(usuario=usuario)
+        .select_related("categoria")
+        .order_by("-data")[:5]
     )
+    resultados = {}
+    if "contas" in faltando:
+        resultados["contas"] = await _listar(contas)
+    if "ultimos" in faltando:
+        resultados["ultimos"] = await _listar(ultimos_lancamentos)
+
+    if "contas" in resultados:
+        resumo = resumo_financeiro(resultados["contas"])
+    else:
+        resumo = SimpleLazyObject(lambda: resumo_financeiro(contas))
+
+    context = {
+        "resumo": resumo,
+        "ultimos_lancamentos": resultados.get("ultimos", ultimos_lancamentos),
+        "usuario_id": usuario.id,
+        "versao_dados": versao,
+        "cache_segundos": cache_fragmentos.default_timeout,
+    }
+    return await _render(request, "core/dashboard.html", context)
 
-    ultimos_lancamentos = lancamentos.order_by("-data")[:5]
 
-    saldos_por_conta = []
-    for conta in contas:
-        receitas = (
-            lancamentos.filter(conta=conta, tipo="Receita").aggregate(Sum("valor"))[
-                "valor__sum"
-            ]
-            or 0
-        )
-        despesas = (
-            lancamentos.filter(conta=conta, tipo="Despesa").aggregate(Sum("valor"))[
-                "valor__sum"
-            ]
-            or 0
+SERIE_PONTOS_PADRAO = 400
+SERIE_PONTOS_MAXIMO = 2000
+
+
+async def saldos_por_periodo(request):
+    """
+    API JSON para gráficos: receitas, despesas e saldo acumulado por período.
+
+    Parâmetros: inicio e fim (AAAA-MM-DD; padrão, os últimos 12 meses),
+    granularidade (dia, semana, mes ou ano), conta e pontos. Se o período
+    pedido geraria mais que ``pontos`` pontos, a granularidade sobe até
+    caber: cinco anos por dia viram ~260 semanas.
+    """
+    usuario = await _usuario(request)
+    if not usuario.is_authenticated:
+        return JsonResponse({"erro": "Autenticação necessária."}, status=401)
+
+    try:
+        fim = datetime.date.fromisoformat(
+            request.GET.get("fim") or datetime.date.today().isoformat()
         )
-        saldo = conta.saldo_inicial + receitas - despesas
-        saldos_por_conta.append(
-            {
-                "nome": conta.nome,
-                "saldo": saldo,
-                "receitas": receitas,
-                "despesas": despesas,
-            }
+        inicio = datetime.date.fromisoformat(
+            request.GET.get("inicio") or (fim - datetime.timedelta(days=364)).isoformat()
         )
-
-    context = {
-        "saldo_total": saldo_total,
-        "total_receitas": total_receitas,
-        "total_despesas": total_despesas,
-        "ultimos_lancamentos": ultimos_lancamentos,
-        "saldos_por_conta": saldos_por_conta,
-    }
-    return render(request, "core/dashboard.html", context)
+        pontos = int(request.GET.get("pontos") or SERIE_PONTOS_PADRAO)
+        conta_id = int(request.GET.get("conta") or 0)
+    except (ValueError, OverflowError):
+        # OverflowError: fim perto de 0001-01-01 sem início explícito
+        return JsonResponse({"erro": "Parâmetro inválido."}, status=400)
+    granularidade = request.GET.get("granularidade") or "dia"
+    if granularidade not in GRANULARIDADES:
+        return JsonResponse({"erro": "Granularidade inválida."}, status=400)
+    if inicio > fim:
+        return JsonResponse({"erro": "O início é posterior ao fim."}, status=400)
+
+    conta = None
+    if conta_id:
+        conta = await Conta.objects.filter(id=conta_id, usuario=usuario).afirst()
+        if conta is None:
+            return JsonResponse({"erro": "Conta não encontrada."}, status=404)
+
+    pontos = min(max(pontos, 1), SERIE_PONTOS_MAXIMO)
+    granularidade = escolher_granularidade(inicio, fim, pontos, minima=granularidade)
+    saldo_anterior, serie = await sync_to_async(serie_saldos)(
+        usuario, inicio, fim, granularidade, conta=conta
+    )
+    return JsonResponse(
+        {
+            "inicio": inicio,
+            "fim": fim,
+            "conta": conta.id if conta else None,
+            "granularidade": granularidade,
+            "saldo_anterior": saldo_anterior,
+            "pontos": serie,
+        }
+    )
 
 
 # -------------------- CONTAS --------------------
 
 
 @login_required
-def listar_contas(request):
-    contas = Conta.objects.filter(usuario=request.user)
-
-    for conta in contas:
-        conta.saldo_formatado = (
-            f"{conta.saldo_inicial:,.2f}".replace(",", "X")
-            .replace(".", ",")
-            .replace("X", ".")
-        )
-
-    return render(request, "core/listar_contas.html", {"contas": contas})
+async def listar_contas(request):
+    usuario = await _usuario(request)
+    contas = await _listar(Conta.objects.filter(usuario=usuario))
+    return await _render(request, "core/listar_contas.html", {"contas": contas})
 
 
 @login_required
@@ -193,6 +308,8 @@ def excluir_conta(request, conta_id):
 
 # -------------------- LANÇAMENTOS --------------------
 
+LANCAMENTOS_POR_PAGINA = 50
+
 
 @login_required
 def lancar_movimento(request):
@@ -209,14 +326,19 @@ def lancar_movimento(request):
 
 
 @login_required
-def listar_lancamentos(request):
-    lancamentos = Lancamento.objects.filter(usuario=request.user).order_by("-data")
-    categorias = Categoria.objects.filter(usuario=request.user)
+async def listar_lancamentos(request):
+    usuario = await _usuario(request)
+    lancamentos = Lancamento.objects.filter(usuario=usuario).select_related(
+        "categoria", "conta"
+    )
 
     data_inicio = request.GET.get("data_inicio", "")
     data_fim = request.GET.get("data_fim", "")
     categoria_id = request.GET.get("categoria", "todas")
     tipo = request.GET.get("tipo", "todos")
+    conta_id = request.GET.get("conta", "todas")
+    busca = request.GET.get("busca", "").strip()
+    ordem = request.GET.get("ordem", "relevancia" if busca else "data")
 
     if data_inicio:
         lancamentos = lancamentos.filter(data__gte=data_inicio)
@@ -226,22 +348,59 @@ def listar_lancamentos(request):
         lancamentos = lancamentos.filter(categoria_id=categoria_id)
     if tipo != "todos":
         lancamentos = lancamentos.filter(tipo=tipo)
-
-    for l in lancamentos:
-        l.valor_formatado = (
-            f"{l.valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    conta = None
+    if conta_id != "todas":
+        if conta_id.isdigit():
+            conta = await Conta.objects.filter(id=conta_id, usuario=usuario).afirst()
+        lancamentos = lancamentos.filter(conta=conta)
+    if busca:
+        lancamentos = buscar(lancamentos, usuario, busca)
+
+    if busca and ordem == "relevancia":
+        # Os mais relevantes numa página só; ordem=data pagina todos
+        mais_relevantes = lancamentos.order_by("-relevancia", "-data", "-pk")
+        pagina = await _listar(mais_relevantes[:LANCAMENTOS_POR_PAGINA])
+        cursor_proximo = cursor_anterior = None
+    else:
+        pagina, cursor_proximo, cursor_anterior = await sync_to_async(
+            paginar_por_cursor
+        )(
+            lancamentos,
+            apos=request.GET.get("apos", ""),
+            antes=request.GET.get("antes", ""),
+            tamanho=LANCAMENTOS_POR_PAGINA,
         )
+    categorias = await _listar(Categoria.objects.filter(usuario=usuario))
+    await sync_to_async(anexar_comprovantes)(pagina)
 
-    return render(
+    # Com filtro de categoria, tipo ou texto a página deixa de ser um trecho
+    # contínuo do razão e o saldo corrente não teria sentido
+    mostrar_saldo = categoria_id == "todas" and tipo == "todos" and not busca
+    if mostrar_saldo:
+        await sync_to_async(anexar_saldos)(pagina, usuario, conta=conta)
+
+    # Filtros atuais, sem os cursores, para montar os links de paginação
+    filtros = request.GET.copy()
+    filtros.pop("apos", None)
+    filtros.pop("antes", None)
+
+    return await _render(
         request,
         "core/lancamento_lista.html",
         {
-            "lancamentos": lancamentos,
+            "lancamentos": pagina,
             "categorias": categorias,
             "data_inicio": data_inicio,
             "data_fim": data_fim,
             "categoria_selecionada": categoria_id,
             "tipo_selecionado": tipo,
+            "conta_selecionada": conta_id,
+            "busca": busca,
+            "ordem": ordem,
+            "mostrar_saldo": mostrar_saldo,
+            "cursor_proximo": cursor_proximo,
+            "cursor_anterior": cursor_anterior,
+            "filtros": filtros.urlencode(),
         },
     )
 
@@ -287,21 +446,113 @@ def excluir_lancamento(request, pk):
     )
 
 
+@login_required
+def importar_lancamentos(request):
+    resultado = None
+    if request.method == "POST":
+        form = ImportacaoForm(request.POST, request.FILES, user=request.user)
+        if form.is_valid():
+            arquivo = form.cleaned_data["arquivo"]
+            leitor = LEITORES[detectar_formato(arquivo.name)]
+            importador = ImportadorLancamentos(
+                request.user,
+                conta=form.cleaned_data["conta"],
+                categoria=form.cleaned_data["categoria"],
+                sugerir=form.cleaned_data["sugerir"],
+            )
+            resultado = importador.importar(leitor(arquivo.file))
+    else:
+        form = ImportacaoForm(user=request.user)
+    return render(
+        request,
+        "core/importar_lancamentos.html",
+        {"form": form, "resultado": resultado},
+    )
+
+
+@require_POST
+def lancamentos_em_lote(request):
+    """
+    API JSON: cria, altera e exclui vários lançamentos numa transação (ver
+    core.utils.lote para o formato). Usa a sessão e o token CSRF do login.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({"erro": "Autenticação necessária."}, status=401)
+    try:
+        dados = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({"erro": "JSON inválido."}, status=400)
+    try:
+        resultado = LoteLancamentos(
+            request.user, maximo=settings.API_LOTE_MAXIMO
+        ).aplicar(dados)
+    except ErroLote as erro:
+        return JsonResponse({"erro": str(erro)}, status=400)
+    return JsonResponse(resultado, status=200 if resultado["aplicado"] else 422)
+
+
+@login_required
+def sugerir_categoria(request):
+    """Categoria provável para a descrição digitada, pelo histórico do usuário."""
+    descricao = request.GET.get("descricao", "")
+    indice = IndiceCategorias.carregar(request.user.id, descricao=descricao)
+    categoria_id, confianca = indice.sugerir(
+        descricao, tipo=request.GET.get("tipo") or None, prefixo=True
+    )
+    if confianca < CONFIANCA_MINIMA:
+        categoria_id = None
+    return JsonResponse({"categoria": categoria_id, "confianca": round(confianca, 2)})
+
+
 @login_required
 def visualizar_comprovante(request, lancamento_id):
     lancamento = get_object_or_404(Lancamento, id=lancamento_id, usuario=request.user)
+    anexar_comprovantes([lancamento])
     return render(
         request, "core/visualizar_comprovante.html", {"lancamento": lancamento}
     )
 
 
+@login_required
+def baixar_comprovante(request, lancamento_id):
+    """Comprovante (ou ?variante=previa|miniatura) com Range, ETag e 304."""
+    lancamento = get_object_or_404(Lancamento, id=lancamento_id, usuario=request.user)
+    if not lancamento.comprovante:
+        raise Http404("Lançamento sem comprovante.")
+
+    original = lancamento.comprovante.name
+    variante = request.GET.get("variante", "")
+    if variante in ("previa", "miniatura"):
+        comprovante = Comprovante.objects.filter(arquivo=original).first()
+        arquivo = getattr(comprovante, variante, None)
+        if not arquivo:
+            raise Http404("Redução ainda não gerada.")
+    elif variante:
+        raise Http404("Variante desconhecida.")
+    else:
+        arquivo = lancamento.comprovante
+
+    extensao = os.path.splitext(arquivo.name)[1]
+    return servir_arquivo(
+        request,
+        arquivo.storage,
+        arquivo.name,
+        versao=versao_comprovante(original, variante),
+        nome_download=f"comprovante-{lancamento.id}{extensao}",
+        anexo="download" in request.GET,
+    )
+
+
 # -------------------- CATEGORIAS --------------------
 
 
 @login_required
-def listar_categorias(request):
-    categorias = Categoria.objects.filter(usuario=request.user)
-    return render(request, "core/listar_categorias.html", {"categorias": categorias})
+async def listar_categorias(request):
+    usuario = await _usuario(request)
+    categorias = await _listar(Categoria.objects.filter(usuario=usuario))
+    return await _render(
+        request, "core/listar_categorias.html", {"categorias": categorias}
+    )
 
 
 @login_required
@@ -344,10 +595,15 @@ def excluir_categoria(request, id):
 
 # -------------------- RELATÓRIOS --------------------
 from django.db.models import Sum, Case, When, F
-from babel.numbers import format_currency
 import datetime
 
 
+FORMATOS_EM_FLUXO = {
+    "csv": (gerar_relatorio_csv, "text/csv; charset=utf-8"),
+    "jsonl": (gerar_relatorio_jsonl, "application/x-ndjson; charset=utf-8"),
+}
+
+
 @login_required
 def gerar_relatorio(request):
     data_inicio = request.GET.get("data_inicio")
@@ -371,81 +627,90 @@ def gerar_relatorio(request):
         )
         return render(request, "core/relatorio_form.html")
 
-    lancamentos = Lancamento.objects.filter(
-        usuario=request.user, data__range=[inicio, fim]
-    ).order_by("data")
-
-    lancamentos_corrigidos = lancamentos.annotate(
-        valor_corrigido=Case(
-            When(tipo="Receita", then=F("valor")),
-            When(tipo="Despesa", then=-F("valor")),
+    # Relatório já gerado com a versão atual dos dados
+    if formato in FORMATOS_ARQUIVO:
+        chave = chave_relatorio(request.user.id, inicio, fim, formato)
+        em_cache = cache_relatorios().obter(chave)
+        if em_cache:
+            _, content_type, nome_arquivo = FORMATOS_ARQUIVO[formato]
+            return responder_arquivo(request, em_cache, content_type, nome_arquivo)
+
+    # Relatórios grandes em PDF/Excel vão para a fila do worker
+    if formato in FORMATOS_ARQUIVO and (
+        request.GET.get("assincrono")
+        or Lancamento.objects.filter(
+            usuario=request.user, data__range=[inicio, fim]
+        ).count()
+        > settings.RELATORIO_LIMITE_SINCRONO
+    ):
+        tarefa = TarefaRelatorio.objects.create(
+            usuario=request.user, data_inicio=inicio, data_fim=fim, formato=formato
         )
-    )
+        return redirect("status_relatorio", tarefa_id=tarefa.id)
 
-    # SALDO INICIAL
-    saldo_inicial = (
-        Lancamento.objects.filter(usuario=request.user, data__lt=inicio)
-        .annotate(
-            valor_corrigido=Case(
-                When(tipo="Receita", then=F("valor")),
-                When(tipo="Despesa", then=-F("valor")),
-            )
-        )
-        .aggregate(total=Sum("valor_corrigido"))["total"]
-        or 0
-    )
+    context = montar_contexto_relatorio(request.user, inicio, fim)
 
-    # RECEITAS E DESPESAS
-    receitas = (
-        lancamentos_corrigidos.filter(tipo="Receita").aggregate(
-            total=Sum("valor_corrigido")
-        )["total"]
-        or 0
-    )
+    # CSV e JSONL são enviados em fluxo, linha a linha
+    if formato in FORMATOS_EM_FLUXO:
+        gerador, content_type = FORMATOS_EM_FLUXO[formato]
+        response = responder_em_fluxo(request, gerador(context), content_type)
+        response["Content-Disposition"] = f'attachment; filename="relatorio.{formato}"'
+        return response
 
-    despesas = (
-        lancamentos_corrigidos.filter(tipo="Despesa").aggregate(
-            total=Sum("valor_corrigido")
-        )["total"]
-        or 0
-    )
+    # PDFs e Excel
+    if formato in FORMATOS_ARQUIVO:
+        gerador, content_type, nome_arquivo = FORMATOS_ARQUIVO[formato]
+        arquivo = gerador(context)
+        cache_relatorios().guardar(chave, arquivo)
+        return responder_arquivo(request, arquivo, content_type, nome_arquivo)
 
-    saldo_final = saldo_inicial + receitas + despesas
+    return render(request, "core/relatorio_form.html")
 
-    def fmt(v):
-        return format_currency(v, "BRL", locale="pt_BR")
 
-    context = {
-        "usuario": request.user,
-        "data_inicio": inicio.strftime("%d/%m/%Y"),
-        "data_fim": fim.strftime("%d/%m/%Y"),
-        "lancamentos": lancamentos,
-        "saldo_inicial": saldo_inicial,
-        "receitas": receitas,
-        "despesas": abs(despesas),
-        "saldo_final": saldo_final,
-        "saldo_inicial_fmt": fmt(saldo_inicial),
-        "receitas_fmt": fmt(receitas),
-        "despesas_fmt": fmt(abs(despesas)),
-        "saldo_final_fmt": fmt(saldo_final),
-    }
+@login_required
+def status_relatorio(request, tarefa_id):
+    tarefa = get_object_or_404(TarefaRelatorio, id=tarefa_id, usuario=request.user)
 
-    # PDFs e Excel
-    if formato == "pdf":
-        pdf_buffer = gerar_relatorio_pdf(context)
-        return FileResponse(
-            pdf_buffer, content_type="application/pdf", filename="relatorio.pdf"
+    if request.GET.get("formato") == "json":
+        return JsonResponse(
+            {
+                "id": tarefa.id,
+                "status": tarefa.status,
+                "erro": tarefa.erro,
+                "download": (
+                    reverse("baixar_relatorio", args=[tarefa.id])
+                    if tarefa.status == TarefaRelatorio.CONCLUIDO
+                    else None
+                ),
+            }
         )
 
-    if formato == "excel":
-        excel_buffer = gerar_relatorio_excel(context)
-        return FileResponse(
-            excel_buffer,
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            filename="relatorio.xlsx",
-        )
+    return render(request, "core/relatorio_tarefa.html", {"tarefa": tarefa})
 
-    return render(request, "core/relatorio_form.html")
+
+@login_required
+def baixar_relatorio(request, tarefa_id):
+    tarefa = get_object_or_404(
+        TarefaRelatorio,
+        id=tarefa_id,
+        usuario=request.user,
+        status=TarefaRelatorio.CONCLUIDO,
+    )
+    _, content_type, nome_arquivo = FORMATOS_ARQUIVO[tarefa.formato]
+    return responder_arquivo(
+        request, tarefa.arquivo.open("rb"), content_type, nome_arquivo
+    )
 
 
 # -------------------- FIM DOS RELATÓRIOS --------------------
+
+
+# -------------------- MÉTRICAS --------------------
+
+
+@staff_member_required
+def metricas(request):
+    """Quantis por rota, no formato de texto do Prometheus."""
+    return HttpResponse(
+        histogramas().prometheus(), content_type="text/plain; version=0.0.4"
+    )
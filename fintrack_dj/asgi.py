@@ -5,6 +5,10 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Em produção:
+
+    gunicorn fintrack_dj.asgi:application -k uvicorn_worker.UvicornWorker
 """
 
 import os
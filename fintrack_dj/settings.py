@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 
+from fintrack_dj.banco import config_banco
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -43,6 +45,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.instrumentacao.InstrumentacaoMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -50,14 +53,15 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "core.middleware.ArquivosEstaticosMiddleware",
 ]
 
 ROOT_URLCONF = "fintrack_dj.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates com medição do tempo de renderização (Server-Timing)
+        "BACKEND": "core.instrumentacao.DjangoTemplatesMedido",
         "DIRS": [],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -76,12 +80,50 @@ WSGI_APPLICATION = "fintrack_dj.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# DATABASE_URL escolhe o banco (postgres://... ou sqlite:///...); sem ela,
+# SQLite local. DB_CONN_MAX_AGE mantém as conexões abertas entre requisições
+# por N segundos, com verificação de saúde antes de reutilizar. O padrão é 0
+# porque a implantação padrão é ASGI: lá o código síncrono de cada requisição
+# roda numa thread própria e as conexões, que são por thread, ficariam
+# órfãs. Para reaproveitar conexões no ASGI use o pool do psycopg 3
+# (DB_POOL=1); num servidor WSGI DB_CONN_MAX_AGE=60 é seguro.
 DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
+    "default": config_banco(
+        os.getenv(
+            "DATABASE_URL",
+            f"sqlite:///{os.getenv('SQLITE_ARQUIVO', BASE_DIR / 'db.sqlite3')}",
+        ),
+        conn_max_age=int(os.getenv("DB_CONN_MAX_AGE", "0")),
+        health_checks=True,
+        pool=(
+            {
+                "min_size": int(os.getenv("DB_POOL_MIN", "2")),
+                "max_size": int(os.getenv("DB_POOL_MAX", "10")),
+                "timeout": int(os.getenv("DB_POOL_TIMEOUT", "10")),
+            }
+            if os.getenv("DB_POOL") == "1"
+            else None
+        ),
+    )
+}
+
+# SQLite ajustado para vários workers num mesmo servidor (opcional): WAL para
+# leitores não esperarem escritores, synchronous=NORMAL (seguro com WAL),
+# mmap e cache maiores e espera em vez de erro quando o banco está ocupado.
+# As PRAGMAs são aplicadas a cada conexão em core.signals; as transações de
+# escrita começam com BEGIN IMMEDIATE, o que evita o "database is locked"
+# de duas transações tentando promover o lock de leitura ao mesmo tempo.
+SQLITE_OTIMIZADO = os.getenv("SQLITE_OTIMIZADO", "0") == "1"
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": int(os.getenv("SQLITE_MMAP_BYTES", 256 * 1024 * 1024)),
+    "cache_size": -int(os.getenv("SQLITE_CACHE_KB", 64 * 1024)),
+    "temp_store": "MEMORY",
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 20_000)),
 }
+if SQLITE_OTIMIZADO and DATABASES["default"]["ENGINE"].endswith("sqlite3"):
+    DATABASES["default"]["OPTIONS"] = {"transaction_mode": "IMMEDIATE"}
 
 
 # Password validation
@@ -148,6 +190,71 @@ PASSWORD_RESET_TIMEOUT = 3600  # uma hora em segundos
 EMAIL_USE_HTML = True
 
 
+# Os fragmentos de template do dashboard ({% cache %}) usam o alias
+# "template_fragments". A chave inclui a versão dos dados do usuário
+# (VersaoDados), então nunca ficam desatualizados; o TIMEOUT só libera memória.
+# Com vários workers, um cache compartilhado (Redis, Memcached) evita que cada
+# processo renderize os seus.
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "template_fragments": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "fragmentos",
+        "TIMEOUT": int(os.getenv("FRAGMENTOS_CACHE_SEGUNDOS", 6 * 3600)),
+        "OPTIONS": {"MAX_ENTRIES": 10_000},
+    },
+}
+
+# Relatórios PDF/Excel com mais lançamentos que isso são gerados em segundo
+# plano pelo comando processar_relatorios.
+RELATORIO_LIMITE_SINCRONO = int(os.getenv("RELATORIO_LIMITE_SINCRONO", "5000"))
+
+# Segundos, contados de concluido_em, que o arquivo de uma tarefa fica
+# disponível para download; depois disso o processar_relatorios apaga a
+# tarefa e o arquivo.
+RELATORIO_VALIDADE_TAREFA = int(os.getenv("RELATORIO_VALIDADE_TAREFA", 7 * 24 * 3600))
+
+# Cache dos relatórios PDF/Excel já gerados. BACKEND "arquivos" grava em disco
+# com limite de tamanho (LRU); "django" usa o cache ALIAS de CACHES.
+RELATORIO_CACHE = {
+    "BACKEND": os.getenv("RELATORIO_CACHE_BACKEND", "arquivos"),
+    "DIRETORIO": BASE_DIR / "cache" / "relatorios",
+    "MAX_BYTES": int(os.getenv("RELATORIO_CACHE_MAX_BYTES", 200 * 1024 * 1024)),
+    "ALIAS": "default",
+    "TIMEOUT": None,
+}
+
+# Comprovantes (core.utils.comprovantes): maior lado, em pixels, da prévia
+# mostrada no visualizador e da miniatura da lista, qualidade do JPEG e por
+# quantos segundos um arquivo sem referências espera antes de ser apagado
+# pelo processar_comprovantes. ACCEL_REDIRECT é o prefixo de uma location
+# "internal" do nginx apontando para MEDIA_ROOT (ex.: "/_privado/"); com ele o
+# download de comprovantes é entregue pelo proxy via X-Accel-Redirect. Na
+# implantação padrão (ASGI) esse é o único caminho sem cópia: sem ele o
+# arquivo é lido em blocos pelo Python (ver core.utils.entrega).
+COMPROVANTES = {
+    "PREVIA_PX": int(os.getenv("COMPROVANTES_PREVIA_PX", "1280")),
+    "MINIATURA_PX": int(os.getenv("COMPROVANTES_MINIATURA_PX", "160")),
+    "QUALIDADE_JPEG": int(os.getenv("COMPROVANTES_QUALIDADE_JPEG", "82")),
+    "CARENCIA_REMOCAO": int(os.getenv("COMPROVANTES_CARENCIA_REMOCAO", "3600")),
+    "ACCEL_REDIRECT": os.getenv("COMPROVANTES_ACCEL_REDIRECT", ""),
+}
+
+# Máximo de itens (criações + alterações + exclusões) por chamada da API de
+# lançamentos em lote (/api/lancamentos/lote/).
+API_LOTE_MAXIMO = int(os.getenv("API_LOTE_MAXIMO", "500"))
+
+# Medição das requisições (core.instrumentacao): fração amostrada (0 desliga
+# o middleware), tamanho da janela dos quantis por rota e cabeçalho
+# Server-Timing. As métricas ficam em /metricas/ (somente staff). O
+# Server-Timing expõe a qualquer visitante o tempo e o número de consultas ao
+# banco, então fica desligado; ligue só em desenvolvimento.
+INSTRUMENTACAO = {
+    "AMOSTRAGEM": float(os.getenv("INSTRUMENTACAO_AMOSTRAGEM", "1.0")),
+    "JANELA": int(os.getenv("INSTRUMENTACAO_JANELA", "1024")),
+    "SERVER_TIMING": os.getenv("INSTRUMENTACAO_SERVER_TIMING", "0") == "1",
+}
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field